@@ -8,6 +8,16 @@
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
+from array import array
+from bisect import bisect_left, bisect_right
+from sys import getsizeof
+
+try:  # optional, only used to speed up hash_many()
+    import numpy
+except ImportError:
+    numpy = None
+
+
 class DynamicArrayException(Exception):
     pass
 
@@ -19,6 +29,8 @@ class DynamicArray:
     append, pop, swap, get_at_index, set_at_index, length
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
@@ -77,6 +89,10 @@ class DynamicArray:
         """Return length of array."""
         return len(self._data)
 
+    def to_list(self) -> list:
+        """Return a copy of the array's values as a list."""
+        return self._data.copy()
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -96,6 +112,43 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+def hash_many(function, keys: list) -> list:
+    """
+    Receives a hash function and a list of keys then returns a list with the
+    hash of every key, in the same order as the keys.
+
+    hash_function_1 and hash_function_2 are computed for the whole batch at
+    once over the UTF-32 encoded key characters when NumPy is installed and
+    every key is a string. Any other function (or key type) is simply called
+    once per key.
+    """
+    if (numpy is None or not keys
+            or function not in (hash_function_1, hash_function_2)
+            or not all(type(key) is str for key in keys)):
+        return [function(key) for key in keys]
+
+    # one code point per character, so key lengths line up with the codes.
+    # surrogatepass keeps lone surrogates (from surrogateescape decoding) as
+    # their own code point, just as ord() gives them to the hash functions
+    lengths = numpy.fromiter(map(len, keys), dtype=numpy.int64,
+                             count=len(keys))
+    codes = numpy.frombuffer(
+        ''.join(keys).encode('utf-32-le', 'surrogatepass'),
+        dtype=numpy.uint32).astype(numpy.int64)
+    ends = numpy.cumsum(lengths)
+    starts = ends - lengths
+
+    if function is hash_function_2:
+        # weight each character by its 1-based position within its own key
+        positions = numpy.arange(codes.size) - numpy.repeat(starts, lengths)
+        codes = codes * (positions + 1)
+
+    # prefix sums let every key's total be read off with two lookups, which
+    # also handles empty keys correctly
+    totals = numpy.concatenate(([0], numpy.cumsum(codes)))
+    return (totals[ends] - totals[starts]).tolist()
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +156,19 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        The key's full hash can be cached on the node so it is never
+        recomputed when the node is looked up again or moved to a new bucket.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -119,6 +180,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -144,6 +207,8 @@ class LinkedList:
     Supported methods are: insert, remove, contains, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +233,31 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node at front of the list, caching the key's hash."""
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def insert_node(self, node: SLNode) -> None:
+        """
+        Link an existing node in at the front of the list.
+        Used to move nodes between lists without allocating new ones.
+        """
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If the key's hash is given, nodes with a different cached hash are
+        skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,28 +268,211 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If the key's hash is given, nodes with a different cached hash are
+        skipped without comparing keys.
+        """
         node = self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash and node.key == key:
                 return node
             node = node.next
         return node
 
+    def upsert(self, key: str, value: object, hash: int = None) -> bool:
+        """
+        Set the value of the node with matching key, or insert a new node at
+        the front of the list if there is none, walking the list once.
+        A node whose value is set keeps its place in the list.
+        Return True if a new node was inserted, False otherwise.
+        """
+        node = self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                node.value = value
+                return False
+            node = node.next
+
+        self.insert(key, value, hash)
+        return True
+
+    def setdefault(self, key: str, default: object, hash: int = None) -> tuple:
+        """
+        Return (node, inserted): the node with matching key, or a new node
+        with value default inserted at the front of the list if there is
+        none, walking the list once.
+        """
+        node = self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                return node, False
+            node = node.next
+
+        self.insert(key, default, hash)
+        return self._head, True
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
 
 
+def _node_key(node: SLNode) -> str:
+    """Return a node's key, for bisecting a SortedBucket."""
+    return node.key
+
+
+class SortedBucket:
+    """
+    Bucket for the SC HashMap holding its nodes in a list sorted by cached
+    hash, then by key, so a lookup is a binary search rather than a walk
+    down a chain. Used in place of a LinkedList for buckets whose chains
+    grow long. Nodes must have a cached hash.
+    Once two keys with the same hash can't be ordered (an int and a str,
+    say), the bucket stops ordering keys: nodes stay sorted by hash, and
+    the few nodes sharing the key's hash are compared by equality alone.
+    Supported methods are the same as LinkedList.
+    """
+
+    __slots__ = ('_hashes', '_nodes', '_ordered')
+
+    def __init__(self, nodes=()) -> None:
+        """
+        Initialize a new sorted bucket, optionally from existing nodes.
+        The nodes are reused rather than copied.
+        """
+        self._ordered = True
+        try:
+            self._nodes = sorted(nodes,
+                                 key=lambda node: (node.hash, node.key))
+        except TypeError:  # keys that can't be ordered
+            self._ordered = False
+            self._nodes = sorted(nodes, key=lambda node: node.hash)
+        self._hashes = [node.hash for node in self._nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SB [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """
+        Return an iterator over a copy of the nodes, in sorted order: by
+        hash, then by key unless the keys can't be ordered.
+        """
+        return iter(list(self._nodes))
+
+    def __sizeof__(self) -> int:
+        """Return the bytes used by the bucket and its two lists."""
+        return (object.__sizeof__(self) + getsizeof(self._hashes)
+                + getsizeof(self._nodes))
+
+    def _search(self, key: str, hash: int) -> tuple:
+        """
+        Return (index, found): the index of the node with matching key, or
+        of where it would be inserted, and whether it was found.
+        """
+        low = bisect_left(self._hashes, hash)
+        high = bisect_right(self._hashes, hash, low)
+        if self._ordered:
+            try:
+                index = bisect_left(self._nodes, key, low, high,
+                                    key=_node_key)
+                return index, index < high and self._nodes[index].key == key
+            except TypeError:  # from now on only compare keys for equality
+                self._ordered = False
+
+        for index in range(low, high):
+            if self._nodes[index].key == key:
+                return index, True
+        return high, False
+
+    def insert(self, key: str, value: object, hash: int) -> None:
+        """Insert a new node for a key that is not already in the bucket."""
+        self.insert_node(SLNode(key, value, None, hash))
+
+    def insert_node(self, node: SLNode) -> None:
+        """
+        Add an existing node in sorted position.
+        Used to move nodes between buckets without allocating new ones.
+        """
+        index, _ = self._search(node.key, node.hash)
+        node.next = None
+        self._hashes.insert(index, node.hash)
+        self._nodes.insert(index, node)
+
+    def remove(self, key: str, hash: int) -> bool:
+        """
+        Remove the node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        index, found = self._search(key, hash)
+        if found:
+            del self._hashes[index]
+            del self._nodes[index]
+        return found
+
+    def contains(self, key: str, hash: int) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        index, found = self._search(key, hash)
+        return self._nodes[index] if found else None
+
+    def upsert(self, key: str, value: object, hash: int) -> bool:
+        """
+        Set the value of the node with matching key, or insert a new node if
+        there is none, searching the bucket once.
+        Return True if a new node was inserted, False otherwise.
+        """
+        index, found = self._search(key, hash)
+        if found:
+            self._nodes[index].value = value
+            return False
+
+        self._hashes.insert(index, hash)
+        self._nodes.insert(index, SLNode(key, value, None, hash))
+        return True
+
+    def setdefault(self, key: str, default: object, hash: int) -> tuple:
+        """
+        Return (node, inserted): the node with matching key, or a new node
+        with value default if there is none, searching the bucket once.
+        """
+        index, found = self._search(key, hash)
+        if found:
+            return self._nodes[index], False
+
+        node = SLNode(key, default, None, hash)
+        self._hashes.insert(index, hash)
+        self._nodes.insert(index, node)
+        return node, True
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        The key's full hash can be cached on the entry so it is never
+        recomputed when the entry is probed or moved to a new table.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -221,3 +480,226 @@ class HashEntry:
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+# bucket states reported by the OA tables below
+EMPTY, LIVE, TOMBSTONE, MATCH = 0, 1, 2, 3
+
+# cached hashes are kept to 64 bits so they fit the compact table's array
+HASH_MASK = (1 << 64) - 1
+
+
+class EntryTable(DynamicArray):
+    """
+    Bucket array for the OA HashMap holding one HashEntry (or None) per
+    bucket. It is still a DynamicArray, so printing and indexing work as
+    before; the extra methods give the HashMap the same bucket-level API as
+    CompactTable.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, capacity: int = 0) -> None:
+        """Initialize a table of capacity empty buckets."""
+        super().__init__()
+        self._data = [None] * capacity
+
+    def new_table(self, capacity: int) -> "EntryTable":
+        """Return a new empty table of the same kind."""
+        return EntryTable(capacity)
+
+    def state(self, index: int) -> int:
+        """Return EMPTY, LIVE or TOMBSTONE for a bucket."""
+        entry = self._data[index]
+        if entry is None:
+            return EMPTY
+        return TOMBSTONE if entry.is_tombstone else LIVE
+
+    def check(self, index: int, key: str, key_hash: int) -> int:
+        """Return MATCH if the bucket holds key, otherwise its state."""
+        entry = self._data[index]
+        if entry is None:
+            return EMPTY
+        if entry.is_tombstone:
+            return TOMBSTONE
+        if entry.hash == key_hash and entry.key == key:
+            return MATCH
+        return LIVE
+
+    def hash_at(self, index: int) -> int:
+        """Return the cached hash of a live or tombstone bucket."""
+        return self._data[index].hash
+
+    def entry_at(self, index: int) -> tuple:
+        """Return (key, value, hash) of a live bucket."""
+        entry = self._data[index]
+        return entry.key, entry.value, entry.hash
+
+    def value_at(self, index: int) -> object:
+        """Return the value of a live bucket."""
+        return self._data[index].value
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value of a live bucket."""
+        self._data[index].value = value
+
+    def store(self, index: int, key: str, value: object,
+              key_hash: int) -> None:
+        """Make a bucket live with the given key, value and hash."""
+        entry = self._data[index]
+        if entry is None:
+            self._data[index] = HashEntry(key, value, key_hash)
+        else:  # reuse the tombstone or displaced entry
+            entry.key = key
+            entry.value = value
+            entry.hash = key_hash
+            entry.is_tombstone = False
+
+    def mark_tombstone(self, index: int) -> None:
+        """Turn a live bucket into a tombstone."""
+        self._data[index].is_tombstone = True
+
+    def clear_slot(self, index: int) -> None:
+        """Make a bucket empty."""
+        self._data[index] = None
+
+    def move(self, source: int, destination: int) -> None:
+        """Move a live bucket's contents to another bucket."""
+        self._data[destination] = self._data[source]
+
+    def memory_report(self) -> dict:
+        """
+        Return the bytes used by the bucket array, the HashEntry objects
+        (tombstones included) and the keys and values of live buckets.
+        """
+        report = {'buckets': getsizeof(self) + getsizeof(self._data),
+                  'nodes': 0, 'keys': 0, 'values': 0}
+        for entry in self._data:
+            if entry is not None:
+                report['nodes'] += getsizeof(entry)
+                if not entry.is_tombstone:
+                    report['keys'] += getsizeof(entry.key)
+                    report['values'] += getsizeof(entry.value)
+        return report
+
+
+class CompactTable:
+    """
+    Bucket array for the OA HashMap stored as parallel arrays instead of one
+    HashEntry object per bucket: a bytearray of bucket states, an array of
+    cached 64-bit hashes and plain lists of keys and values. This uses a
+    fraction of the memory of an EntryTable and keeps the states and hashes
+    checked on every probe next to each other in memory.
+
+    get_at_index() and [] return a HashEntry built from the bucket (or None),
+    so printing and iterating a HashMap look the same as with an EntryTable.
+    Changing such a HashEntry does not change the table.
+    """
+
+    __slots__ = ('_states', '_hashes', '_keys', '_values')
+
+    def __init__(self, capacity: int = 0) -> None:
+        """Initialize a table of capacity empty buckets."""
+        self._states = bytearray(capacity)
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return str([self.get_at_index(i) for i in range(self.length())])
+
+    def new_table(self, capacity: int) -> "CompactTable":
+        """Return a new empty table of the same kind."""
+        return CompactTable(capacity)
+
+    def length(self) -> int:
+        """Return the number of buckets."""
+        return len(self._states)
+
+    def get_at_index(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of a bucket, or None if it is empty."""
+        if index < 0 or index >= self.length():
+            raise DynamicArrayException
+        state = self._states[index]
+        if state == EMPTY:
+            return None
+        entry = HashEntry(self._keys[index], self._values[index],
+                          self._hashes[index])
+        entry.is_tombstone = state == TOMBSTONE
+        return entry
+
+    def __getitem__(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of a bucket using [] syntax."""
+        return self.get_at_index(index)
+
+    def state(self, index: int) -> int:
+        """Return EMPTY, LIVE or TOMBSTONE for a bucket."""
+        return self._states[index]
+
+    def check(self, index: int, key: str, key_hash: int) -> int:
+        """Return MATCH if the bucket holds key, otherwise its state."""
+        state = self._states[index]
+        if (state == LIVE and self._hashes[index] == key_hash
+                and self._keys[index] == key):
+            return MATCH
+        return state
+
+    def hash_at(self, index: int) -> int:
+        """Return the cached hash of a live or tombstone bucket."""
+        return self._hashes[index]
+
+    def entry_at(self, index: int) -> tuple:
+        """Return (key, value, hash) of a live bucket."""
+        return self._keys[index], self._values[index], self._hashes[index]
+
+    def value_at(self, index: int) -> object:
+        """Return the value of a live bucket."""
+        return self._values[index]
+
+    def set_value(self, index: int, value: object) -> None:
+        """Replace the value of a live bucket."""
+        self._values[index] = value
+
+    def store(self, index: int, key: str, value: object,
+              key_hash: int) -> None:
+        """Make a bucket live with the given key, value and hash."""
+        self._states[index] = LIVE
+        self._hashes[index] = key_hash
+        self._keys[index] = key
+        self._values[index] = value
+
+    def mark_tombstone(self, index: int) -> None:
+        """Turn a live bucket into a tombstone, dropping its key and value."""
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+
+    def clear_slot(self, index: int) -> None:
+        """Make a bucket empty."""
+        self._states[index] = EMPTY
+        self._keys[index] = None
+        self._values[index] = None
+
+    def move(self, source: int, destination: int) -> None:
+        """Move a live bucket's contents to another bucket."""
+        self._states[destination] = self._states[source]
+        self._hashes[destination] = self._hashes[source]
+        self._keys[destination] = self._keys[source]
+        self._values[destination] = self._values[source]
+
+    def memory_report(self) -> dict:
+        """
+        Return the bytes used by the parallel arrays (there are no per-bucket
+        objects) and by the keys and values of live buckets.
+        """
+        report = {'buckets': (getsizeof(self) + getsizeof(self._states)
+                              + getsizeof(self._hashes)
+                              + getsizeof(self._keys)
+                              + getsizeof(self._values)),
+                  'nodes': 0, 'keys': 0, 'values': 0}
+        for index, state in enumerate(self._states):
+            if state == LIVE:
+                report['keys'] += getsizeof(self._keys[index])
+                report['values'] += getsizeof(self._values[index])
+        return report
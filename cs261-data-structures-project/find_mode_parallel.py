@@ -0,0 +1,197 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  find_mode() split over worker processes, map-reduce style.
+# The values are cut into contiguous chunks; each worker counts one chunk in
+# its own HashMap and the counts are merged in chunk order with
+# HashMap.increment_many(). The workers never receive the values themselves:
+# find_mode_parallel() copies them once into shared memory and sends each
+# worker only index bounds, and find_mode_file() sends each worker the byte
+# offsets of its part of the file.
+#
+# Each worker returns its counts in the order its values first appeared, so
+# merging chunk by chunk adds keys to the final HashMap in exactly the order
+# find_mode() would. The merge makes one increment() per distinct value per
+# chunk rather than per value, so it can miss the last time find_mode()
+# grows the table; hash_map_sc.grow_as_counted() makes up for that from the
+# last value counted. Every bucket then ends up the same, so the modes come
+# out in the same order as from find_mode().
+#
+# The merge runs in this process and costs about one increment() per
+# distinct value per chunk, so by default there is one chunk per worker.
+# Inputs with few distinct values (log levels, status codes, hosts) scale
+# with the workers; inputs where most values are distinct are bounded by
+# the merge instead.
+
+import multiprocessing
+import os
+from array import array
+from itertools import accumulate
+from multiprocessing import shared_memory
+
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap, grow_as_counted, modes_of
+
+
+def _count(values, function) -> tuple:
+    """
+    Receives an iterable of values and a hash function then counts the
+    values in a HashMap and returns a list of (value, count) pairs in the
+    order each value first appeared, and the last value.
+    """
+    counts = HashMap(function=function)
+    first_seen = []
+    for value in values:
+        if counts.increment(value) == 1:
+            first_seen.append(value)
+
+    found = counts.get_many(first_seen)
+    return list(zip(first_seen, (found[index]
+                                 for index in range(found.length())))), value
+
+
+def _count_shared(task: tuple) -> tuple:
+    """
+    Runs in a worker. Receives (shared memory name, number of values, first
+    index, end index, hash function) then counts values [first, end) of the
+    encoded values in the shared memory block.
+    """
+    name, length, first, end, function = task
+    block = shared_memory.SharedMemory(name)
+    try:
+        offsets = block.buf[:8 * (length + 1)].cast('Q')
+        data = block.buf[8 * (length + 1):]
+        values = (str(data[offsets[index]:offsets[index + 1]], 'utf-8')
+                  for index in range(first, end))
+        counts = _count(values, function)
+        del offsets, data  # no views may be left for close()
+    finally:
+        block.close()
+    return counts
+
+
+def _count_lines(task: tuple) -> tuple:
+    """
+    Runs in a worker. Receives (file path, first byte, end byte, encoding,
+    hash function) then counts the lines in bytes [first, end) of the file,
+    which begin and end on line boundaries, without their line endings.
+    """
+    path, first, end, encoding, function = task
+    with open(path, 'rb') as file:
+        file.seek(first)
+
+        def lines():
+            remaining = end - first
+            while remaining > 0:
+                line = file.readline()
+                remaining -= len(line)
+                yield line.rstrip(b'\r\n').decode(encoding)
+
+        return _count(lines(), function)
+
+
+def _merge(tasks: list, worker, workers: int, function,
+           start_method: str) -> tuple[DynamicArray, int]:
+    """
+    Receives the worker tasks, the function that runs one, the number of
+    worker processes and the hash function then runs the tasks in a pool,
+    merges their counts in task order and returns the modes and their
+    count. Every task must have at least one value.
+    """
+    counts = HashMap(function=function)
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(workers) as pool:
+        # merge each chunk's counts as soon as it and every earlier one is in
+        for pairs, last_value in pool.imap(worker, tasks):
+            counts.increment_many(pairs)
+
+    grow_as_counted(counts, last_value)
+    return modes_of(counts)
+
+
+def _bounds(total: int, chunks: int) -> list:
+    """
+    Receives a total and a number of chunks then returns the (first, end)
+    bounds splitting range(total) into that many nearly equal chunks.
+    """
+    chunks = max(1, min(chunks, total))
+    cuts = [total * chunk // chunks for chunk in range(chunks + 1)]
+    return list(zip(cuts, cuts[1:]))
+
+
+def find_mode_parallel(values, workers: int = None, chunks: int = None,
+                       function: callable = hash_function_1,
+                       start_method: str = None) -> tuple[DynamicArray, int]:
+    """
+    Receives a DynamicArray, or any iterable, of strings then returns the
+    same (array of modes, count) tuple as find_mode(), counting with
+    workers processes (default: one per CPU) over chunks chunks (default:
+    one per worker).
+
+    The values are UTF-8 encoded once into a shared memory block, which the
+    workers read directly. Raises TypeError if a value isn't a string.
+    """
+    values = list(hash_map_sc._values_of(values))
+    if not values:
+        return DynamicArray(), 0
+    if not all(type(value) is str for value in values):
+        raise TypeError("find_mode_parallel() needs str values, use "
+                        "find_mode() for other types")
+
+    workers = workers or os.cpu_count()
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = array('Q', accumulate(map(len, encoded), initial=0))
+    data = b''.join(encoded)
+    del encoded
+
+    header = 8 * len(offsets)
+    block = shared_memory.SharedMemory(create=True,
+                                       size=max(1, header + len(data)))
+    try:
+        block.buf[:header] = offsets.tobytes()
+        block.buf[header:header + len(data)] = data
+        del data
+
+        tasks = [(block.name, len(values), first, end, function)
+                 for first, end in _bounds(len(values), chunks or workers)]
+        return _merge(tasks, _count_shared, workers, function, start_method)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def find_mode_file(path: str, workers: int = None, chunks: int = None,
+                   function: callable = hash_function_1,
+                   encoding: str = 'utf-8',
+                   start_method: str = None) -> tuple[DynamicArray, int]:
+    """
+    Receives the path of a file with one value per line then returns the
+    same (array of modes, count) tuple as find_mode() over its lines, with
+    their line endings removed, counting with workers processes (default:
+    one per CPU) over chunks chunks of the file (default: one per worker).
+
+    Each worker is given the byte offsets of its chunk and reads it from
+    the file itself, so the file is never loaded in this process.
+    """
+    workers = workers or os.cpu_count()
+    size = os.path.getsize(path)
+    if size == 0:
+        return DynamicArray(), 0
+
+    # move each cut forward to just after the next line ending, so chunks
+    # only ever hold whole lines
+    cuts = [0]
+    with open(path, 'rb') as file:
+        for first, _ in _bounds(size, chunks or workers)[1:]:
+            if first <= cuts[-1]:
+                continue
+            file.seek(first - 1)
+            file.readline()
+            if file.tell() < size:
+                cuts.append(file.tell())
+    cuts.append(size)
+
+    tasks = [(path, first, end, encoding, function)
+             for first, end in zip(cuts, cuts[1:]) if end > first]
+    return _merge(tasks, _count_lines, workers, function, start_method)
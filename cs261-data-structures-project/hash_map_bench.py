@@ -0,0 +1,1226 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Benchmarks for the HashMap implementations. Each benchmark is a
+# sub-command, e.g. `python3 hash_map_bench.py growth --keys 5000000`; use
+# `--help` on any sub-command to see its options.
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import multiprocessing
+import platform
+import random
+import resource
+import string
+import sys
+import tempfile
+import threading
+import time
+from array import array
+
+import hash_map_concurrent
+import hash_map_cuckoo
+import hash_map_disk
+import hash_map_oa
+import hash_map_sc
+import hash_map_sharded
+import hash_map_swiss
+from find_mode_parallel import find_mode_file, find_mode_parallel
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import analyze_distribution, fnv1a, mix64, siphash
+from probing import PROBING_STRATEGIES
+
+
+# hash functions that can be chosen with --hash. hash_function_1/2 collide a
+# lot on large key sets, so builtin hash() is the default wherever a benchmark
+# is about the table itself rather than the hash function.
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': fnv1a,
+    'siphash': siphash,
+    'mix64': mix64,
+    'builtin': hash,
+}
+
+
+# the second hash function the cuckoo HashMap is given for each --hash, one
+# that doesn't collide on the same keys
+CUCKOO_PARTNERS = {
+    'hash_function_1': hash_function_2,
+    'hash_function_2': hash_function_1,
+    'fnv1a': mix64,
+    'siphash': mix64,
+    'mix64': fnv1a,
+    'builtin': mix64,
+}
+
+
+KEY_DISTRIBUTIONS = ('sequential', 'random', 'anagram')
+
+
+def make_keys(distribution: str, count: int, seed: int = 0) -> list:
+    """
+    Returns a list of count unique string keys.
+    'sequential' keys look like 'str0', 'str1', ... as in the assignment
+    examples; 'random' keys are random 8 to 16 letter strings; 'anagram' keys
+    are all rearrangements of the same 11 letters, so hash_function_1 gives
+    every one of them the same hash.
+    """
+    if distribution == 'sequential':
+        return ['str' + str(i) for i in range(count)]
+
+    if distribution == 'anagram':
+        return [''.join(letters) for letters in itertools.islice(
+            itertools.permutations('abcdefghijk'), count)]
+
+    rng = random.Random(seed)
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choices(string.ascii_letters,
+                                     k=rng.randint(8, 16))))
+    return list(keys)
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of this process so far, in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # reported in bytes rather than kilobytes
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+
+def current_rss_mb() -> float:
+    """
+    Returns the current resident set size of this process in megabytes, or
+    the peak if the current value can't be read on this platform.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        return peak_rss_mb()
+    return pages * resource.getpagesize() / 2 ** 20
+
+
+# ------------------- GROWTH ------------------------------------------------ #
+
+def bench_growth(args) -> None:
+    """
+    Grows a separate chaining HashMap from empty to args.keys entries one put()
+    at a time. Prints a row for every resize with the time that put() took
+    (which is almost entirely the resize) and the memory in use afterwards,
+    then a summary with total wall time and peak RSS. With args.reserve the
+    map reserves room for every key first, so no put() resizes it.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    m = hash_map_sc.HashMap(args.capacity, function)
+    if args.reserve:
+        m.reserve(args.keys)
+
+    print(f"{'size':>10} {'capacity':>10} {'resize ms':>10} "
+          f"{'rss MB':>9} {'peak MB':>9}")
+
+    clock = time.perf_counter
+    resize_total = 0.0
+    start = clock()
+    for i in range(args.keys):
+        capacity = m.get_capacity()
+        before = clock()
+        m.put('str' + str(i), i)
+        elapsed = clock() - before
+
+        if m.get_capacity() != capacity:  # this put() resized the table
+            resize_total += elapsed
+            print(f"{m.get_size():>10} {m.get_capacity():>10} "
+                  f"{elapsed * 1000:>10.1f} {current_rss_mb():>9.1f} "
+                  f"{peak_rss_mb():>9.1f}")
+    total = clock() - start
+
+    print(f"\n{args.keys} keys in {total:.2f}s, {resize_total:.2f}s of it "
+          f"resizing; peak RSS {peak_rss_mb():.1f} MB")
+
+
+# ------------------- PROBING ----------------------------------------------- #
+
+def bench_probing(args) -> None:
+    """
+    Fills one OA HashMap per probing strategy with the same keys, then
+    reports mean and max probe lengths for hits and for misses along with
+    the time per get().
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    keys = make_keys(args.keys_from, args.keys)
+    missing = make_keys('random', args.keys, seed=1)
+    missing = [key + '!' for key in missing]  # can never be a stored key
+
+    print(f"{'strategy':<12} {'capacity':>9} {'load':>5} {'build s':>8} "
+          f"{'hit avg':>8} {'hit max':>8} {'miss avg':>9} {'miss max':>9} "
+          f"{'get us':>7}")
+
+    for name in args.strategies:
+        m = hash_map_oa.HashMap(args.capacity, function, name,
+                                compact=args.compact)
+        start = time.perf_counter()
+        for i, key in enumerate(keys):
+            m.put(key, i)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in keys:
+            m.get(key)
+        for key in missing:
+            m.get(key)
+        per_get = (time.perf_counter() - start) / (2 * len(keys))
+
+        hits = [m._probe_length(key)[1] for key in keys]
+        misses = [m._probe_length(key)[1] for key in missing]
+        print(f"{name:<12} {m.get_capacity():>9} {m.table_load():>5.2f} "
+              f"{build:>8.2f} {sum(hits) / len(hits):>8.2f} {max(hits):>8} "
+              f"{sum(misses) / len(misses):>9.2f} {max(misses):>9} "
+              f"{per_get * 1e6:>7.2f}")
+
+
+# ------------------- CHURN ------------------------------------------------- #
+
+# (label, probing, deletion, tombstone_threshold) for the churn benchmark
+CHURN_CONFIGS = (
+    ('quadratic/tombstone', 'quadratic', 'tombstone', None),
+    ('quadratic/purge', 'quadratic', 'tombstone', 0.2),
+    ('linear/tombstone', 'linear', 'tombstone', None),
+    ('linear/shift', 'linear', 'backward_shift', None),
+    ('robin_hood/tombstone', 'robin_hood', 'tombstone', None),
+    ('robin_hood/shift', 'robin_hood', 'backward_shift', None),
+)
+
+
+def bench_churn(args) -> None:
+    """
+    Keeps a steady working set of args.keys entries in OA HashMaps using each
+    deletion scheme while doing 50/50 put/remove churn. After each round of
+    args.ops operations it reports the tombstone count, mean probe lengths
+    for sampled hits and misses, and the time per get() for those lookups.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    rng = random.Random(args.seed)
+    missing = [key + '!' for key in make_keys('random', args.sample, 1)]
+
+    print(f"{'scheme':<21} {'round':>5} {'tombstones':>10} {'hit avg':>8} "
+          f"{'miss avg':>9} {'get us':>7}")
+
+    for label, probing, deletion, threshold in CHURN_CONFIGS:
+        m = hash_map_oa.HashMap(args.capacity, function, probing,
+                                tombstone_threshold=threshold,
+                                deletion=deletion, compact=args.compact)
+        live = make_keys('random', args.keys, args.seed)
+        m.put_many((key, None) for key in live)
+        next_key = 0
+
+        for churn_round in range(1, args.rounds + 1):
+            for _ in range(args.ops):
+                if rng.random() < 0.5:  # remove a random live key
+                    index = rng.randrange(len(live))
+                    live[index], live[-1] = live[-1], live[index]
+                    m.remove(live.pop())
+                else:  # put a brand new key
+                    key = 'new' + str(next_key)
+                    next_key += 1
+                    m.put(key, None)
+                    live.append(key)
+
+            hits = rng.sample(live, min(args.sample, len(live)))
+            start = time.perf_counter()
+            for key in hits:
+                m.get(key)
+            for key in missing:
+                m.get(key)
+            per_get = ((time.perf_counter() - start)
+                       / (len(hits) + len(missing)))
+
+            hit_avg = sum(m._probe_length(key)[1] for key in hits) / len(hits)
+            miss_avg = (sum(m._probe_length(key)[1] for key in missing)
+                        / len(missing))
+            print(f"{label:<21} {churn_round:>5} "
+                  f"{m.get_tombstone_count():>10} {hit_avg:>8.2f} "
+                  f"{miss_avg:>9.2f} {per_get * 1e6:>7.2f}")
+
+
+# ------------------- LATENCY ----------------------------------------------- #
+
+def percentile(samples: list, fraction: float) -> float:
+    """
+    Receives a sorted list of samples then returns the sample below which the
+    given fraction of them fall (nearest rank).
+    """
+    return samples[min(int(fraction * len(samples)), len(samples) - 1)]
+
+
+def bench_latency(args) -> None:
+    """
+    Grows SC and OA HashMaps from empty to args.keys entries, once rehashing
+    all at once on resize and once with incremental resizing, timing every
+    put(). Reports the median, p99, p999 and worst put() latency and the
+    total time for each.
+
+    Python's cyclic garbage collector also causes long pauses as the map
+    grows; args.no_gc turns it off while timing so only resizes show up.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    keys = make_keys(args.keys_from, args.keys)
+
+    print(f"{'map':<4} {'resize':<12} {'p50 us':>8} {'p99 us':>8} "
+          f"{'p999 us':>8} {'max ms':>8} {'total s':>8}")
+
+    # each map's own default step unless one is given
+    step = {} if args.resize_step is None else {'resize_step':
+                                                args.resize_step}
+    clock = time.perf_counter
+    for name in args.maps:
+        for incremental in (False, True):
+            if name == 'sc':
+                m = hash_map_sc.HashMap(args.capacity, function, incremental,
+                                        **step)
+            else:
+                m = hash_map_oa.HashMap(args.capacity, function,
+                                        compact=args.compact,
+                                        incremental=incremental, **step)
+
+            latencies = []
+            if args.no_gc:
+                gc.disable()
+            start = clock()
+            for i, key in enumerate(keys):
+                before = clock()
+                m.put(key, i)
+                latencies.append(clock() - before)
+            total = clock() - start
+            gc.enable()
+
+            latencies.sort()
+            label = 'incremental' if incremental else 'all at once'
+            print(f"{name:<4} {label:<12} "
+                  f"{percentile(latencies, 0.5) * 1e6:>8.2f} "
+                  f"{percentile(latencies, 0.99) * 1e6:>8.2f} "
+                  f"{percentile(latencies, 0.999) * 1e6:>8.2f} "
+                  f"{latencies[-1] * 1e3:>8.1f} {total:>8.2f}")
+
+
+# ------------------- HASHES ------------------------------------------------ #
+
+def bench_hashes(args) -> None:
+    """
+    Hashes the same keys with each hash function, reporting the time per
+    hash and how evenly the keys spread over a table (see
+    hash_functions.analyze_distribution).
+    """
+    keys = make_keys(args.keys_from, args.keys)
+
+    print(f"{'function':<16} {'hash ns':>8} {'variance':>9} {'ideal':>6} "
+          f"{'max chain':>9} {'probe avg':>9} {'probe max':>9}")
+
+    for name in args.functions:
+        function = HASH_FUNCTIONS[name]
+        start = time.perf_counter()
+        for key in keys:
+            function(key)
+        per_hash = (time.perf_counter() - start) / len(keys)
+
+        report = analyze_distribution(function, keys, args.capacity)
+        print(f"{name:<16} {per_hash * 1e9:>8.0f} {report['variance']:>9.2f} "
+              f"{report['ideal_variance']:>6.2f} {report['max_chain']:>9} "
+              f"{report['mean_probe']:>9.2f} {report['max_probe']:>9}")
+
+
+# ------------------- SUITE ------------------------------------------------- #
+
+# fraction of (get, put, remove) operations in each workload mix
+WORKLOAD_MIXES = {
+    'read': (0.90, 0.08, 0.02),
+    'write': (0.20, 0.70, 0.10),
+    'delete': (0.40, 0.30, 0.30),
+}
+
+# results that get worse as they go up rather than down, for compare
+LOWER_IS_BETTER = ('p50_us', 'p99_us', 'p999_us', 'peak_rss_mb',
+                   'stash_share')
+HIGHER_IS_BETTER = ('build_ops_per_sec', 'ops_per_sec')
+
+# the fields that identify a suite case, in the order they are printed
+CASE_FIELDS = ('map', 'distribution', 'size', 'hash', 'capacity', 'mix')
+
+
+class DictMap:
+    """
+    The HashMap put/get/remove methods over a builtin dict, so dict can run
+    the same workloads as the HashMaps.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty dict and bind its methods."""
+        self._dict = {}
+        self.put = self._dict.__setitem__
+        self.get = self._dict.get
+
+    def remove(self, key: str) -> None:
+        """Remove the key if it is present."""
+        self._dict.pop(key, None)
+
+
+def suite_cases(args) -> list:
+    """
+    Returns the list of cases to run for the suite's command line arguments:
+    every combination of map, key distribution, size, hash function, initial
+    capacity and workload mix. dict ignores the hash function and capacity,
+    so it only gets one case for each of the other combinations.
+    """
+    cases = []
+    for name, distribution, size, hash_name, capacity, mix in (
+            itertools.product(args.maps, args.distributions, args.sizes,
+                              args.hashes, args.capacities, args.mixes)):
+        if name == 'dict':
+            if hash_name != args.hashes[0] or capacity != args.capacities[0]:
+                continue
+            hash_name, capacity = None, None
+        cases.append(dict(zip(CASE_FIELDS, (name, distribution, size,
+                                            hash_name, capacity, mix))))
+    return cases
+
+
+def run_case(case: dict, ops: int, seed: int) -> dict:
+    """
+    Runs one suite case: fills a map with case['size'] keys, timing the
+    puts, then runs ops operations of the case's workload mix over those keys
+    and half as many again that start out missing, timing each one. Returns
+    the case with its ops/sec, latency percentiles and peak RSS added, and
+    for the cuckoo HashMap the share of its keys left in the stash, which
+    each cost a stash search on top of the two bucket probes.
+
+    Meant to be run in a fresh process so the peak RSS is for this case only.
+    """
+    if case['map'] == 'sc':
+        m = hash_map_sc.HashMap(case['capacity'],
+                                HASH_FUNCTIONS[case['hash']])
+    elif case['map'] == 'oa':
+        m = hash_map_oa.HashMap(case['capacity'],
+                                HASH_FUNCTIONS[case['hash']])
+    elif case['map'] == 'cuckoo':
+        m = hash_map_cuckoo.HashMap(case['capacity'],
+                                    HASH_FUNCTIONS[case['hash']],
+                                    CUCKOO_PARTNERS[case['hash']])
+    else:
+        m = DictMap()
+
+    size = case['size']
+    keys = make_keys(case['distribution'], size + size // 2, seed)
+    put, get, remove = m.put, m.get, m.remove
+
+    clock = time.perf_counter
+    gc.collect()
+    start = clock()
+    for i in range(size):
+        put(keys[i], i)
+    build = clock() - start
+
+    # choose every operation up front so only the map calls are timed
+    rng = random.Random(seed)
+    gets, puts, _ = WORKLOAD_MIXES[case['mix']]
+    operations = []
+    for i in range(ops):
+        choice = rng.random()
+        method = get if choice < gets else put if choice < gets + puts \
+            else remove
+        operations.append((method, keys[rng.randrange(len(keys))]))
+
+    latencies = array('d')
+    gc.collect()
+    start = clock()
+    for i, (method, key) in enumerate(operations):
+        before = clock()
+        if method is put:
+            put(key, i)
+        else:
+            method(key)
+        latencies.append(clock() - before)
+    total = clock() - start
+
+    latencies = sorted(latencies)
+    result = dict(case)
+    result.update({
+        'build_ops_per_sec': size / build if build else None,
+        'ops_per_sec': ops / total if total else None,
+        'p50_us': percentile(latencies, 0.5) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6,
+        'p999_us': percentile(latencies, 0.999) * 1e6,
+        'peak_rss_mb': peak_rss_mb(),
+        'stash_share': (m.get_stash_size() / m.get_size()
+                        if case['map'] == 'cuckoo' and m.get_size() else None),
+    })
+    return result
+
+
+def case_label(case: dict) -> str:
+    """Returns a short label naming a suite case."""
+    return ' '.join(str(case[field]) for field in CASE_FIELDS
+                    if case[field] is not None)
+
+
+def bench_suite(args) -> None:
+    """
+    Runs every suite case (see suite_cases) in its own process, printing a
+    line per case, then writes all of the results and details of this
+    machine and run to args.output as JSON.
+    """
+    cases = suite_cases(args)
+    results = []
+
+    print(f"{'case':<48} {'build/s':>10} {'ops/s':>10} {'p50 us':>7} "
+          f"{'p99 us':>7} {'p999 us':>8} {'rss MB':>7} {'stash':>6}")
+
+    # a new process for every case keeps the peak RSS of one case from
+    # hiding the next, and no case is slowed by garbage left by the last
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for case in cases:
+            result = pool.apply(run_case, (case, args.ops, args.seed))
+            results.append(result)
+            stash = result['stash_share']
+            stash = '-' if stash is None else f"{stash:.1%}"
+            print(f"{case_label(result):<48} "
+                  f"{result['build_ops_per_sec']:>10.0f} "
+                  f"{result['ops_per_sec']:>10.0f} {result['p50_us']:>7.2f} "
+                  f"{result['p99_us']:>7.2f} {result['p999_us']:>8.2f} "
+                  f"{result['peak_rss_mb']:>7.1f} {stash:>6}", flush=True)
+
+    run = {
+        'python': sys.version,
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ops': args.ops,
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(run, output, indent=2)
+    print(f"\n{len(results)} cases written to {args.output}")
+
+
+def bench_compare(args) -> int:
+    """
+    Compares two suite runs case by case, printing the change in every
+    result. A change for the worse of more than args.threshold (a fraction)
+    is flagged as a regression. Returns 1 if there were any, otherwise 0.
+    """
+    with open(args.baseline) as baseline, open(args.current) as current:
+        before = {case_label(result): result
+                  for result in json.load(baseline)['results']}
+        after = {case_label(result): result
+                 for result in json.load(current)['results']}
+
+    regressions = 0
+    for label in [label for label in after if label in before]:
+        changes = []
+        for field in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            # runs from before a field was added don't have it
+            old, new = before[label].get(field), after[label].get(field)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if field in HIGHER_IS_BETTER else change
+            flag = ''
+            if worse > args.threshold:
+                flag = ' REGRESSION'
+                regressions += 1
+            changes.append(f"  {field:<18} {old:>12.2f} -> {new:>12.2f} "
+                           f"{change:>+8.1%}{flag}")
+        print(label)
+        print('\n'.join(changes))
+
+    for label in sorted(before.keys() - after.keys()):
+        print(f"{label}\n  only in {args.baseline}")
+    for label in sorted(after.keys() - before.keys()):
+        print(f"{label}\n  only in {args.current}")
+
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+# ------------------- THREADS ----------------------------------------------- #
+
+class GlobalLockMap:
+    """
+    A HashMap with one lock held around every call, the way a plain HashMap
+    has to be shared between threads.
+    """
+
+    def __init__(self, hash_map) -> None:
+        """Initialize the wrapper around hash_map."""
+        self._map = hash_map
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        """Put the key/value pair while holding the lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        """Get the key's value while holding the lock."""
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key: str) -> None:
+        """Remove the key while holding the lock."""
+        with self._lock:
+            self._map.remove(key)
+
+    def get_size(self) -> int:
+        """Return the size of the map while holding the lock."""
+        with self._lock:
+            return self._map.get_size()
+
+
+def thread_worker(m, thread: int, shared: list, args, start: threading.Barrier,
+                  results: list) -> None:
+    """
+    Runs args.ops operations of the args.mix workload on m from one thread.
+    Gets read the shared keys, whose values never change, and count any
+    wrong value as an error. Puts and removes only touch this thread's own
+    keys, tracked in a dict so they can be checked once every thread is
+    done. Stores (own keys dict, errors) in results[thread].
+    """
+    rng = random.Random(args.seed + thread)
+    gets, puts, _ = WORKLOAD_MIXES[args.mix]
+    own, errors = {}, 0
+    own_keys = [f"t{thread}-{i}" for i in range(max(args.keys // 10, 1))]
+
+    start.wait()
+    for i in range(args.ops):
+        choice = rng.random()
+        if choice < gets:
+            index = rng.randrange(len(shared))
+            if m.get(shared[index]) != index:
+                errors += 1
+        elif choice < gets + puts:
+            key = own_keys[rng.randrange(len(own_keys))]
+            m.put(key, i)
+            own[key] = i
+        else:
+            key = own_keys[rng.randrange(len(own_keys))]
+            m.remove(key)
+            own.pop(key, None)
+
+    results[thread] = (own, errors)
+
+
+def bench_threads(args) -> None:
+    """
+    Runs the same multi-threaded workload against a HashMap behind one
+    global lock and against a ConcurrentHashMap, for each thread count,
+    and reports total ops/sec. Afterwards every map is checked against
+    what the threads did: reads that saw a wrong value and keys that are
+    missing, wrong or extra are counted as errors.
+
+    With the GIL only one thread runs Python code at a time, so the locking
+    scheme matters most on a free-threaded build, where threads really do
+    run at once.
+    """
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"Python {platform.python_version()}, "
+          f"{'GIL enabled' if gil else 'free-threaded'}\n")
+    print(f"{'map':<12} {'threads':>7} {'ops/s':>10} {'errors':>7}")
+
+    function = HASH_FUNCTIONS[args.hash]
+    shared = make_keys('sequential', args.keys)
+    for name in ('global-lock', 'striped'):
+        for count in args.threads:
+            if name == 'striped':
+                m = hash_map_concurrent.ConcurrentHashMap(
+                    args.capacity, function, args.stripes)
+            else:
+                m = GlobalLockMap(hash_map_sc.HashMap(args.capacity, function))
+            for i, key in enumerate(shared):
+                m.put(key, i)
+
+            start = threading.Barrier(count + 1)
+            results = [None] * count
+            threads = [threading.Thread(target=thread_worker,
+                                        args=(m, thread, shared, args, start,
+                                              results))
+                       for thread in range(count)]
+            for thread in threads:
+                thread.start()
+            start.wait()
+            began = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - began
+
+            # check the final contents against every thread's own record
+            errors = sum(thread_errors for _, thread_errors in results)
+            expected = len(shared)
+            for own, _ in results:
+                expected += len(own)
+                errors += sum(m.get(key) != value for key, value in own.items())
+            errors += sum(m.get(key) != i for i, key in enumerate(shared))
+            errors += abs(m.get_size() - expected)
+
+            print(f"{name:<12} {count:>7} "
+                  f"{count * args.ops / elapsed:>10.0f} {errors:>7}")
+
+
+# ------------------- SHARDS ------------------------------------------------ #
+
+def bench_shards(args) -> None:
+    """
+    Loads args.keys keys into a ShardedHashMap with put_many() and reads
+    them back with get_many(), args.batch keys per call, for each shard
+    count, and reports ops/sec for both. The same batches through a plain
+    HashMap in this process are timed first for comparison. Any value read
+    back wrong is counted as an error.
+
+    Every batch is split up, pickled and sent by this process, so a shard
+    count only pays off once the work a shard does on its part of a batch
+    outweighs the cost of sending it.
+    """
+    print(f"{multiprocessing.cpu_count()} CPUs, {args.keys} keys, "
+          f"batches of {args.batch}\n")
+    print(f"{'map':<8} {'shards':>6} {'put ops/s':>10} {'get ops/s':>10} "
+          f"{'errors':>7}")
+
+    function = HASH_FUNCTIONS[args.hash]
+    keys = make_keys(args.keys_from, args.keys, args.seed)
+    batches = [list(range(start, min(start + args.batch, len(keys))))
+               for start in range(0, len(keys), args.batch)]
+    modules = {'sc': hash_map_sc, 'oa': hash_map_oa}
+
+    for count in [0] + args.shards:
+        if count:
+            m = hash_map_sharded.ShardedHashMap(count, args.map, args.capacity,
+                                                function)
+        else:
+            m = modules[args.map].HashMap(args.capacity, function)
+
+        began = time.perf_counter()
+        for batch in batches:
+            m.put_many([(keys[i], i) for i in batch])
+        put_seconds = time.perf_counter() - began
+
+        errors = 0
+        began = time.perf_counter()
+        for batch in batches:
+            values = m.get_many([keys[i] for i in batch])
+            errors += sum(values[j] != i for j, i in enumerate(batch))
+        get_seconds = time.perf_counter() - began
+        errors += abs(m.get_size() - len(keys))
+
+        if count:
+            m.close()
+        print(f"{'sharded' if count else 'local':<8} {count or 1:>6} "
+              f"{len(keys) / put_seconds:>10.0f} "
+              f"{len(keys) / get_seconds:>10.0f} {errors:>7}")
+
+
+# ------------------- SNAPSHOT ---------------------------------------------- #
+
+def bench_snapshot(args) -> None:
+    """
+    Builds an OA HashMap of args.keys keys, saves a snapshot of it and
+    compares rebuilding the map with put_many() against loading the
+    snapshot. Also times args.gets lookups served from the mapped file and
+    the first put() after loading, which copies the table into memory.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    keys = make_keys(args.keys_from, args.keys, args.seed)
+    pairs = [(key, i) for i, key in enumerate(keys)]
+
+    began = time.perf_counter()
+    m = hash_map_oa.HashMap(args.capacity, function, compact=args.compact)
+    m.put_many(pairs)
+    rebuild_seconds = time.perf_counter() - began
+
+    path = args.path or os.path.join(tempfile.gettempdir(),
+                                     'hash_map_snapshot.bin')
+    began = time.perf_counter()
+    m.save(path)
+    save_seconds = time.perf_counter() - began
+    del m
+
+    began = time.perf_counter()
+    m = hash_map_oa.HashMap.load(path)
+    load_seconds = time.perf_counter() - began
+
+    rng = random.Random(args.seed)
+    lookups = [rng.randrange(len(keys)) for _ in range(args.gets)]
+    began = time.perf_counter()
+    errors = sum(m.get(keys[i]) != i for i in lookups)
+    get_seconds = time.perf_counter() - began
+
+    began = time.perf_counter()
+    m.put('snapshot-bench', -1)
+    materialize_seconds = time.perf_counter() - began
+
+    print(f"{args.keys} keys, snapshot {os.path.getsize(path) / 2 ** 20:.1f} "
+          f"MB at {path}\n")
+    print(f"rebuild with put_many  {rebuild_seconds:>9.3f} s")
+    print(f"save                   {save_seconds:>9.3f} s")
+    print(f"load                   {load_seconds:>9.3f} s")
+    print(f"{f'{args.gets} mapped gets':<22} {get_seconds:>9.3f} s "
+          f"({errors} errors)")
+    print(f"first put (copy)       {materialize_seconds:>9.3f} s")
+    if not args.keep:
+        os.remove(path)
+
+
+# ------------------- DISK -------------------------------------------------- #
+
+def bench_disk(args) -> None:
+    """
+    Fills a DiskHashMap with args.keys keys of args.value_bytes byte values,
+    overwrites args.overwrite of them to give compaction something to do,
+    then times args.gets random get() calls.
+
+    To see reads from a data set larger than memory, run it under a memory
+    limit about a quarter of the data size, e.g. on a systemd machine
+        systemd-run --user --scope -p MemoryMax=256M \\
+            python3 hash_map_bench.py disk --keys 1000000 --value-bytes 1000
+    so the page cache can only ever hold part of the slot file and logs.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    rng = random.Random(args.seed)
+    directory = args.directory or tempfile.mkdtemp(prefix='hash_map_disk')
+
+    # only ever delete a DiskHashMap's own files, never anything else the
+    # given directory holds
+    files = {hash_map_disk.SLOT_FILE, hash_map_disk.META_FILE,
+             *hash_map_disk.LOG_FILES}
+    if os.path.isdir(directory):
+        found = set(os.listdir(directory))
+        if not found <= files:
+            raise SystemExit(f"{directory} holds files other than a "
+                             f"DiskHashMap's, refusing to overwrite it")
+        for name in found:
+            os.remove(os.path.join(directory, name))
+    m = hash_map_disk.DiskHashMap(directory, args.capacity, function)
+
+    began = time.perf_counter()
+    for i in range(args.keys):
+        m.put(i, rng.randbytes(args.value_bytes))
+    put_seconds = time.perf_counter() - began
+
+    began = time.perf_counter()
+    for i in rng.sample(range(args.keys), int(args.keys * args.overwrite)):
+        m.put(i, rng.randbytes(args.value_bytes))
+    m.compact()
+    overwrite_seconds = time.perf_counter() - began
+
+    began = time.perf_counter()
+    errors = 0
+    for _ in range(args.gets):
+        value = m.get(rng.randrange(args.keys))
+        errors += value is None or len(value) != args.value_bytes
+    get_seconds = time.perf_counter() - began
+
+    data_mb = sum(os.path.getsize(os.path.join(directory, name))
+                  for name in os.listdir(directory)) / 2 ** 20
+    print(f"{args.keys} keys, {data_mb:.1f} MB on disk in {directory}, "
+          f"peak RSS {peak_rss_mb():.1f} MB\n")
+    print(f"put          {args.keys / put_seconds:>10.0f} ops/s")
+    overwrites = int(args.keys * args.overwrite)
+    print(f"overwrite    {overwrites / overwrite_seconds:>10.0f} ops/s "
+          f"(with compaction)")
+    print(f"random get   {args.gets / get_seconds:>10.0f} ops/s "
+          f"({errors} errors)")
+
+    m.close()
+    if not args.keep:
+        for name in files & set(os.listdir(directory)):
+            os.remove(os.path.join(directory, name))
+        if not args.directory:
+            os.rmdir(directory)
+
+
+# ------------------- COUNTING ---------------------------------------------- #
+
+def bench_counting(args) -> None:
+    """
+    Counts a stream of args.values values drawn from args.distinct distinct
+    ones, half of the draws from the 10 most common, first with a get() then
+    a put() per value as find_mode() used to, then with one increment() per
+    value, for both HashMaps. Then finds the 10 most frequent values with
+    top_k(), exactly and in Space-Saving mode holding args.capacity values,
+    and reports how far the approximate counts are from the true ones.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    rng = random.Random(args.seed)
+    stream = [f"v{rng.randrange(10)}" if rng.random() < 0.5
+              else f"v{rng.randrange(args.distinct)}"
+              for _ in range(args.values)]
+
+    print(f"{'map':<4} {'get+put s':>10} {'increment s':>12}")
+    for name, module in (('sc', hash_map_sc), ('oa', hash_map_oa)):
+        m = module.HashMap(11, function)
+        began = time.perf_counter()
+        for value in stream:
+            count = m.get(value)
+            m.put(value, count + 1 if count else 1)
+        get_put = time.perf_counter() - began
+
+        m = module.HashMap(11, function)
+        began = time.perf_counter()
+        for value in stream:
+            m.increment(value)
+        increment = time.perf_counter() - began
+        print(f"{name:<4} {get_put:>10.2f} {increment:>12.2f}")
+
+    began = time.perf_counter()
+    exact = hash_map_sc.top_k(stream, 10, function=function)
+    exact_seconds = time.perf_counter() - began
+    began = time.perf_counter()
+    approximate = hash_map_sc.top_k(iter(stream), 10, args.capacity, function)
+    approximate_seconds = time.perf_counter() - began
+
+    counts = dict(exact[i] for i in range(exact.length()))
+    found = [approximate[i] for i in range(approximate.length())]
+    over = [count - counts[value] for value, count in found
+            if value in counts]
+    print(f"\ntop_k exact        {exact_seconds:>6.2f}s")
+    print(f"top_k capacity {args.capacity:<4}{approximate_seconds:>6.2f}s, "
+          f"{len(over)} of 10 found, counts over by at most "
+          f"{max(over, default=0)} (bound {args.values // args.capacity})")
+
+
+# ------------------- MODE -------------------------------------------------- #
+
+def bench_mode(args) -> None:
+    """
+    Times find_mode() over args.values values drawn from args.distinct
+    distinct ones, one at a time and as a DynamicArray (counted with NumPy
+    when it is installed), then find_mode_parallel() on the same values and
+    find_mode_file() on them written one per line to a temporary file, with
+    each number of workers in args.workers. Every result is checked against
+    find_mode()'s.
+    """
+    rng = random.Random(args.seed)
+    values = [f"v{rng.randrange(args.distinct)}" for _ in range(args.values)]
+
+    began = time.perf_counter()
+    modes, count = hash_map_sc.find_mode(values)
+    serial = time.perf_counter() - began
+    expected = ([modes[i] for i in range(modes.length())], count)
+    print(f"find_mode: {serial:.2f}s on {os.cpu_count()} CPUs")
+
+    began = time.perf_counter()
+    modes, count = hash_map_sc.find_mode(DynamicArray(values))
+    elapsed = time.perf_counter() - began
+    if ([modes[i] for i in range(modes.length())], count) != expected:
+        raise AssertionError("find_mode disagrees on a DynamicArray")
+    print(f"find_mode on a DynamicArray: {elapsed:.2f}s\n")
+
+    file, path = tempfile.mkstemp(prefix='hash_map_mode')
+    with os.fdopen(file, 'w') as file:
+        file.write('\n'.join(values))
+
+    print(f"{'workers':>7} {'shared s':>9} {'speedup':>8} {'file s':>7} "
+          f"{'speedup':>8}")
+    try:
+        for workers in args.workers:
+            row = f"{workers:>7}"
+            for run, source in ((find_mode_parallel, values),
+                                (find_mode_file, path)):
+                began = time.perf_counter()
+                modes, count = run(source, workers)
+                elapsed = time.perf_counter() - began
+                if ([modes[i] for i in range(modes.length())],
+                        count) != expected:
+                    raise AssertionError(f"{run.__name__} with {workers} "
+                                         f"workers disagrees with find_mode")
+                row += f" {elapsed:>8.2f} {serial / elapsed:>8.2f}"
+            print(row)
+    finally:
+        os.unlink(path)
+
+
+# ------------------- SWISS ------------------------------------------------- #
+
+def bench_swiss(args) -> None:
+    """
+    Fills the Swiss table HashMap and the triangular probing OA HashMap to
+    each table load in args.loads, both with 2 ** args.size buckets, then
+    times get() of every key, get() of as many missing keys, and
+    contains_many() of the missing keys, and reports how many buckets a
+    lookup compares the key with. The OA HashMap grows at load 0.5, so it is
+    filled past that with _insert(), which doesn't check the load.
+    Triangular probing over a power of two table visits every bucket, so
+    every key finds a free one at any load below 1; quadratic probing over
+    a prime table is only sure to below 0.5.
+    """
+    function = HASH_FUNCTIONS[args.hash]
+    buckets = 2 ** args.size
+    keys = make_keys(args.keys_from, int(buckets * max(args.loads)) * 2,
+                     args.seed)
+    random.Random(args.seed).shuffle(keys)
+
+    print(f"{'load':>5} {'map':<5} {'hit ops/s':>10} {'miss ops/s':>11} "
+          f"{'batch miss ops/s':>17} {'hit probes':>11} "
+          f"{'miss probes':>12}")
+    for load in args.loads:
+        count = int(buckets * load)
+        present, missing = keys[:count], keys[-count:]
+
+        swiss = hash_map_swiss.HashMap(buckets, function,
+                                       max(load, 0.875))
+        swiss.put_many((key, i) for i, key in enumerate(present))
+        oa = hash_map_oa.HashMap(buckets, function, probing='triangular')
+        for i, key in enumerate(present):
+            oa._insert(key, i, oa._hash(key))
+
+        for name, m in (('swiss', swiss), ('oa', oa)):
+            rates = []
+            for run in ((lambda: [m.get(key) for key in present]),
+                        (lambda: [m.get(key) for key in missing]),
+                        (lambda: m.contains_many(missing))):
+                began = time.perf_counter()
+                run()
+                rates.append(count / (time.perf_counter() - began))
+
+            # keys put in early met an emptier table, so sample them all
+            step = max(1, count // args.sample)
+            hits = [m._probe_length(key)[1] for key in present[::step]]
+            misses = [m._probe_length(key)[1] for key in missing[::step]]
+            print(f"{m.table_load():>5.3f} {name:<5} {rates[0]:>10,.0f} "
+                  f"{rates[1]:>11,.0f} {rates[2]:>17,.0f} "
+                  f"{sum(hits) / len(hits):>11.2f} "
+                  f"{sum(misses) / len(misses):>12.2f}")
+
+
+# ------------------- COMMAND LINE ------------------------------------------ #
+
+def main(argv: list = None) -> int:
+    """
+    Parses the command line and runs the chosen benchmark. Returns the exit
+    status: 1 if a compare found regressions, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmarks for the HashMap implementations.')
+    benchmarks = parser.add_subparsers(dest='benchmark', required=True)
+
+    growth = benchmarks.add_parser(
+        'growth', help='time and memory of SC resizes while growing a map')
+    growth.add_argument('--keys', type=int, default=5_000_000)
+    growth.add_argument('--capacity', type=int, default=11)
+    growth.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    growth.add_argument('--reserve', action='store_true',
+                        help='reserve() room for every key up front')
+    growth.set_defaults(run=bench_growth)
+
+    probing = benchmarks.add_parser(
+        'probing', help='probe lengths of each OA probing strategy')
+    probing.add_argument('--keys', type=int, default=100_000)
+    probing.add_argument('--keys-from', choices=KEY_DISTRIBUTIONS,
+                         default='random')
+    probing.add_argument('--capacity', type=int, default=11)
+    probing.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    probing.add_argument('--strategies', nargs='+', choices=PROBING_STRATEGIES,
+                         default=list(PROBING_STRATEGIES))
+    probing.add_argument('--compact', action='store_true',
+                         help='use the compact parallel-array table')
+    probing.set_defaults(run=bench_probing)
+
+    churn = benchmarks.add_parser(
+        'churn', help='OA probe lengths over time under put/remove churn')
+    churn.add_argument('--keys', type=int, default=100_000)
+    churn.add_argument('--rounds', type=int, default=10)
+    churn.add_argument('--ops', type=int, default=100_000)
+    churn.add_argument('--sample', type=int, default=10_000)
+    churn.add_argument('--capacity', type=int, default=11)
+    churn.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    churn.add_argument('--seed', type=int, default=0)
+    churn.add_argument('--compact', action='store_true',
+                       help='use the compact parallel-array table')
+    churn.set_defaults(run=bench_churn)
+
+    latency = benchmarks.add_parser(
+        'latency', help='put() latency percentiles with and without '
+                        'incremental resizing')
+    latency.add_argument('--keys', type=int, default=1_000_000)
+    latency.add_argument('--keys-from', choices=KEY_DISTRIBUTIONS,
+                         default='sequential')
+    latency.add_argument('--capacity', type=int, default=11)
+    latency.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    latency.add_argument('--maps', nargs='+', choices=('sc', 'oa'),
+                         default=['sc', 'oa'])
+    latency.add_argument('--resize-step', type=int, default=None,
+                         help='old buckets (SC) or entries (OA) moved per '
+                              'operation when resizing incrementally '
+                              '(default: the map\'s own)')
+    latency.add_argument('--compact', action='store_true',
+                         help='use the compact parallel-array table (OA)')
+    latency.add_argument('--no-gc', action='store_true',
+                         help='turn off the garbage collector while timing')
+    latency.set_defaults(run=bench_latency)
+
+    hashes = benchmarks.add_parser(
+        'hashes', help='speed and key distribution of each hash function')
+    hashes.add_argument('--keys', type=int, default=100_000)
+    hashes.add_argument('--keys-from', choices=KEY_DISTRIBUTIONS,
+                        default='sequential')
+    hashes.add_argument('--capacity', type=int, default=None,
+                        help='SC buckets to spread the keys over (default: '
+                             'the smallest prime at or above --keys)')
+    hashes.add_argument('--functions', nargs='+', choices=HASH_FUNCTIONS,
+                        default=list(HASH_FUNCTIONS))
+    hashes.set_defaults(run=bench_hashes)
+
+    suite = benchmarks.add_parser(
+        'suite', help='SC vs OA vs cuckoo vs dict over a grid of workloads, '
+                      'to JSON')
+    suite.add_argument('--maps', nargs='+',
+                       choices=('sc', 'oa', 'cuckoo', 'dict'),
+                       default=['sc', 'oa', 'dict'],
+                       help='cuckoo is given a second hash function from '
+                            'CUCKOO_PARTNERS')
+    suite.add_argument('--distributions', nargs='+', choices=KEY_DISTRIBUTIONS,
+                       default=list(KEY_DISTRIBUTIONS))
+    suite.add_argument('--sizes', nargs='+', type=int,
+                       default=[1_000, 10_000, 100_000],
+                       help='keys in the map before the workload, up to '
+                            '10000000')
+    suite.add_argument('--hashes', nargs='+', choices=HASH_FUNCTIONS,
+                       default=['builtin'])
+    suite.add_argument('--capacities', nargs='+', type=int, default=[11],
+                       help='initial capacities of the HashMaps')
+    suite.add_argument('--mixes', nargs='+', choices=WORKLOAD_MIXES,
+                       default=list(WORKLOAD_MIXES),
+                       help='get/put/remove mixes: read 90/8/2, write '
+                            '20/70/10, delete 40/30/30')
+    suite.add_argument('--ops', type=int, default=100_000)
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--output', default='bench_results.json')
+    suite.set_defaults(run=bench_suite)
+
+    compare = benchmarks.add_parser(
+        'compare', help='flag regressions between two suite JSON files')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='fraction a result may get worse by before it '
+                              'is flagged (default 0.10)')
+    compare.set_defaults(run=bench_compare)
+
+    threads = benchmarks.add_parser(
+        'threads', help='multi-threaded stress test and throughput of a '
+                        'global lock vs the lock-striped ConcurrentHashMap')
+    threads.add_argument('--threads', nargs='+', type=int,
+                         default=[1, 2, 4, 8])
+    threads.add_argument('--keys', type=int, default=100_000,
+                         help='shared keys read by every thread')
+    threads.add_argument('--ops', type=int, default=100_000,
+                         help='operations per thread')
+    threads.add_argument('--mix', choices=WORKLOAD_MIXES, default='read')
+    threads.add_argument('--stripes', type=int, default=64)
+    threads.add_argument('--capacity', type=int, default=11)
+    threads.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    threads.add_argument('--seed', type=int, default=0)
+    threads.set_defaults(run=bench_threads)
+
+    shards = benchmarks.add_parser(
+        'shards', help='batched throughput of the multi-process '
+                       'ShardedHashMap at each shard count')
+    shards.add_argument('--shards', nargs='+', type=int, default=[1, 2, 4, 8])
+    shards.add_argument('--keys', type=int, default=1_000_000)
+    shards.add_argument('--keys-from', choices=KEY_DISTRIBUTIONS,
+                        default='random')
+    shards.add_argument('--batch', type=int, default=10_000,
+                        help='keys per put_many() / get_many() call')
+    shards.add_argument('--map', choices=('sc', 'oa'), default='oa')
+    shards.add_argument('--capacity', type=int, default=11)
+    shards.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    shards.add_argument('--seed', type=int, default=0)
+    shards.set_defaults(run=bench_shards)
+
+    snapshot = benchmarks.add_parser(
+        'snapshot', help='cold start from an OA snapshot file vs rebuilding '
+                         'the map')
+    snapshot.add_argument('--keys', type=int, default=1_000_000)
+    snapshot.add_argument('--keys-from', choices=KEY_DISTRIBUTIONS,
+                          default='sequential')
+    snapshot.add_argument('--gets', type=int, default=100_000)
+    snapshot.add_argument('--capacity', type=int, default=11)
+    snapshot.add_argument('--hash', choices=('hash_function_1',
+                                             'hash_function_2', 'fnv1a',
+                                             'mix64'),
+                          default='mix64',
+                          help='must give the same hashes in every process')
+    snapshot.add_argument('--compact', action='store_true',
+                          help='use the compact parallel-array table')
+    snapshot.add_argument('--path', default=None,
+                          help='snapshot file (default: in the temp dir)')
+    snapshot.add_argument('--keep', action='store_true',
+                          help="don't delete the snapshot afterwards")
+    snapshot.add_argument('--seed', type=int, default=0)
+    snapshot.set_defaults(run=bench_snapshot)
+
+    disk = benchmarks.add_parser(
+        'disk', help='random-read throughput of the disk-backed DiskHashMap')
+    disk.add_argument('--keys', type=int, default=1_000_000)
+    disk.add_argument('--value-bytes', type=int, default=1000)
+    disk.add_argument('--overwrite', type=float, default=0.5,
+                      help='fraction of keys overwritten before reading')
+    disk.add_argument('--gets', type=int, default=100_000)
+    disk.add_argument('--capacity', type=int, default=11)
+    disk.add_argument('--hash', choices=('hash_function_1', 'hash_function_2',
+                                         'fnv1a', 'mix64'),
+                      default='mix64',
+                      help='must give the same hashes in every process')
+    disk.add_argument('--directory', default=None,
+                      help='where to keep the files; must be empty or hold '
+                           'a DiskHashMap (default: a new temp dir)')
+    disk.add_argument('--keep', action='store_true',
+                      help="don't delete the files afterwards")
+    disk.add_argument('--seed', type=int, default=0)
+    disk.set_defaults(run=bench_disk)
+
+    counting = benchmarks.add_parser(
+        'counting', help='get() + put() vs increment(), and top_k()')
+    counting.add_argument('--values', type=int, default=1_000_000)
+    counting.add_argument('--distinct', type=int, default=100_000)
+    counting.add_argument('--capacity', type=int, default=1000,
+                          help='values held by approximate top_k()')
+    counting.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    counting.add_argument('--seed', type=int, default=0)
+    counting.set_defaults(run=bench_counting)
+
+    mode = benchmarks.add_parser(
+        'mode', help='find_mode() against the parallel versions')
+    mode.add_argument('--values', type=int, default=5_000_000)
+    mode.add_argument('--distinct', type=int, default=1000)
+    mode.add_argument('--workers', type=int, nargs='+',
+                      default=[1, 2, 4, 8])
+    mode.add_argument('--seed', type=int, default=0)
+    mode.set_defaults(run=bench_mode)
+
+    swiss = benchmarks.add_parser(
+        'swiss', help='Swiss table vs triangular probing OA by table load')
+    swiss.add_argument('--size', type=int, default=17,
+                       help='log2 of the number of buckets')
+    swiss.add_argument('--loads', type=float, nargs='+',
+                       default=[0.5, 0.75, 0.875])
+    swiss.add_argument('--keys-from', choices=KEY_DISTRIBUTIONS,
+                       default='random')
+    swiss.add_argument('--hash', choices=HASH_FUNCTIONS, default='builtin')
+    swiss.add_argument('--sample', type=int, default=10_000,
+                       help='keys whose probes are counted')
+    swiss.add_argument('--seed', type=int, default=0)
+    swiss.set_defaults(run=bench_swiss)
+
+    args = parser.parse_args(argv)
+    return args.run(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,666 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Thread-safe separate chaining HashMap. The buckets are split
+# into stripes, each with its own readers-writer lock, so threads working on
+# different stripes never wait for each other and lookups never wait for
+# other lookups. Resizing takes every stripe through one table-wide lock.
+
+import threading
+import time
+from contextlib import contextmanager
+
+from a6_include import (DynamicArray, LinkedList, SortedBucket,
+                        hash_function_1, hash_function_2, hash_many)
+import hash_map_stats
+from hash_map_sc import (HashMap, LINKED_BUCKET_THRESHOLD,
+                         SORTED_BUCKET_THRESHOLD)
+
+
+class RWLock:
+    """
+    Readers-writer lock: any number of readers can hold it at once, or one
+    writer on its own. Waiting writers go ahead of new readers, so a steady
+    stream of lookups can't hold off a put() or resize forever.
+    """
+
+    __slots__ = ('_condition', '_readers', '_writer', '_waiting_writers')
+
+    def __init__(self) -> None:
+        """Initialize an unlocked lock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Wait until there is no writer, then hold the lock as a reader."""
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        """Release the lock held as a reader."""
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Wait until nobody holds the lock, then hold it as the writer."""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        """Release the lock held as the writer."""
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class ConcurrentHashMap(HashMap):
+    """
+    Separate chaining HashMap that can be shared between threads.
+
+    Bucket i belongs to stripe i % stripes. get() and contains_key() hold
+    their stripe's lock as readers, put() and remove() as writers. Growing
+    the table takes the table-wide resize lock and then every stripe as a
+    writer, so only one thread resizes and nothing else touches the table
+    meanwhile. An operation that waited on its stripe through a resize sees
+    the capacity changed and finds its stripe again.
+
+    Methods that read the whole table (get_keys_and_values, keys, values,
+    items, empty_buckets, ...) hold every stripe as a reader. keys(),
+    values() and items() iterate over a copy taken at a single point in
+    time, so other threads can change the table while they are in use.
+    Incremental resizing is not supported.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 sorted_buckets: bool = True) -> None:
+        """
+        Initialize new thread-safe HashMap with the given number of lock
+        stripes.
+        """
+        super().__init__(capacity, function, sorted_buckets=sorted_buckets)
+        self._stripes = [RWLock() for _ in range(stripes)]
+        self._resize_lock = threading.Lock()
+
+        # size changes made under each stripe's lock. Only the sum means
+        # anything, but no two threads ever add to the same counter at once
+        self._stripe_sizes = [0] * stripes
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_stripe(self, key_hash: int, write: bool) -> tuple:
+        """
+        Receives a key's full hash then acquires the lock of the stripe its
+        bucket is in, as a writer or a reader. Returns the stripe number and
+        its lock. The capacity can't change while the lock is held.
+        """
+        stripes = self._stripes
+        while True:
+            capacity = self._capacity
+            stripe = key_hash % capacity % len(stripes)
+            lock = stripes[stripe]
+            if write:
+                lock.acquire_write()
+            else:
+                lock.acquire_read()
+
+            if self._capacity == capacity:
+                return stripe, lock
+
+            # the table was resized while we waited, so try again
+            if write:
+                lock.release_write()
+            else:
+                lock.release_read()
+
+    @contextmanager
+    def _all_stripes(self, write: bool = False):
+        """
+        Holds every stripe's lock, as a writer or a reader, for the length
+        of a with block. Stripes are always taken in the same order.
+        """
+        for lock in self._stripes:
+            if write:
+                lock.acquire_write()
+            else:
+                lock.acquire_read()
+        try:
+            yield
+        finally:
+            for lock in self._stripes:
+                if write:
+                    lock.release_write()
+                else:
+                    lock.release_read()
+
+    def _grow(self, capacity: int, needed: int) -> None:
+        """
+        Receives the capacity seen by the caller and the number of keys the
+        table needs room for, then resizes unless another thread already
+        resized the table since the caller looked.
+        """
+        with self._resize_lock:
+            if self._capacity == capacity:
+                # resize_table() is recorded by enable_stats(), growing here
+                # isn't unless it is recorded by hand
+                start = time.perf_counter()
+                self._resize_locked(max(needed, capacity * 2))
+                if self._stats is not None:
+                    self._stats.record_resize(time.perf_counter() - start)
+
+    def _resize_locked(self, new_capacity: int) -> None:
+        """
+        Receives a new capacity then resizes the table to it while holding
+        every stripe. The caller must hold the resize lock.
+        """
+        with self._all_stripes(write=True):
+            self._size = sum(self._stripe_sizes)
+            super().resize_table(new_capacity)
+            self._stripe_sizes = [self._size] + [0] * (len(self._stripes) - 1)
+
+    def _put_locked(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Receives a key/value pair and the key's full hash then inserts it,
+        holding the key's stripe lock while the bucket is changed.
+        """
+        stripe, lock = self._lock_stripe(key_hash, write=True)
+        try:
+            key_index = key_hash % self._capacity
+            bucket = self._buckets.get_at_index(key_index)
+            if bucket is None:  # first key in this bucket
+                bucket = LinkedList()
+                self._buckets.set_at_index(key_index, bucket)
+
+            if bucket.upsert(key, value, key_hash):
+                self._stripe_sizes[stripe] += 1
+                self._version += 1
+                if bucket.length() > SORTED_BUCKET_THRESHOLD:
+                    self._rebalance_bucket(self._buckets, key_index, bucket)
+        finally:
+            lock.release_write()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._stripe_sizes)
+
+    def table_load(self) -> float:
+        """
+        Returns the current table load of the HashMap.
+        """
+        return self.get_size() / self._capacity
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Receives a key/value pair, then inserts into the current HashMap.
+        If a duplicate key is provided then its stored value will be
+        overwritten.
+
+        Maintains a HashMap table load of 1 or less.
+        """
+        capacity = self._capacity
+        if self.get_size() >= capacity:
+            self._grow(capacity, 0)
+
+        self._put_locked(key, value, self._hash_function(key))
+
+    def _increment_hashed(self, key: str, delta, key_hash: int) -> object:
+        """
+        Receives a key, an amount and the key's full hash then does
+        increment() without hashing the key, holding the key's stripe lock
+        while the bucket is changed.
+        """
+        capacity = self._capacity
+        if self.get_size() >= capacity:
+            self._grow(capacity, 0)
+
+        stripe, lock = self._lock_stripe(key_hash, write=True)
+        try:
+            key_index = key_hash % self._capacity
+            bucket = self._buckets.get_at_index(key_index)
+            if bucket is None:  # first key in this bucket
+                bucket = LinkedList()
+                self._buckets.set_at_index(key_index, bucket)
+
+            node, inserted = bucket.setdefault(key, 0, key_hash)
+            node.value += delta
+            if inserted:
+                self._stripe_sizes[stripe] += 1
+                self._version += 1
+                if bucket.length() > SORTED_BUCKET_THRESHOLD:
+                    self._rebalance_bucket(self._buckets, key_index, bucket)
+            return node.value
+        finally:
+            lock.release_write()
+
+    def increment(self, key: str, delta=1) -> object:
+        """
+        Receives a key and an amount then adds the amount to the key's value,
+        adding the key with the amount as its value if it is not in the
+        HashMap, and returns the new value. Unlike a get() then a put(), no
+        other thread's increment of the same key can be lost in between.
+        """
+        return self._increment_hashed(key, delta, self._hash_function(key))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the current HashMap to the new capacity provided, as for
+        HashMap.resize_table(), blocking every other operation meanwhile.
+        """
+        with self._resize_lock:
+            self._resize_locked(new_capacity)
+
+    def get(self, key: str):
+        """
+        Receives a key then returns the value associated with the key if it
+        exists, or returns None otherwise.
+        """
+        key_hash = self._hash_function(key)
+        _, lock = self._lock_stripe(key_hash, write=False)
+        try:
+            node = self._find_node(key, key_hash)
+            return node.value if node else None
+        finally:
+            lock.release_read()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key then checks if the key exists in the HashMap. Returns
+        True if so, False otherwise.
+        """
+        key_hash = self._hash_function(key)
+        _, lock = self._lock_stripe(key_hash, write=False)
+        try:
+            return self._find_node(key, key_hash) is not None
+        finally:
+            lock.release_read()
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key then finds the key in the HashMap and removes it. If the
+        key is not found, then nothing happens and nothing is returned.
+        """
+        key_hash = self._hash_function(key)
+        stripe, lock = self._lock_stripe(key_hash, write=True)
+        try:
+            key_index = key_hash % self._capacity
+            bucket = self._buckets.get_at_index(key_index)
+            if bucket is not None and bucket.remove(key, key_hash):
+                self._stripe_sizes[stripe] -= 1
+                self._version += 1
+                if bucket.length() == 0:
+                    self._buckets.set_at_index(key_index, None)
+                elif (type(bucket) is SortedBucket
+                      and bucket.length() <= LINKED_BUCKET_THRESHOLD):
+                    self._rebalance_bucket(self._buckets, key_index, bucket)
+        finally:
+            lock.release_write()
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/value pairs then inserts all of them into
+        the current HashMap, the same as calling put() for each pair in order.
+
+        Every key in the batch is hashed in one pass and the table is grown
+        at most once up front. Each pair is still inserted under its own
+        stripe lock, so other threads carry on between them.
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+
+        capacity = self._capacity
+        needed = self.get_size() + len(pairs)
+        if needed > capacity:
+            self._grow(capacity, needed)
+
+        for (key, value), key_hash in zip(pairs, hashes):
+            self._put_locked(key, value, key_hash)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray with the value
+        of each key, or None for keys that are not in the HashMap. Values are
+        in the same order as the keys.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        values = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            _, lock = self._lock_stripe(key_hash, write=False)
+            try:
+                node = self._find_node(key, key_hash)
+                values.append(node.value if node else None)
+            finally:
+                lock.release_read()
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray of booleans,
+        True for each key that is in the HashMap and False otherwise.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        found = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            _, lock = self._lock_stripe(key_hash, write=False)
+            try:
+                found.append(self._find_node(key, key_hash) is not None)
+            finally:
+                lock.release_read()
+
+        return found
+
+    def clear(self, shrink: bool = False) -> None:
+        """
+        Clears the HashMap but retains the current capacity, unless shrink is
+        True, which goes back to the starting capacity.
+        """
+        with self._resize_lock, self._all_stripes(write=True):
+            super().clear(shrink)
+            self._stripe_sizes = [0] * len(self._stripes)
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the current HashMap.
+        """
+        with self._all_stripes():
+            return super().empty_buckets()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns an array of all key/value pairs in the entire HashMap, taken
+        at a single point in time.
+        """
+        with self._all_stripes():
+            return super().get_keys_and_values()
+
+    def keys(self):
+        """
+        Returns an iterator over every key in the HashMap, taken at a single
+        point in time.
+        """
+        with self._all_stripes():
+            return iter([node.key for node in self._nodes()])
+
+    def values(self):
+        """
+        Returns an iterator over every value in the HashMap, as for keys().
+        """
+        with self._all_stripes():
+            return iter([node.value for node in self._nodes()])
+
+    def items(self):
+        """
+        Returns an iterator over every key/value pair in the HashMap, as
+        tuples, as for keys().
+        """
+        with self._all_stripes():
+            return iter([(node.key, node.value) for node in self._nodes()])
+
+    def _probe_length(self, key: str) -> tuple:
+        """
+        Receives a key then returns (found, probes, tombstones), as for
+        HashMap._probe_length(), holding the key's stripe as a reader so
+        the table can't be resized while it is measured.
+        """
+        _, lock = self._lock_stripe(self._hash_function(key), write=False)
+        try:
+            return super()._probe_length(key)
+        finally:
+            lock.release_read()
+
+    def enable_stats(self, alert_threshold: float = None,
+                     on_alert=None) -> None:
+        """
+        Starts recording statistics, as for HashMap.enable_stats(), into
+        counters that any number of threads can update at once.
+        """
+        hash_map_stats.enable(self, alert_threshold, on_alert,
+                              hash_map_stats.LockedMapStats)
+
+    def memory_report(self) -> dict:
+        """
+        Returns a dictionary with the bytes used by the HashMap, as for
+        HashMap.memory_report().
+        """
+        with self._all_stripes():
+            return super().memory_report()
+
+    def _chain_lengths(self) -> dict:
+        """
+        Returns a dictionary of {chain length: number of buckets}, as for
+        HashMap._chain_lengths().
+        """
+        with self._all_stripes():
+            return super()._chain_lengths()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        with self._all_stripes():
+            return super().__str__()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(),
+                  m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = ConcurrentHashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(),
+                  m.get_capacity())
+
+    print("\nPDF - resize example 1")
+    print("----------------------")
+    m = ConcurrentHashMap(20, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = ConcurrentHashMap(75, hash_function_1)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(),
+              round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 1")
+    print("--------------------------")
+    m = ConcurrentHashMap(101, hash_function_1)
+    print(round(m.table_load(), 2))
+    m.put('key1', 10)
+    print(round(m.table_load(), 2))
+    m.put('key2', 20)
+    print(round(m.table_load(), 2))
+    m.put('key1', 30)
+    print(round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 2")
+    print("--------------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(50):
+        m.put('key' + str(i), i * 100)
+        if i % 10 == 0:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = ConcurrentHashMap(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 2")
+    print("-----------------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('key' + str(i), i * 100)
+        if i % 30 == 0:
+            print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - get example 1")
+    print("-------------------")
+    m = ConcurrentHashMap(31, hash_function_1)
+    print(m.get('key'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = ConcurrentHashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = ConcurrentHashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = ConcurrentHashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    print("\nPDF - clear example 1")
+    print("---------------------")
+    m = ConcurrentHashMap(101, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nThreads - put and increment from several threads")
+    print("-------------------------------------------------")
+    m = ConcurrentHashMap(11, hash_function_1)
+
+    def worker(thread: int) -> None:
+        for i in range(500):
+            m.put(f"t{thread}-{i}", i)
+            m.increment('shared')
+
+    threads = [threading.Thread(target=worker, args=(thread,))
+               for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get('shared'),
+          all(m.get(f"t{thread}-{i}") == i
+              for thread in range(4) for i in range(500)))
@@ -0,0 +1,953 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  HashMap using cuckoo hashing, with the same methods as the OA
+# HashMap. Every key has exactly two possible buckets, one in each of two
+# tables: bucket function(key) % c of the first and function2(key) % c of the
+# second, hash_function_1 and hash_function_2 from a6_include by default.
+# get(), contains_key() and remove() look in those two buckets and, only if
+# it isn't empty, the stash of keys that didn't fit, and nowhere else.
+#
+# put() stores a new key in whichever of its buckets is empty. If both are
+# taken it evicts the key in its first bucket, which moves to its own other
+# bucket, evicting in turn, for up to max_kicks moves. A key still without a
+# bucket at the end of the chain goes in the stash, and once the stash holds
+# more than stash_size keys both tables are doubled and every key is placed
+# again (the rehash), if bigger tables could take keys out of the stash.
+#
+# Every key in the tables has a bucket of its own, so no more keys can be
+# placed than there are different buckets among the keys' bucket pairs, and
+# bigger tables don't add any for keys whose hashes are the same.
+# hash_function_1 and hash_function_2 give short keys only a few thousand
+# different hashes (1M 'str0', 'str1', ... keys have just 5545 different
+# pairs), so with them most keys of a big HashMap end up in the stash, and a
+# lookup of one of them is two missed buckets and then a stash search. The
+# stash is a separate chaining HashMap, so that search is of one bucket
+# rather than the whole stash. With 100k such keys 99,242 are in the stash
+# (see the stash share example below), so the defaults never give the
+# two-bucket lookup cuckoo hashing is for. That guarantee needs a pair of
+# 64-bit functions, e.g. fnv1a and mix64 from hash_functions, which keep the
+# stash close to empty and every lookup to two buckets at most.
+
+from array import array
+from sys import getsizeof
+
+from a6_include import (DynamicArray, HashEntry, SLNode, EMPTY, LIVE,
+                        HASH_MASK, hash_function_1, hash_function_2,
+                        hash_many)
+from hash_functions import fnv1a, mix64
+import hash_map_sc
+import hash_map_stats
+from primes import ladder_prime, next_prime
+
+
+class HashMap:
+    def __init__(self, capacity: int = 11,
+                 function: callable = hash_function_1,
+                 function2: callable = hash_function_2,
+                 max_kicks: int = 32,
+                 stash_size: int = 4) -> None:
+        """
+        Initialize new HashMap that uses cuckoo hashing for collision
+        resolution. capacity is the number of buckets across both tables,
+        each having capacity / 2 rounded up to a prime.
+        function chooses a key's bucket in the first table and function2 its
+        bucket in the second, so they should not collide on the same keys.
+        Lookups only check at most two buckets with a 64-bit pair such as
+        fnv1a and mix64; with the defaults most keys end up in the stash.
+        put() moves at most max_kicks keys to make room for a new one, and
+        rehashes once more than stash_size keys are left in the stash, unless
+        bigger tables couldn't place at least half of them. The stash may
+        then grow to twice its size before that is checked again.
+        """
+        self._hash_function = function
+        self._hash_function2 = function2
+        self._max_kicks = max_kicks
+        self._stash_size = stash_size
+
+        self._capacity = self._table_size(capacity)  # buckets per table
+        self._min_capacity = self._capacity
+        self._new_tables(self._capacity)
+        self._size = 0
+
+        # bumped by every change to which keys are where, so iterators can
+        # tell the HashMap changed under them
+        self._version = 0
+
+        self._stats = None  # see enable_stats()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output: every bucket
+        of the first table, then the second, then the stash.
+        """
+        out = ''
+        for i in range(len(self._states)):
+            entry = None
+            if self._states[i] == LIVE:
+                entry = HashEntry(self._keys[i], self._values[i])
+            out += str(i) + ': ' + str(entry) + '\n'
+        for key, (value, _, _) in self._stash.items():
+            out += 'stash: ' + str(HashEntry(key, value)) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the buckets in both tables
+        """
+        return 2 * self._capacity
+
+    def get_stash_size(self) -> int:
+        """
+        Return the number of keys in the stash
+        """
+        return self._stash.get_size()
+
+    # ------------------------------------------------------------------ #
+
+    def _table_size(self, capacity: int) -> int:
+        """
+        Receives a total number of buckets then returns the prime size of
+        each of the two tables holding at least that many, 3 at the least.
+        """
+        return next_prime(max(3, (capacity + 1) // 2))
+
+    def _new_tables(self, capacity: int) -> None:
+        """
+        Receives a table size then replaces both tables with empty ones of
+        that size and empties the stash. The two tables are kept end to end
+        in parallel arrays: bucket i of the second table is at capacity + i.
+        Each bucket caches both of its key's hashes, so keys are never
+        hashed again when they are moved.
+
+        The stash is a separate chaining HashMap using the first hash, each
+        key's value being stored as (value, hash1, hash2).
+        """
+        buckets = 2 * capacity
+        self._states = bytearray(buckets)
+        self._keys = [None] * buckets
+        self._values = [None] * buckets
+        self._hashes1 = array('Q', bytes(8 * buckets))
+        self._hashes2 = array('Q', bytes(8 * buckets))
+        self._stash = hash_map_sc.HashMap(3, self._hash)
+
+        # keys the stash holds before a rehash is considered
+        self._stash_limit = self._stash_size
+
+    def _hash(self, key: str) -> int:
+        """
+        Receives a key then returns its hash for the first table, kept to 64
+        bits so it can be cached.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _hash2(self, key: str) -> int:
+        """
+        Receives a key then returns its hash for the second table.
+        """
+        return self._hash_function2(key) & HASH_MASK
+
+    def _locate(self, key: str, hash1: int, hash2: int = None) -> int:
+        """
+        Receives a key and its first hash (and its second, if known) then
+        returns the index of the bucket holding the key, or None if it isn't
+        in either of its buckets. The second hash is only worked out if the
+        key isn't in the first table.
+        """
+        capacity = self._capacity
+        states, keys = self._states, self._keys
+
+        index = hash1 % capacity
+        if (states[index] == LIVE and self._hashes1[index] == hash1
+                and keys[index] == key):
+            return index
+
+        if hash2 is None:
+            hash2 = self._hash2(key)
+        index = capacity + hash2 % capacity
+        if (states[index] == LIVE and self._hashes2[index] == hash2
+                and keys[index] == key):
+            return index
+
+        return None
+
+    def _stash_node(self, key: str, hash1: int) -> SLNode:
+        """
+        Receives a key and its first hash then returns the stash's node for
+        the key, whose value is (value, hash1, hash2), or None if the key
+        isn't in the stash.
+        """
+        if self._stash.get_size() == 0:
+            return None
+
+        # the stash hashes with self._hash, so hash1 is its hash too
+        return self._stash._find_node(key, hash1)
+
+    def _store(self, index: int, key: str, value: object, hash1: int,
+               hash2: int) -> None:
+        """
+        Receives a bucket index and a key, value and both hashes then stores
+        them in that bucket.
+        """
+        self._states[index] = LIVE
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes1[index] = hash1
+        self._hashes2[index] = hash2
+
+    def _place(self, key: str, value: object, hash1: int,
+               hash2: int) -> tuple:
+        """
+        Receives a key known not to be in the tables with its value and both
+        hashes then stores it in one of its two buckets, evicting keys along
+        a chain of at most max_kicks moves if both are taken. Returns None
+        once every key is in a bucket, or the (key, value, hash1, hash2) of
+        the key left over at the end of the chain, which need not be the key
+        passed in. Does not change the size of the HashMap.
+        """
+        capacity = self._capacity
+        states = self._states
+
+        index = hash1 % capacity
+        if states[index] != EMPTY:
+            other = capacity + hash2 % capacity
+            if states[other] == EMPTY:
+                index = other
+
+        kicks = 0
+        while states[index] != EMPTY:
+            if kicks == self._max_kicks:
+                return key, value, hash1, hash2
+
+            # swap our key into the bucket, then find the evicted key a place
+            # in its bucket of the other table
+            evicted = (self._keys[index], self._values[index],
+                       self._hashes1[index], self._hashes2[index])
+            self._store(index, key, value, hash1, hash2)
+            key, value, hash1, hash2 = evicted
+            if index < capacity:
+                index = capacity + hash2 % capacity
+            else:
+                index = hash1 % capacity
+            kicks += 1
+
+        self._store(index, key, value, hash1, hash2)
+        return None
+
+    def _add(self, key: str, value: object, hash1: int, hash2: int) -> None:
+        """
+        Receives a key known not to be in the HashMap with its value and both
+        hashes then adds it, growing the tables first if the table load
+        would pass 0.5, and rehashing into bigger tables if the key leaves
+        the stash too full and they could empty it (see _rehash_helps()).
+        """
+        if self.table_load() >= 0.5:
+            self.resize_table(self.get_capacity() * 2)
+
+        self._size += 1
+        self._version += 1
+        left_over = self._place(key, value, hash1, hash2)
+        if left_over is None:
+            return
+
+        left_key, left_value, left_hash1, left_hash2 = left_over
+        self._stash.put(left_key, (left_value, left_hash1, left_hash2))
+        if self._stash.get_size() > self._stash_limit:
+            new_capacity = self.get_capacity() * 2
+            if self._rehash_helps(self._table_size(new_capacity)):
+                self.resize_table(new_capacity)
+            else:
+                self._stash_limit = 2 * self._stash.get_size()
+
+    def _rehash_helps(self, capacity: int) -> bool:
+        """
+        Receives a table size then returns whether placing every key again
+        in tables of that size could take at least half of the stash's keys
+        out of it.
+
+        Think of the buckets as points and each key as a line between its
+        two buckets. A group of buckets joined by lines can hold as many
+        keys as it has lines, or as buckets if there are fewer buckets, so
+        any more keys than that stay in the stash however they are placed.
+        Keys whose hashes are the same join the same buckets in tables of any
+        size.
+        """
+        parent = list(range(2 * capacity))
+        lines = [0] * (2 * capacity)
+        points = [1] * (2 * capacity)
+
+        def group(bucket: int) -> int:
+            while parent[bucket] != bucket:
+                parent[bucket] = parent[parent[bucket]]
+                bucket = parent[bucket]
+            return bucket
+
+        for _, _, hash1, hash2 in self._entries():
+            first = group(hash1 % capacity)
+            second = group(capacity + hash2 % capacity)
+            if first != second:
+                parent[first] = second
+                lines[second] += lines[first]
+                points[second] += points[first]
+            lines[second] += 1
+
+        placeable = sum(min(lines[bucket], points[bucket])
+                        for bucket in range(2 * capacity)
+                        if parent[bucket] == bucket)
+        return self._size - placeable <= self._stash.get_size() // 2
+
+    def _insert(self, key: str, value: object, hash1: int,
+                hash2: int) -> None:
+        """
+        Receives a key, value and both of the key's hashes then adds or
+        updates the key in the HashMap.
+        """
+        index = self._locate(key, hash1, hash2)
+        if index is not None:  # update existing key
+            self._values[index] = value
+            return
+
+        node = self._stash_node(key, hash1)
+        if node is not None:
+            node.value = (value, hash1, hash2)
+        else:
+            self._add(key, value, hash1, hash2)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Receives a key and value then adds the key/value pair to the HashMap.
+        Replaces an existing value if the key already exists in the HashMap.
+        Will perform a resize of the underlying tables if the load
+        factor is equal to or greater than 0.5.
+        """
+        self._insert(key, value, self._hash(key), self._hash2(key))
+
+    def _increment_hashed(self, key: str, delta, hash1: int,
+                          hash2: int) -> object:
+        """
+        Receives a key, an amount and both of the key's hashes then does
+        increment() without hashing the key.
+        """
+        index = self._locate(key, hash1, hash2)
+        if index is not None:
+            self._values[index] += delta
+            return self._values[index]
+
+        node = self._stash_node(key, hash1)
+        if node is None:
+            self._add(key, delta, hash1, hash2)
+            return delta
+
+        value = node.value[0] + delta
+        node.value = (value, hash1, hash2)
+        return value
+
+    def increment(self, key: str, delta=1) -> object:
+        """
+        Receives a key and an amount then adds the amount to the key's value,
+        adding the key with the amount as its value if it is not in the
+        HashMap, and returns the new value. The key's two buckets are only
+        looked in once, rather than by a get() and again by a put().
+        """
+        return self._increment_hashed(key, delta, self._hash(key),
+                                      self._hash2(key))
+
+    def increment_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/amount pairs then adds each amount to its
+        key's value, the same as calling increment() for each pair in order.
+        Every key in the batch is hashed in one pass with each function.
+        """
+        pairs = list(pairs)
+        keys = [key for key, _ in pairs]
+        for (key, delta), hash1, hash2 in zip(
+                pairs, hash_many(self._hash_function, keys),
+                hash_many(self._hash_function2, keys)):
+            self._increment_hashed(key, delta, hash1 & HASH_MASK,
+                                   hash2 & HASH_MASK)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the current HashMap to hold new_capacity buckets across both
+        tables, each table's size being rounded up to a prime. Every key is
+        placed again from its cached hashes, including those in the stash.
+
+        If new_capacity is less than the current size, then method returns
+        immediately and does nothing. Otherwise the tables are grown as
+        needed to keep a table load below 0.5, as put() would have.
+        """
+        if new_capacity < self._size:
+            return
+
+        capacity = self._table_size(new_capacity)
+        while self._size > 0 and (self._size - 1) / (2 * capacity) >= 0.5:
+            capacity = self._table_size(4 * capacity)
+
+        entries = list(self._entries())
+        self._capacity = capacity
+        self._new_tables(self._capacity)
+        self._version += 1
+
+        for entry in entries:
+            left_over = self._place(*entry)
+            if left_over is not None:
+                key, value, hash1, hash2 = left_over
+                self._stash.put(key, (value, hash1, hash2))
+        self._stash_limit = max(self._stash_size,
+                                2 * self._stash.get_size())
+
+    def reserve(self, size: int) -> None:
+        """
+        Receives a number of keys then grows the HashMap once so that it can
+        hold that many keys without another resize. Does nothing if it
+        already can.
+        """
+        if size <= self._capacity:
+            return
+
+        self.resize_table(2 * (ladder_prime(size) or next_prime(size)))
+
+    @classmethod
+    def from_pairs(cls, pairs, size_hint: int = None,
+                   function: callable = hash_function_1,
+                   **options) -> "HashMap":
+        """
+        Receives an iterable of key/value pairs then returns a new HashMap
+        holding them, created at a capacity big enough for all of them so it
+        is never resized while being filled. size_hint is the number of
+        pairs, needed only if pairs has no len(). Other keyword options are
+        passed to HashMap().
+        """
+        if size_hint is None:
+            if not hasattr(pairs, '__len__'):
+                pairs = list(pairs)
+            size_hint = len(pairs)
+
+        hash_map = cls(11, function, **options)
+        hash_map.reserve(size_hint)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def table_load(self) -> float:
+        """
+        Returns the current table load of the HashMap, counting the buckets
+        of both tables.
+        """
+        return self._size / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the current number of empty buckets in the HashMap.
+        """
+        return self.get_capacity() - self._size + self._stash.get_size()
+
+    def get(self, key: str) -> object:
+        """
+        Receives a key then returns its value if it is in the HashMap. If not,
+        then returns None.
+        """
+        key_hash = self._hash(key)
+        index = self._locate(key, key_hash)
+        if index is not None:
+            return self._values[index]
+
+        node = self._stash_node(key, key_hash)
+        return None if node is None else node.value[0]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key then returns True if it is in the HashMap. If not,
+        then returns False.
+        """
+        key_hash = self._hash(key)
+        return (self._locate(key, key_hash) is not None
+                or self._stash_node(key, key_hash) is not None)
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key then removes it if it is in the HashMap. If not,
+        then no changes are made to the HashMap.
+
+        The emptied bucket is given to a key from the stash that belongs in
+        it, if the stash is small enough to look through.
+        """
+        key_hash = self._hash(key)
+        index = self._locate(key, key_hash)
+        if index is None:
+            if self._stash_node(key, key_hash) is not None:
+                self._stash.remove(key)
+                self._size -= 1
+                self._version += 1
+            return
+
+        self._size -= 1
+        self._version += 1
+        self._states[index] = EMPTY
+        self._keys[index] = None
+        self._values[index] = None
+
+        if not 0 < self._stash.get_size() <= self._stash_size:
+            return
+        capacity = self._capacity
+        for stash_key, (value, hash1, hash2) in self._stash.items():
+            if index in (hash1 % capacity, capacity + hash2 % capacity):
+                break
+        else:
+            return
+        self._stash.remove(stash_key)
+        self._store(index, stash_key, value, hash1, hash2)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray which contains every key/value pair in the
+        HashMap. Each element in the DynamicArray will be a tuple consisting
+        of the key and value.
+        """
+        hash_map_array = DynamicArray()
+        for key, value, _, _ in self._entries():
+            hash_map_array.append((key, value))
+
+        return hash_map_array
+
+    def clear(self, shrink: bool = False) -> None:
+        """
+        Clears the contents of the HashMap, keeping the current capacity
+        unless shrink is True, in which case it goes back to the capacity it
+        was created with.
+        """
+        if shrink:
+            self._capacity = self._min_capacity
+        self._new_tables(self._capacity)
+        self._size = 0
+        self._version += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/value pairs then adds all of them to the
+        HashMap, the same as calling put() for each pair in order.
+
+        Every key in the batch is hashed in one pass with each function and
+        the tables are resized at most once up front.
+        """
+        pairs = list(pairs)
+        keys = [key for key, _ in pairs]
+        hashes1 = hash_many(self._hash_function, keys)
+        hashes2 = hash_many(self._hash_function2, keys)
+
+        # presize so the whole batch fits within a table load of 0.5
+        needed = self._size + len(pairs)
+        if needed / self.get_capacity() > 0.5:
+            self.resize_table(needed * 2)
+
+        for (key, value), hash1, hash2 in zip(pairs, hashes1, hashes2):
+            self._insert(key, value, hash1 & HASH_MASK, hash2 & HASH_MASK)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray with the value
+        of each key, or None for keys that are not in the HashMap. Values are
+        in the same order as the keys.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        values = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            index = self._locate(key, key_hash & HASH_MASK)
+            if index is not None:
+                values.append(self._values[index])
+            else:
+                node = self._stash_node(key, key_hash & HASH_MASK)
+                values.append(None if node is None else node.value[0])
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray of booleans,
+        True for each key that is in the HashMap and False otherwise.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        found = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            key_hash &= HASH_MASK
+            found.append(self._locate(key, key_hash) is not None
+                         or self._stash_node(key, key_hash) is not None)
+
+        return found
+
+    def memory_report(self) -> dict:
+        """
+        Returns a dictionary with the bytes used by the HashMap, measured with
+        sys.getsizeof():
+            buckets - the bucket arrays of both tables and the stash's
+            nodes   - the stash's nodes
+            keys    - the keys
+            values  - the values
+            total   - all of the above
+        Objects shared between entries (e.g. small ints) are counted for each
+        entry that uses them.
+        """
+        report = {
+            'buckets': (getsizeof(self._states) + getsizeof(self._keys)
+                        + getsizeof(self._values) + getsizeof(self._hashes1)
+                        + getsizeof(self._hashes2)),
+            'nodes': 0,
+            'keys': 0,
+            'values': 0,
+        }
+        for key, value, _, _ in self._entries():
+            report['keys'] += getsizeof(key)
+            report['values'] += getsizeof(value)
+
+        # the stash's keys and values were counted above
+        stash = self._stash.memory_report()
+        report['buckets'] += stash['buckets']
+        report['nodes'] += stash['nodes'] + stash['values']
+        report['total'] = sum(report.values())
+        return report
+
+    def _probe_length(self, key: str) -> tuple:
+        """
+        Receives a key then returns (found, probes, tombstones): whether the
+        key is in the HashMap and how many buckets and stash nodes a lookup
+        looks at. There are never any tombstones.
+        """
+        index = self._locate(key, self._hash(key))
+        if index is not None:
+            return True, 1 if index < self._capacity else 2, 0
+        if self._stash.get_size() == 0:
+            return False, 2, 0
+
+        found, probes, _ = self._stash._probe_length(key)
+        return found, 2 + probes, 0
+
+    def _chain_lengths(self) -> dict:
+        """
+        Returns a dictionary of {probe length: number of keys} giving the
+        number of buckets a lookup of each key in the HashMap looks at, the
+        cuckoo counterpart of SC chain lengths.
+        """
+        lengths = {}
+        for key, _, _, _ in self._entries():
+            length = self._probe_length(key)[1]
+            lengths[length] = lengths.get(length, 0) + 1
+
+        return dict(sorted(lengths.items()))
+
+    def enable_stats(self, alert_threshold: float = None,
+                     on_alert=None) -> None:
+        """
+        Starts recording lookup and resize statistics for the HashMap, read
+        with get_stats(). Lookups cost about twice as much while recording;
+        with stats disabled (the default) there is no extra cost at all.
+
+        If alert_threshold is given, on_alert(mean) is called whenever the
+        mean probe length of recorded lookups rises above it.
+        """
+        hash_map_stats.enable(self, alert_threshold, on_alert)
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording statistics and discards those recorded so far.
+        """
+        hash_map_stats.disable(self)
+
+    def get_stats(self) -> dict:
+        """
+        Returns a snapshot of the recorded statistics (see
+        hash_map_stats.MapStats.snapshot), or None if stats are not enabled.
+        chain_lengths holds the number of keys with each lookup probe length.
+        """
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot(self._chain_lengths())
+
+    def _entries(self):
+        """
+        Yields (key, value, hash1, hash2) for every key in the HashMap: the
+        first table's, the second's, then the stash's. Raises RuntimeError
+        if the HashMap is changed (other than a value being replaced) before
+        the last one has been yielded.
+        """
+        version = self._version
+        states, keys, values = self._states, self._keys, self._values
+        hashes1, hashes2 = self._hashes1, self._hashes2
+        for index in range(len(states)):
+            if states[index] == LIVE:
+                yield keys[index], values[index], hashes1[index], \
+                    hashes2[index]
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+        for key, (value, hash1, hash2) in self._stash.items():
+            yield key, value, hash1, hash2
+            if self._version != version:
+                raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """
+        Returns an iterator over every key in the HashMap. Nothing is copied,
+        so any number of iterators can be used at once, but the HashMap must
+        not have keys added or removed while they are in use.
+        """
+        return (entry[0] for entry in self._entries())
+
+    def values(self):
+        """
+        Returns an iterator over every value in the HashMap, as for keys().
+        """
+        return (entry[1] for entry in self._entries())
+
+    def items(self):
+        """
+        Returns an iterator over every key/value pair in the HashMap, as
+        tuples, as for keys().
+        """
+        return (entry[:2] for entry in self._entries())
+
+    def __iter__(self):
+        """
+        Returns an iterator over a HashEntry for every key in the HashMap.
+        Each iterator keeps its own place, so iterations can be nested.
+        """
+        return (HashEntry(key, value, hash1)
+                for key, value, hash1, _ in self._entries())
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2),
+                  m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2, hash_function_1)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2),
+                  m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 1")
+    print("----------------------")
+    m = HashMap(20, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(75, hash_function_2, hash_function_1)
+    keys = [i for i in range(25, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > 0.5:
+            print(f"Check that the load factor is acceptable after the call "
+                  f"to resize_table().\nYour load factor is "
+                  f"{round(m.table_load(), 2)} and should be less than or "
+                  f"equal to 0.5")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(),
+              round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 1")
+    print("--------------------------")
+    m = HashMap(101, hash_function_1)
+    print(round(m.table_load(), 2))
+    m.put('key1', 10)
+    print(round(m.table_load(), 2))
+    m.put('key2', 20)
+    print(round(m.table_load(), 2))
+    m.put('key1', 30)
+    print(round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 2")
+    print("--------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(50):
+        m.put('key' + str(i), i * 100)
+        if i % 10 == 0:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 2")
+    print("-----------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('key' + str(i), i * 100)
+        if i % 30 == 0:
+            print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - get example 1")
+    print("-------------------")
+    m = HashMap(31, hash_function_1)
+    print(m.get('key'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = HashMap(151, hash_function_2, hash_function_1)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_1)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = HashMap(79, hash_function_2, hash_function_1)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2, hash_function_1)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nPDF - clear example 1")
+    print("---------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - __iter__(), __next__() example 1")
+    print("---------------------")
+    m = HashMap(10, hash_function_1)
+    for i in range(5):
+        m.put(str(i), str(i * 10))
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2, hash_function_1)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nstash share - default functions vs a 64-bit pair")
+    print("-------------------------------------------------")
+    # lookups only stop at two buckets for keys outside the stash
+    for function, function2 in ((hash_function_1, hash_function_2),
+                                (fnv1a, mix64)):
+        m = HashMap(function=function, function2=function2)
+        for i in range(100_000):
+            m.put('str' + str(i), i)
+        print(f"{function.__name__} + {function2.__name__}: "
+              f"{m.get_stash_size()} of {m.get_size()} keys in the stash "
+              f"({m.get_stash_size() / m.get_size():.1%})")
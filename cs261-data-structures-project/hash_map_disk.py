@@ -0,0 +1,750 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Open addressing HashMap kept on disk, for key sets larger
+# than memory. The buckets are a memory-mapped slot file of states, cached
+# hashes and log offsets; keys and values are appended to a log file and
+# read back with os.pread(). Overwritten and removed records are reclaimed
+# by compaction, which copies the live records to a fresh log a few
+# buckets per operation, the same way an incremental resize moves them.
+
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+
+from a6_include import (DynamicArray, EMPTY, LIVE, TOMBSTONE, HASH_MASK,
+                        hash_function_1, hash_function_2)
+from hash_map_snapshot import function_name, import_function
+from primes import next_prime
+
+
+SLOT_FILE = 'slots.bin'
+LOG_FILES = ('log0.bin', 'log1.bin')
+META_FILE = 'meta.json'
+
+# the top bit of a stored offset says which of the two logs it points into
+LOG_BIT = 1 << 63
+
+# each log record is (key length, value length, pickled key, pickled value)
+RECORD_HEADER = struct.Struct('<II')
+
+# bytes read at once when looking at a key, enough for most short keys
+READ_AHEAD = 128
+
+# appended records are written out once this many bytes are waiting
+WRITE_BUFFER = 1 << 20
+
+# logs smaller than this are never compacted
+MIN_COMPACT_BYTES = 1 << 20
+
+
+class SlotTable:
+    """
+    The buckets of a DiskHashMap in a memory-mapped file: capacity bucket
+    states, then capacity cached 64-bit hashes and capacity 64-bit log
+    offsets, each section starting on a multiple of 8 bytes. A new file is
+    all zeros, so every bucket starts EMPTY without being written.
+    """
+
+    __slots__ = ('capacity', 'states', 'hashes', 'offsets', '_file', '_map')
+
+    def __init__(self, path: str, capacity: int, create: bool) -> None:
+        """
+        Initialize the table from the slot file at path, creating an empty
+        one of the given capacity if create is True.
+        """
+        hashes = (capacity + 7) & ~7
+        offsets = hashes + 8 * capacity
+        length = offsets + 8 * capacity
+
+        self._file = open(path, 'w+b' if create else 'r+b')
+        if create:
+            self._file.truncate(length)
+        self._map = mmap.mmap(self._file.fileno(), length)
+
+        view = memoryview(self._map)
+        self.capacity = capacity
+        self.states = view[:capacity]
+        self.hashes = view[hashes:offsets].cast('Q')
+        self.offsets = view[offsets:length].cast('Q')
+
+    def close(self) -> None:
+        """Write the table out and close its file."""
+        for view in (self.states, self.hashes, self.offsets):
+            view.release()
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class LogFile:
+    """
+    Append-only file of key/value records. Appends are collected in memory
+    and written WRITE_BUFFER bytes at a time; reads of records still waiting
+    to be written come from that buffer.
+    """
+
+    __slots__ = ('size', '_fd', '_written', '_pending')
+
+    def __init__(self, path: str, truncate: bool = False) -> None:
+        """Initialize the log from the file at path, creating it if needed."""
+        flags = os.O_RDWR | os.O_CREAT | (os.O_TRUNC if truncate else 0)
+        self._fd = os.open(path, flags, 0o644)
+        self.size = os.fstat(self._fd).st_size
+        self._written = self.size
+        self._pending = bytearray()
+
+    def append(self, record: bytes) -> int:
+        """Add a record to the end of the log and return its offset."""
+        offset = self.size
+        self._pending += record
+        self.size += len(record)
+        if len(self._pending) >= WRITE_BUFFER:
+            self.flush()
+        return offset
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Return up to length bytes of the log starting at offset."""
+        if offset >= self._written:
+            start = offset - self._written
+            return bytes(self._pending[start:start + length])
+        return os.pread(self._fd, length, offset)
+
+    def flush(self) -> None:
+        """Write any records waiting in memory to the file."""
+        if self._pending:
+            os.pwrite(self._fd, self._pending, self._written)
+            self._written = self.size
+            self._pending = bytearray()
+
+    def truncate(self) -> None:
+        """Empty the log."""
+        self._pending = bytearray()
+        os.ftruncate(self._fd, 0)
+        self.size = self._written = 0
+
+    def close(self) -> None:
+        """Write out any waiting records and close the file."""
+        self.flush()
+        os.close(self._fd)
+
+
+class DiskHashMap:
+    """
+    Open addressing HashMap with quadratic probing whose buckets, keys and
+    values live in files in directory, so only the pages in use take up
+    memory. Keys and values must be picklable.
+
+    put(), get(), remove() and contains_key() behave as for
+    hash_map_oa.HashMap, including a prime capacity that doubles once the
+    table load reaches 0.5. Each put() appends a record to the log; once
+    more than compaction_threshold of the log is overwritten or removed
+    records, later operations copy the live records of compact_step buckets
+    each into the other log until the old one can be emptied.
+
+    close() (or leaving a with block) writes everything out. Opening a
+    directory that holds a closed DiskHashMap reopens it with the saved
+    capacity and hash function, which must give the same hashes in every
+    process (not builtin hash() or siphash).
+    """
+
+    def __init__(self, directory: str, capacity: int = 11,
+                 function: callable = None,
+                 compaction_threshold: float = 0.5,
+                 compact_step: int = 8) -> None:
+        """
+        Initialize a new DiskHashMap in directory, or reopen the one there.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._compaction_threshold = compaction_threshold
+        self._compact_step = compact_step
+        meta_path = os.path.join(directory, META_FILE)
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            os.remove(meta_path)  # rewritten by close()
+            if function is None:
+                function = import_function(meta['function'])
+            self._hash_function = function
+            self._size = meta['size']
+            self._tombstones = meta['tombstones']
+            self._live_bytes = meta['live_bytes']
+            self._active = meta['active']
+            self._slots = SlotTable(self._path(SLOT_FILE), meta['capacity'],
+                                    create=False)
+            self._logs = [LogFile(self._path(name)) for name in LOG_FILES]
+        else:
+            if os.path.exists(self._path(SLOT_FILE)):
+                raise ValueError(f"{directory} holds a DiskHashMap that was "
+                                 f"not closed")
+            self._hash_function = function or hash_function_1
+            self._size = 0
+            self._tombstones = 0
+            self._live_bytes = 0
+            self._active = 0
+            self._slots = SlotTable(self._path(SLOT_FILE),
+                                    next_prime(capacity), create=True)
+            self._logs = [LogFile(self._path(name), truncate=True)
+                          for name in LOG_FILES]
+
+        # next bucket to copy while compacting, or None when not compacting
+        self._compact_index = None
+
+    def __enter__(self) -> "DiskHashMap":
+        """Return the map for use in a with block."""
+        return self
+
+    def __exit__(self, *exception) -> None:
+        """Close the map at the end of a with block."""
+        self.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._slots.capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the current table load of the HashMap.
+        """
+        return self._size / self._slots.capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the current number of empty buckets in the HashMap. Buckets
+        holding a tombstone are not empty.
+        """
+        return self._slots.capacity - self._size - self._tombstones
+
+    # ------------------------------------------------------------------ #
+
+    def _path(self, name: str) -> str:
+        """Return the path of one of the map's files."""
+        return os.path.join(self._directory, name)
+
+    def _hash(self, key: str) -> int:
+        """
+        Receives a key then returns its full hash, kept to 64 bits.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    @staticmethod
+    def _probe(key_hash: int, capacity: int):
+        """
+        Yields the bucket indices to visit for a hash, by quadratic probing,
+        stopping after capacity of them.
+        """
+        initial_index = key_hash % capacity
+        for j in range(capacity):
+            yield (initial_index + j * j) % capacity
+
+    def _read(self, offset: int, value: bool = False) -> tuple:
+        """
+        Receives a stored offset then reads the record there and returns
+        (key, record length), or (key, value) if value is True.
+        """
+        log = self._logs[offset >> 63]
+        offset &= ~LOG_BIT
+        data = log.read(offset, READ_AHEAD)
+        key_length, value_length = RECORD_HEADER.unpack_from(data)
+        length = RECORD_HEADER.size + key_length + value_length
+        if len(data) < (length if value else RECORD_HEADER.size + key_length):
+            data = log.read(offset, length)
+
+        key = pickle.loads(data[RECORD_HEADER.size:
+                                RECORD_HEADER.size + key_length])
+        if value:
+            return key, pickle.loads(data[RECORD_HEADER.size + key_length:
+                                          length])
+        return key, length
+
+    def _append(self, key: str, value: object) -> tuple:
+        """
+        Receives a key/value pair then appends its record to the active log
+        and returns (stored offset, record length).
+        """
+        key_data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        value_data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        record = (RECORD_HEADER.pack(len(key_data), len(value_data))
+                  + key_data + value_data)
+        offset = self._logs[self._active].append(record)
+        return offset | (self._active << 63), len(record)
+
+    def _find_index(self, key: str, key_hash: int) -> int:
+        """
+        Receives a key and the key's full hash then returns the index of the
+        bucket holding that key, or None if the key is not in the HashMap.
+        Only buckets whose cached hash matches have their key read from the
+        log.
+        """
+        slots = self._slots
+        states, hashes, offsets = slots.states, slots.hashes, slots.offsets
+        for key_index in self._probe(key_hash, slots.capacity):
+            state = states[key_index]
+            if state == EMPTY:
+                return None
+            if (state == LIVE and hashes[key_index] == key_hash
+                    and self._read(offsets[key_index])[0] == key):
+                return key_index
+
+        return None
+
+    def _compact(self) -> None:
+        """
+        Starts compacting once enough of the logs is dead records, and while
+        compacting copies the live records of the next compact_step buckets
+        from the old log into the active one. Empties the old log once every
+        bucket has been visited.
+        """
+        if self._compact_index is None:
+            log_bytes = self._logs[self._active].size
+            if (log_bytes < MIN_COMPACT_BYTES or log_bytes - self._live_bytes
+                    <= self._compaction_threshold * log_bytes):
+                return
+
+            # new records now go to the other, empty log
+            self._active ^= 1
+            self._logs[self._active].truncate()
+            self._compact_index = 0
+
+        slots = self._slots
+        old_log = self._logs[self._active ^ 1]
+        stop = min(self._compact_index + self._compact_step, slots.capacity)
+        for key_index in range(self._compact_index, stop):
+            offset = slots.offsets[key_index]
+            if (slots.states[key_index] == LIVE
+                    and offset >> 63 != self._active):
+                offset &= ~LOG_BIT
+                key_length, value_length = RECORD_HEADER.unpack(
+                    old_log.read(offset, RECORD_HEADER.size))
+                record = old_log.read(offset, RECORD_HEADER.size
+                                      + key_length + value_length)
+                slots.offsets[key_index] = (
+                    self._logs[self._active].append(record)
+                    | (self._active << 63))
+        self._compact_index = stop
+
+        if stop == slots.capacity:
+            old_log.truncate()
+            self._compact_index = None
+
+    def compact(self) -> None:
+        """
+        Finishes any compaction in progress, copying every remaining live
+        record out of the old log at once.
+        """
+        if self._compact_index is not None:
+            step = self._compact_step
+            self._compact_step = self._slots.capacity
+            self._compact()
+            self._compact_step = step
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the current HashMap to the next prime at or above the new
+        capacity, as for HashMap.resize_table(), growing further if needed
+        to keep the table load below 0.5. Only the slot file is rewritten;
+        the cached hashes mean no key is read from the log.
+
+        If an invalid (too small) integer is provided, then method returns
+        immediately and does nothing.
+        """
+        # stop if new_cap is less than current_size
+        if new_capacity < self._size:
+            return
+
+        self.compact()
+        new_capacity = next_prime(new_capacity)
+        while self._size > 0 and (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = next_prime(new_capacity * 2)
+
+        old = self._slots
+        new = SlotTable(self._path(SLOT_FILE + '.tmp'), new_capacity,
+                        create=True)
+        for index in range(old.capacity):
+            if old.states[index] == LIVE:
+                key_hash = old.hashes[index]
+                for key_index in self._probe(key_hash, new_capacity):
+                    if new.states[key_index] == EMPTY:
+                        new.states[key_index] = LIVE
+                        new.hashes[key_index] = key_hash
+                        new.offsets[key_index] = old.offsets[index]
+                        break
+
+        old.close()
+        os.replace(self._path(SLOT_FILE + '.tmp'), self._path(SLOT_FILE))
+        self._slots = new
+        self._tombstones = 0
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Receives a key and value then adds the key/value pair to the HashMap.
+        Replaces an existing value if the key already exists in the HashMap.
+        Will perform a resize of the underlying table if the load
+        factor is equal to or greater than 0.5.
+        """
+        slots = self._slots
+        if self.table_load() >= 0.5:
+            self.resize_table(slots.capacity * 2)
+        elif (self._size + self._tombstones) / slots.capacity >= 0.5:
+            # live entries still fit, the buckets are just full of tombstones
+            self.resize_table(slots.capacity)
+        self._compact()
+
+        slots = self._slots
+        states, hashes, offsets = slots.states, slots.hashes, slots.offsets
+        key_hash = self._hash(key)
+        offset, length = self._append(key, value)
+        self._live_bytes += length
+
+        # probe once, remembering the first tombstone passed over so it can
+        # be reused if the key turns out not to be in the HashMap already
+        tombstone_index = None
+        for key_index in self._probe(key_hash, slots.capacity):
+            state = states[key_index]
+            if state == EMPTY:
+                break
+            if state == TOMBSTONE:
+                if tombstone_index is None:
+                    tombstone_index = key_index
+            elif hashes[key_index] == key_hash:
+                old_key, old_length = self._read(offsets[key_index])
+                if old_key == key:  # update existing key
+                    offsets[key_index] = offset
+                    self._live_bytes -= old_length
+                    return
+
+        if tombstone_index is not None:
+            key_index = tombstone_index
+            self._tombstones -= 1
+        states[key_index] = LIVE
+        hashes[key_index] = key_hash
+        offsets[key_index] = offset
+        self._size += 1
+
+    def get(self, key: str) -> object:
+        """
+        Receives a key then returns its value if it is in the HashMap. If not,
+        then returns None.
+        """
+        self._compact()
+        key_index = self._find_index(key, self._hash(key))
+        if key_index is None:
+            return None
+
+        return self._read(self._slots.offsets[key_index], value=True)[1]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key then returns True if it is in the HashMap. If not,
+        then returns False.
+        """
+        self._compact()
+        return self._find_index(key, self._hash(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key then removes it if it is in the HashMap, leaving a
+        tombstone behind. If not, then no changes are made to the HashMap.
+        """
+        self._compact()
+        key_index = self._find_index(key, self._hash(key))
+        if key_index is None:
+            return
+
+        self._live_bytes -= self._read(self._slots.offsets[key_index])[1]
+        self._slots.states[key_index] = TOMBSTONE
+        self._size -= 1
+        self._tombstones += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray which contains every key/value pair in the
+        HashMap. Each element in the DynamicArray will be a tuple consisting
+        of the key and value.
+        """
+        hash_map_array = DynamicArray()
+        slots = self._slots
+        for index in range(slots.capacity):
+            if slots.states[index] == LIVE:
+                hash_map_array.append(self._read(slots.offsets[index],
+                                                 value=True))
+
+        return hash_map_array
+
+    def clear(self) -> None:
+        """
+        Clears the entire HashMap of all keys and values and empties both
+        logs. The capacity of the HashMap is not changed.
+        """
+        capacity = self._slots.capacity
+        self._slots.close()
+        self._slots = SlotTable(self._path(SLOT_FILE), capacity, create=True)
+        for log in self._logs:
+            log.truncate()
+        self._size = 0
+        self._tombstones = 0
+        self._live_bytes = 0
+        self._compact_index = None
+
+    def close(self) -> None:
+        """
+        Finishes any compaction, writes everything out and closes the files.
+        The map can be reopened from its directory afterwards.
+        """
+        if self._slots is None:
+            return
+
+        self.compact()
+        self._slots.close()
+        for log in self._logs:
+            log.close()
+
+        with open(self._path(META_FILE), 'w') as file:
+            json.dump({
+                'capacity': self._slots.capacity,
+                'size': self._size,
+                'tombstones': self._tombstones,
+                'live_bytes': self._live_bytes,
+                'active': self._active,
+                'function': function_name(self._hash_function),
+            }, file)
+        self._slots = None
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    # every example map gets its own directory in a temporary one
+    directory = tempfile.mkdtemp(prefix='hash_map_disk')
+    maps = []
+
+    def new_map(capacity: int, function: callable) -> DiskHashMap:
+        m = DiskHashMap(os.path.join(directory, str(len(maps))), capacity,
+                        function)
+        maps.append(m)
+        return m
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = new_map(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2),
+                  m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = new_map(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2),
+                  m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 1")
+    print("----------------------")
+    m = new_map(20, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = new_map(75, hash_function_2)
+    keys = [i for i in range(25, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > 0.5:
+            print(f"Check that the load factor is acceptable after the call "
+                  f"to resize_table().\nYour load factor is "
+                  f"{round(m.table_load(), 2)} and should be less than or "
+                  f"equal to 0.5")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(),
+              round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 1")
+    print("--------------------------")
+    m = new_map(101, hash_function_1)
+    print(round(m.table_load(), 2))
+    m.put('key1', 10)
+    print(round(m.table_load(), 2))
+    m.put('key2', 20)
+    print(round(m.table_load(), 2))
+    m.put('key1', 30)
+    print(round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 2")
+    print("--------------------------")
+    m = new_map(53, hash_function_1)
+    for i in range(50):
+        m.put('key' + str(i), i * 100)
+        if i % 10 == 0:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = new_map(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 2")
+    print("-----------------------------")
+    m = new_map(53, hash_function_1)
+    for i in range(150):
+        m.put('key' + str(i), i * 100)
+        if i % 30 == 0:
+            print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - get example 1")
+    print("-------------------")
+    m = new_map(31, hash_function_1)
+    print(m.get('key'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = new_map(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = new_map(11, hash_function_1)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = new_map(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = new_map(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = new_map(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nPDF - clear example 1")
+    print("---------------------")
+    m = new_map(101, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = new_map(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nDisk - close and reopen example 1")
+    print("---------------------------------")
+    m = new_map(11, hash_function_1)
+    for i in range(100):
+        m.put('key' + str(i), i)
+    for i in range(0, 100, 3):
+        m.remove('key' + str(i))
+    m.close()
+    m = DiskHashMap(os.path.join(directory, str(len(maps) - 1)))
+    maps.append(m)
+    print(m.get_size(), m.get_capacity(),
+          all(m.get('key' + str(i)) == (None if i % 3 == 0 else i)
+              for i in range(100)))
+
+    for m in maps:
+        m.close()
+    shutil.rmtree(directory)
@@ -8,26 +8,97 @@
 # key is present, to get all keys and values and to clear the HashMap entirely.
 # Elements in HashMaps with this implementation are iterable.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+from collections import deque
+from itertools import compress, islice
+from operator import eq
+
+from a6_include import (DynamicArray, CompactTable, EntryTable, EMPTY, LIVE,
+                        TOMBSTONE, MATCH, HASH_MASK, hash_function_1,
+                        hash_function_2, hash_many)
+import hash_map_snapshot
+import hash_map_stats
+from primes import ladder_prime
+from probing import get_strategy
+
+
+# an incremental resize step looks at no more than this many old buckets
+# per entry it moves, so a sparse old table still costs each operation
+# about the same
+MIGRATE_SCAN = 4
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function,
+                 probing='quadratic',
+                 tombstone_threshold: float = 0.2,
+                 deletion: str = 'tombstone',
+                 compact: bool = False,
+                 incremental: bool = False,
+                 resize_step: int = 2,
+                 shrink_load: float = None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        open addressing for collision resolution, with quadratic probing
+        unless another probing strategy (or its name) is given.
+        Tombstones are purged once they fill more than tombstone_threshold
+        of the buckets (never, if it is None).
+        deletion='backward_shift' removes keys without leaving tombstones,
+        for linear and Robin Hood probing only.
+        compact=True stores the buckets in a CompactTable of parallel arrays
+        instead of one HashEntry object per bucket.
+        incremental=True spreads the rehash done when put() grows the table
+        over later operations, each moving resize_step old entries across,
+        instead of rehashing everything at once. That trades the one long
+        pause for a little more work in about half the puts: growing to
+        20000 keys (hash_map_bench.py latency --no-gc) measured p50 / p99 /
+        p999 / max put() times of 2.5 us / 7 us / 43 us / 35 ms all at once
+        and 6.4 us / 13.5 us / 41 us / 1.8 ms incrementally.
+        remove() halves the capacity once the table load drops below
+        shrink_load, never going below the starting capacity. It must be at
+        most 0.125, so a table just grown or shrunk is never close to
+        resizing the other way. None (the default) never shrinks.
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if shrink_load is not None and not 0 < shrink_load <= 0.125:
+            raise ValueError(f"shrink_load must be in (0, 0.125], not "
+                             f"{shrink_load}")
+        self._probing = get_strategy(probing)
+
+        if deletion not in ('tombstone', 'backward_shift'):
+            raise ValueError(f"unknown deletion mode {deletion!r}")
+        if deletion == 'backward_shift' and not self._probing.backward_shift:
+            raise ValueError(f"backward shift deletion needs linear or "
+                             f"Robin Hood probing, not {self._probing!r}")
+        self._deletion = deletion
+
+        # capacity must be a prime number (or a power of two, if the probing
+        # strategy needs one)
+        self._capacity = self._table_size(capacity)
+        self._min_capacity = self._capacity
+        self._shrink_load = shrink_load
+        self._compact = compact
+        if compact:
+            self._buckets = CompactTable(self._capacity)
+        else:
+            self._buckets = EntryTable(self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._tombstones = 0
+        self._tombstone_threshold = tombstone_threshold
+
+        # bumped by every change to which keys are where, so iterators can
+        # tell the HashMap changed under them
+        self._version = 0
+
+        # the table being migrated from during an incremental resize. Moved
+        # entries leave tombstones there so the old probe sequences still work
+        self._incremental = incremental
+        self._resize_step = resize_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+        self._stats = None  # see enable_stats()
 
     def __str__(self) -> str:
         """
@@ -88,69 +159,422 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
-    def _hash_index(self, key: str) -> int:
+    def _table_size(self, capacity: int) -> int:
+        """
+        Receives a requested capacity then returns the table size to use for
+        it: the next prime number, or the next power of two for probing
+        strategies that need one.
+        """
+        if self._probing.power_of_two:
+            return 1 << max(capacity - 1, 1).bit_length()
+
+        return self._next_prime(capacity)
+
+    def _hash(self, key: str) -> int:
+        """
+        Receives a key then returns its full hash, kept to 64 bits so it can
+        be cached in any kind of table.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Receives a key, value and the key's full hash then adds or updates
+        the key in the HashMap without checking the table load. The hash is
+        cached in the table so the key never needs to be hashed again.
+
+        Probes once, remembering the first tombstone passed over so it can be
+        reused if the key turns out not to be in the HashMap already.
+        """
+        if self._probing.robin_hood:
+            key_index = self._find_index(key, key_hash)
+            if key_index is not None:  # update existing key
+                self._buckets.set_value(key_index, value)
+            else:
+                self._place(key, value, key_hash)
+                self._size += 1
+                self._version += 1
+            return
+
+        # iterate until we find an empty bucket, or we find our key, visiting
+        # buckets in the order given by the probing strategy
+        check = self._buckets.check
+        tombstone_index = None
+        for key_index in self._probing.probe(key_hash, key, self._capacity):
+            state = check(key_index, key, key_hash)
+            if state == EMPTY:
+                break
+            if state == MATCH:  # update existing key
+                self._buckets.set_value(key_index, value)
+                return
+            if state == TOMBSTONE and tombstone_index is None:
+                tombstone_index = key_index  # first reusable TS bucket
+
+        # key is not present, so reuse the earliest TS bucket if we saw one
+        if tombstone_index is not None:
+            key_index = tombstone_index
+            self._tombstones -= 1
+        self._buckets.store(key_index, key, value, key_hash)
+        self._size += 1
+        self._version += 1
+
+    def _place(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Receives a key known not to be in the HashMap with its value and full
+        hash then stores it in the first empty or tombstone bucket along its
+        probe sequence. Does not change the size of the HashMap.
+
+        With Robin Hood probing the key instead takes the bucket of the first
+        entry that is closer to its own home than the key is, and that entry
+        is carried forward and placed the same way. A tombstone in such a
+        bucket is simply dropped. Tombstones further from home than the key
+        are walked over, since replacing them could end another key's lookup
+        early.
+        """
+        table = self._buckets
+        robin_hood = self._probing.robin_hood
+        capacity = self._capacity
+
+        probe_length = 0
+        for key_index in self._probing.probe(key_hash, key, capacity):
+            state = table.state(key_index)
+            if state == EMPTY:
+                table.store(key_index, key, value, key_hash)
+                return
+
+            if not robin_hood:
+                if state == TOMBSTONE:
+                    table.store(key_index, key, value, key_hash)
+                    self._tombstones -= 1
+                    return
+                continue
+
+            entry_length = self._probing.distance(table.hash_at(key_index),
+                                                  key_index, capacity)
+            if entry_length < probe_length:
+                if state == TOMBSTONE:  # drop the TS bucket and stop
+                    table.store(key_index, key, value, key_hash)
+                    self._tombstones -= 1
+                    return
+
+                # swap with the entry closer to home, then keep placing it
+                displaced = table.entry_at(key_index)
+                table.store(key_index, key, value, key_hash)
+                key, value, key_hash = displaced
+                probe_length = entry_length
+
+            probe_length += 1
+
+    def _find_index(self, key: str, key_hash: int, table=None,
+                    capacity: int = None) -> int:
+        """
+        Receives a key and the key's full hash then returns the index of the
+        bucket holding that key, or None if the key is not in the HashMap.
+        Searches the current table unless another table and its capacity are
+        given.
+
+        Buckets whose cached hash differs are skipped without comparing keys.
+        """
+        if table is None:
+            table, capacity = self._buckets, self._capacity
+        check = table.check
+        robin_hood = self._probing.robin_hood
+
+        # iterate through buckets in probe order until we find the key or an
+        # empty spot. Every probe sequence repeats itself within capacity
+        # steps, so stop there too: a small table can have no empty bucket
+        # along the sequence (e.g. quadratic probing over 3 buckets only ever
+        # reaches 2 of them)
+        probe_length = 0
+        for key_index in islice(self._probing.probe(key_hash, key, capacity),
+                                capacity):
+            state = check(key_index, key, key_hash)
+            if state == MATCH:
+                return key_index
+            if state == EMPTY:
+                return None
+
+            # with Robin Hood, an entry closer to home than we are now means
+            # our key would have displaced it, so the key isn't here
+            if robin_hood:
+                if self._probing.distance(table.hash_at(key_index),
+                                          key_index, capacity) < probe_length:
+                    return None
+                probe_length += 1
+
+        return None
+
+    def _locate(self, key: str, key_hash: int) -> tuple:
+        """
+        Receives a key and the key's full hash then returns the table and
+        index of the bucket holding that key, or (None, None) if the key is
+        not in the HashMap.
+
+        Checks the old table too while an incremental resize is in progress.
+        """
+        key_index = self._find_index(key, key_hash)
+        if key_index is not None:
+            return self._buckets, key_index
+
+        if self._old_buckets is not None:
+            key_index = self._find_index(key, key_hash, self._old_buckets,
+                                         self._old_capacity)
+            if key_index is not None:
+                return self._old_buckets, key_index
+
+        return None, None
+
+    def _migrate_entry(self, old_index: int) -> None:
+        """
+        Receives the index of a live bucket in the old table then moves its
+        entry into the current table, leaving a tombstone behind.
+        """
+        entry = self._old_buckets.entry_at(old_index)
+        self._old_buckets.mark_tombstone(old_index)
+        self._place(*entry)
+
+    def _migrate_key(self, key: str, key_hash: int) -> None:
+        """
+        Receives a key and the key's full hash then moves the next
+        resize_step old entries into the current table and, if the key is
+        still in the old table, moves it too. The step comes first since
+        finishing the resize may start a shrink with a new old table.
         """
-        Receives a key value then hashes and uses modulo to determine and
-        return the target index of the array for the given key.
+        self._migrate()
+        if self._old_buckets is None:
+            return
 
-        Uses the current capacity of the current HashMap in the calculation.
+        key_index = self._find_index(key, key_hash, self._old_buckets,
+                                     self._old_capacity)
+        if key_index is not None:
+            self._migrate_entry(key_index)
 
-        Returns the target key index as an integer.
+    def _migrate(self, step: int = None) -> None:
+        """
+        Moves the entries of the next step old buckets into the current table
+        while an incremental resize is in progress, dropping the old table
+        once every bucket has been visited. Without step, moves the next
+        resize_step entries instead, looking at no more than MIGRATE_SCAN
+        old buckets for each.
+
+        Moving a fixed number of entries rather than of buckets, which hold
+        anywhere from none to all of that many entries, keeps every
+        operation's share of the work the same.
         """
-        key_hash = self._hash_function(key)  # get hash of key
-        key_index = key_hash % self._capacity  # find target index
+        if self._old_buckets is None:
+            return
 
-        return key_index
+        stepping = step is None
+        old_table = self._old_buckets
+        old_index = self._migrate_index
+        if stepping:
+            moves = self._resize_step
+            stop = min(old_index + MIGRATE_SCAN * moves, self._old_capacity)
+            while old_index < stop and moves:
+                if old_table.state(old_index) == LIVE:
+                    self._migrate_entry(old_index)
+                    moves -= 1
+                old_index += 1
+            stop = old_index
+        else:
+            stop = min(old_index + step, self._old_capacity)
+            for old_index in range(old_index, stop):
+                if old_table.state(old_index) == LIVE:
+                    self._migrate_entry(old_index)
+        self._migrate_index = stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_index = 0
+
+            # removes made during the resize may have left the new table
+            # sparse enough to shrink again. Not when finishing at once: the
+            # caller expects no resize in progress afterwards
+            if stepping:
+                self._shrink_if_sparse()
+
+    def _finish_migration(self) -> None:
+        """
+        Moves every remaining entry of the old table into the current table,
+        ending any incremental resize in progress.
+        """
+        self._migrate(self._old_capacity)
+
+    def _resize_capacity(self, new_capacity: int) -> int:
+        """
+        Receives a requested capacity then returns the table size to resize
+        to, grown as needed to keep a table load below 0.5.
+        """
+        # if not a valid table size change to the next highest one
+        new_capacity = self._table_size(new_capacity)
+
+        # entries are moved without going through put(), so grow here exactly
+        # as put() would have while re-adding them one at a time
+        while self._size > 0 and (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = self._table_size(new_capacity * 2)
+
+        return new_capacity
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Receives a new capacity then starts an incremental resize to it: the
+        current table becomes the old table and an empty table of the new
+        capacity takes its place. Entries are moved across by later
+        operations.
+        """
+        self._finish_migration()  # only one resize runs at a time
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._capacity = self._resize_capacity(new_capacity)
+        self._buckets = self._old_buckets.new_table(self._capacity)
+        self._tombstones = 0
+        self._version += 1
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halves the capacity, to the next valid table size, if the table load
+        has dropped below shrink_load. Shrinks incrementally when the HashMap
+        resizes incrementally; otherwise the rehash is paid for by the
+        removes that emptied the table.
+        """
+        if (self._shrink_load is None or self._old_buckets is not None
+                or self._capacity <= self._min_capacity
+                or self._size >= self._shrink_load * self._capacity):
+            return
+
+        new_capacity = max(self._capacity // 2, self._min_capacity)
+        if self._incremental:
+            self._start_resize(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _backward_shift(self, key_index: int) -> None:
+        """
+        Receives the index of a bucket being emptied, then empties it and
+        moves later entries of the same linear probe run back into the gap
+        wherever that keeps them at or after their home bucket. The run never
+        contains a gap, so no tombstone is needed.
+        """
+        table = self._buckets
+        capacity = self._capacity
+        distance = self._probing.distance
+
+        empty_index = key_index
+        key_index = (key_index + 1) % capacity
+        while table.state(key_index) != EMPTY:
+            # an entry can move back to the gap if the gap is no further back
+            # than its home bucket
+            if (distance(table.hash_at(key_index), key_index, capacity)
+                    >= distance(empty_index, key_index, capacity)):
+                table.move(key_index, empty_index)
+                empty_index = key_index
+            key_index = (key_index + 1) % capacity
+
+        table.clear_slot(empty_index)
+
+    def _prepare_insert(self, key: str, key_hash: int) -> None:
+        """
+        Receives a key about to be added or updated and its full hash then
+        makes room for it, resizing or purging tombstones as put() needs to,
+        and moves it out of the old table during an incremental resize.
+        """
+        # check for load factor >= 0.5 and resize if necessary
+        if self.table_load() >= 0.5:
+            # doubles current capacity then resizes
+            if self._incremental:
+                self._start_resize(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity * 2)
+        elif (self._size + self._tombstones) / self._capacity >= 0.5:
+            # live entries still fit, the buckets are just full of tombstones
+            self.purge_tombstones()
+
+        if self._old_buckets is not None:
+            # move the key across first so it is only ever in one table
+            self._migrate_key(key, key_hash)
 
     def put(self, key: str, value: object) -> None:
         """
         Receives a key and value then adds the key/value pair to the HashMap.
         Replaces an existing value if the key already exists in the HashMap.
-        Will perform a resize of the underlying DynamicArray() if the load
+        Will perform a resize of the underlying table if the load
         factor is equal to or greater than 0.5.
         """
-        # check for load factor >= 1 and resize if necessary
-        if self.table_load() >= 0.5:
-            # doubles current capacity then resizes
-            self.resize_table(self._capacity * 2)
-
-        # get the target key index
-        key_index = self._hash_index(key)
-        initial_index = key_index
-
-        # check if we need to update an existing key
-        # without this, we could overwrite a tombstone when we should be
-        # updating an existing key, then end up with duplicate keys
-        replace = self.contains_key(key)
-
-        # iterate until we find an available node, or we find our key
-        # quadratic probe formula:
-        # i = (initial_index + j ** 2) % m; j+=1, m=length of arr
-        hash_entry = self._buckets.get_at_index(key_index)
-        j = 1
-        while hash_entry:
-            if hash_entry.is_tombstone and not replace:  # found a TS entry
-                hash_entry.key = key
-                hash_entry.value = value
-                hash_entry.is_tombstone = False
-                self._size += 1
-                return
-            elif hash_entry.key == key:  # update existing key
-                hash_entry.value = value
-                return
-            key_index = (initial_index + j ** 2) % self._capacity
-            hash_entry = self._buckets.get_at_index(key_index)
-            j += 1
+        key_hash = self._hash(key)
+        self._prepare_insert(key, key_hash)
+        self._insert(key, value, key_hash)
 
-        # store the key/value as a HashEntry() object in the array
-        self._buckets.set_at_index(key_index, HashEntry(key, value))
+    def _increment_hashed(self, key: str, delta, key_hash: int) -> object:
+        """
+        Receives a key, an amount and the key's full hash then does
+        increment() without hashing the key.
+        """
+        self._prepare_insert(key, key_hash)
+        table = self._buckets
+
+        if self._probing.robin_hood:
+            key_index = self._find_index(key, key_hash)
+            if key_index is not None:
+                value = table.value_at(key_index) + delta
+                table.set_value(key_index, value)
+                return value
+            self._place(key, delta, key_hash)
+            self._size += 1
+            self._version += 1
+            return delta
+
+        check = table.check
+        tombstone_index = None
+        for key_index in self._probing.probe(key_hash, key, self._capacity):
+            state = check(key_index, key, key_hash)
+            if state == EMPTY:
+                break
+            if state == MATCH:
+                value = table.value_at(key_index) + delta
+                table.set_value(key_index, value)
+                return value
+            if state == TOMBSTONE and tombstone_index is None:
+                tombstone_index = key_index
+
+        if tombstone_index is not None:
+            key_index = tombstone_index
+            self._tombstones -= 1
+        table.store(key_index, key, delta, key_hash)
         self._size += 1
+        self._version += 1
+        return delta
+
+    def increment(self, key: str, delta=1) -> object:
+        """
+        Receives a key and an amount then adds the amount to the key's value,
+        adding the key with the amount as its value if it is not in the
+        HashMap, and returns the new value. The key is found or placed with
+        one walk along its probe sequence rather than a get() then a put().
+        """
+        return self._increment_hashed(key, delta, self._hash(key))
+
+    def increment_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/amount pairs then adds each amount to its
+        key's value, the same as calling increment() for each pair in order.
+        Every key in the batch is hashed in one pass; the table grows just as
+        it would with increment().
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+        for (key, delta), key_hash in zip(pairs, hashes):
+            self._increment_hashed(key, delta, key_hash & HASH_MASK)
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Resizes the current HashMap. Will accept an integer value which must
         be greater than the current size of the HashMap. If the integer is not
-        already prime, then the next largest prime number will be selected.
+        already prime, then the next largest prime number will be selected
+        (or the next power of two, if the probing strategy needs one).
 
         If an invalid (too small) integer is provided, then method returns
         immediately and does nothing.
@@ -162,25 +586,85 @@ class HashMap:
         if new_capacity < self._size:
             return
 
-        # if not prime change to the next highest prime number
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        self._finish_migration()
+        new_capacity = self._resize_capacity(new_capacity)
 
-        '''
-        while self._size / new_capacity > 0.5:
-            new_capacity = self._next_prime(new_capacity * 2)
-        '''
+        old_table = self._buckets
+        self._buckets = old_table.new_table(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._version += 1
 
-        new_map = HashMap(new_capacity, self._hash_function)
+        # move the existing entries across using the cached hash rather than
+        # hashing the key again
+        for index in range(old_table.length()):
+            if old_table.state(index) == LIVE:
+                self._place(*old_table.entry_at(index))
 
+    def purge_tombstones(self) -> None:
+        """
+        Removes every tombstone from the HashMap by rehashing the active
+        entries in place, keeping the same capacity and the same table.
+        Lookups that used to walk over tombstones get shorter.
+        """
+        # empty the table, keeping hold of the active entries
+        table = self._buckets
+        entries = []
         for index in range(self._capacity):
-            hash_element = self._buckets.get_at_index(index)
-            if hash_element and not hash_element.is_tombstone:
-                new_map.put(hash_element.key, hash_element.value)
+            state = table.state(index)
+            if state != EMPTY:
+                if state == LIVE:
+                    entries.append(table.entry_at(index))
+                table.clear_slot(index)
+
+        # then put them back using their cached hashes
+        self._tombstones = 0
+        self._version += 1
+        for key, value, key_hash in entries:
+            self._place(key, value, key_hash)
+
+    def _reserve_capacity(self, size: int) -> int:
+        """
+        Receives a number of keys then returns the table size that holds
+        that many within a table load of 0.5, taken from the prime ladder
+        (or the next power of two, if the probing strategy needs one).
+        """
+        if self._probing.power_of_two:
+            return self._table_size(2 * size)
+
+        return ladder_prime(2 * size) or self._next_prime(2 * size)
+
+    def reserve(self, size: int) -> None:
+        """
+        Receives a number of keys then grows the HashMap once so that it can
+        hold that many keys without another resize. Does nothing if it
+        already can.
+        """
+        if 2 * size <= self._capacity:
+            return
 
-        # swap new_map components to current HashMap
-        self._buckets = new_map._buckets
-        self._capacity = new_map._capacity
+        self.resize_table(self._reserve_capacity(size))
+
+    @classmethod
+    def from_pairs(cls, pairs, size_hint: int = None,
+                   function: callable = hash_function_1,
+                   **options) -> "HashMap":
+        """
+        Receives an iterable of key/value pairs then returns a new HashMap
+        holding them, created at a capacity big enough for all of them so it
+        is never resized while being filled. size_hint is the number of
+        pairs, needed only if pairs has no len(). Other keyword options are
+        passed to HashMap().
+        """
+        if size_hint is None:
+            if not hasattr(pairs, '__len__'):
+                pairs = list(pairs)
+            size_hint = len(pairs)
+
+        hash_map = cls(11, function, **options)
+        hash_map.reserve(size_hint)
+        hash_map.put_many(pairs)
+        return hash_map
 
     def table_load(self) -> float:
         """
@@ -190,29 +674,28 @@ class HashMap:
 
     def empty_buckets(self) -> int:
         """
-        Returns the current number of empty buckets in the HashMap.
+        Returns the current number of empty buckets in the HashMap. Buckets
+        holding a tombstone are not empty.
+        """
+        self._finish_migration()
+        return self._capacity - self._size - self._tombstones
+
+    def get_tombstone_count(self) -> int:
+        """
+        Returns the number of tombstones currently in the HashMap.
         """
-        return self._capacity - self._size
+        return self._tombstones
 
     def get(self, key: str) -> object:
         """
         Receives a key then returns its value if it is in the HashMap. If not,
         then returns None.
         """
-        # get our starting index
-        key_index = self._hash_index(key)
-        initial_index = key_index
-
-        # iterate through buckets, using quadratic probing if necessary
-        hash_entry = self._buckets.get_at_index(key_index)
-        j = 1
-        while hash_entry:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                return hash_entry.value
-            else:  # quadratic probe until we find the key or an empty spot
-                key_index = (initial_index + j ** 2) % self._capacity
-                hash_entry = self._buckets.get_at_index(key_index)
-                j += 1
+        self._migrate()
+
+        table, key_index = self._locate(key, self._hash(key))
+        if key_index is not None:
+            return table.value_at(key_index)
 
         return None
 
@@ -221,44 +704,40 @@ class HashMap:
         Receives a key then returns True if it is in the HashMap. If not,
         then returns False.
         """
-        # get our starting index
-        key_index = self._hash_index(key)
-        initial_index = key_index
+        self._migrate()
 
-        # iterate through buckets, using quadratic probing if necessary
-        hash_entry = self._buckets.get_at_index(key_index)
-        j = 1
-        while hash_entry:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                return True
-            else:  # quadratic probe until we find the key or an empty spot
-                key_index = (initial_index + j ** 2) % self._capacity
-                hash_entry = self._buckets.get_at_index(key_index)
-                j += 1
-
-        return False
+        return self._locate(key, self._hash(key))[1] is not None
 
     def remove(self, key: str) -> None:
         """
         Receives a key then removes it if it is in the HashMap. If not,
         then no changes are made to the HashMap.
+
+        Leaves a tombstone behind, unless the HashMap was created with
+        deletion='backward_shift'.
         """
-        # get our starting index
-        key_index = self._hash_index(key)
-        initial_index = key_index
-
-        # iterate through buckets, using quadratic probing if necessary
-        hash_entry = self._buckets.get_at_index(key_index)
-        j = 1
-        while hash_entry:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                hash_entry.is_tombstone = True
-                self._size -= 1
-                return
-            else:  # quadratic probe until we find the key or an empty spot
-                key_index = (initial_index + j ** 2) % self._capacity
-                hash_entry = self._buckets.get_at_index(key_index)
-                j += 1
+        key_hash = self._hash(key)
+        if self._old_buckets is not None:
+            self._migrate_key(key, key_hash)
+
+        key_index = self._find_index(key, key_hash)
+        if key_index is None:
+            return
+
+        self._size -= 1
+        self._version += 1
+        if self._deletion == 'backward_shift':
+            self._backward_shift(key_index)
+        else:
+            self._buckets.mark_tombstone(key_index)
+            self._tombstones += 1
+
+            # clean up once tombstones take up too much of the table
+            if (self._tombstone_threshold is not None and self._tombstones
+                    > self._tombstone_threshold * self._capacity):
+                self.purge_tombstones()
+
+        self._shrink_if_sparse()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -266,57 +745,364 @@ class HashMap:
         HashMap. Each element in the DynamicArray will be a tuple consisting
         of the key and value.
         """
+        self._finish_migration()
         hash_map_array = DynamicArray()
 
+        table = self._buckets
         for element in range(self._capacity):
-            hash_entry = self._buckets.get_at_index(element)
-            if hash_entry and not hash_entry.is_tombstone:
-                hash_map_array.append((hash_entry.key, hash_entry.value))
+            if table.state(element) == LIVE:
+                key, value, _ = table.entry_at(element)
+                hash_map_array.append((key, value))
 
         return hash_map_array
 
-    def clear(self) -> None:
+    def clear(self, shrink: bool = False) -> None:
         """
         Clears the entire HashMap of all keys and values. The capacity of the
-        HashMap is not changed.
+        HashMap is not changed, unless shrink is True, which goes back to the
+        starting capacity.
         """
-        new_map = HashMap(self._capacity, self._hash_function)
-
-        self._buckets = new_map._buckets
+        if shrink:
+            self._capacity = self._min_capacity
+        self._buckets = self._buckets.new_table(self._capacity)
         self._size = 0
+        self._tombstones = 0
+        self._version += 1
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
 
-    def __iter__(self):
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/value pairs then adds all of them to the
+        HashMap, the same as calling put() for each pair in order.
+
+        Every key in the batch is hashed in one pass and the table is resized
+        at most once up front, so no load checks are needed per key. Keys
+        that share a hash are put with _insert_shared().
+        """
+        pairs = list(pairs)
+        hashes = [key_hash & HASH_MASK for key_hash
+                  in hash_many(self._hash_function, [key for key, _ in pairs])]
+        self._finish_migration()
+
+        # presize so the whole batch fits within a table load of 0.5
+        needed = self._size + len(pairs)
+        if needed / self._capacity > 0.5:
+            self.resize_table(needed * 2)
+        elif (needed + self._tombstones) / self._capacity > 0.5:
+            self.purge_tombstones()
+
+        if self._probing.robin_hood or self._probing.uses_key:
+            for (key, value), key_hash in zip(pairs, hashes):
+                self._insert(key, value, key_hash)
+        else:
+            self._insert_shared(pairs, hashes)
+
+    def _insert_shared(self, pairs: list, hashes: list) -> None:
+        """
+        Receives key/value pairs and their full hashes then adds or updates
+        all of them in order without checking the table load, the same as
+        _insert() for each, for a probing strategy that uses only the hash.
+
+        Keys that share a hash share a probe sequence, so each such sequence
+        is walked once rather than once per key. The walk up to its first
+        empty bucket finds every key already in the HashMap with the hash,
+        and each new key with the hash takes the first bucket along it that
+        is not live, carrying on from where the last one stopped. That is
+        the bucket _insert() would choose, so the table ends up the same.
+        """
+        # number each hash shared by more than one key in the batch, finding
+        # them as neighbours once the batch is sorted by hash. Most batches
+        # share none, which a set shows more cheaply than sorting
+        groups = [None] * len(pairs)
+        shared = 0
+        if len(set(hashes)) < len(hashes):
+            by_hash = sorted(range(len(pairs)), key=hashes.__getitem__)
+            ordered = [hashes[position] for position in by_hash]
+            for rank in compress(range(1, len(ordered)),
+                                 map(eq, ordered, ordered[1:])):
+                if groups[by_hash[rank - 1]] is None:
+                    groups[by_hash[rank - 1]] = shared
+                    shared += 1
+                groups[by_hash[rank]] = shared - 1
+
+        # for each shared hash: the keys with it and their buckets, the
+        # buckets passed that were free, and the rest of its probe sequence
+        found_keys, found_at = [None] * shared, [None] * shared
+        free, probes = [None] * shared, [None] * shared
+        table = self._buckets
+        check, probe = table.check, self._probing.probe
+        capacity = self._capacity
+
+        for (key, value), key_hash, group in zip(pairs, hashes, groups):
+            if group is None:  # as in _insert()
+                tombstone_index = None
+                for key_index in probe(key_hash, key, capacity):
+                    state = check(key_index, key, key_hash)
+                    if state == EMPTY or state == MATCH:
+                        break
+                    if state == TOMBSTONE and tombstone_index is None:
+                        tombstone_index = key_index
+
+                if state == MATCH:
+                    table.set_value(key_index, value)
+                    continue
+                if tombstone_index is not None:
+                    key_index = tombstone_index
+                    self._tombstones -= 1
+                table.store(key_index, key, value, key_hash)
+                self._size += 1
+                self._version += 1
+                continue
+
+            if found_keys[group] is None:  # first key with this hash
+                found_keys[group], found_at[group] = [], []
+                free[group] = deque()
+                probes[group] = probe(key_hash, key, capacity)
+                for key_index in probes[group]:
+                    state = table.state(key_index)
+                    if state != LIVE:
+                        free[group].append(key_index)
+                        if state == EMPTY:
+                            break
+                    elif table.hash_at(key_index) == key_hash:
+                        found_keys[group].append(table.entry_at(key_index)[0])
+                        found_at[group].append(key_index)
+
+            try:  # update existing key
+                position = found_keys[group].index(key)
+                table.set_value(found_at[group][position], value)
+                continue
+            except ValueError:
+                pass
+
+            # buckets passed may since have been taken by other hashes
+            while True:
+                if free[group]:
+                    key_index = free[group].popleft()
+                else:
+                    key_index = next(probes[group])
+                state = table.state(key_index)
+                if state != LIVE:
+                    break
+
+            if state == TOMBSTONE:
+                self._tombstones -= 1
+            table.store(key_index, key, value, key_hash)
+            found_keys[group].append(key)
+            found_at[group].append(key_index)
+            self._size += 1
+            self._version += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray with the value
+        of each key, or None for keys that are not in the HashMap. Values are
+        in the same order as the keys.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        values = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            table, key_index = self._locate(key, key_hash & HASH_MASK)
+            values.append(None if key_index is None
+                          else table.value_at(key_index))
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray of booleans,
+        True for each key that is in the HashMap and False otherwise.
         """
-        Defines the starting index to be used in the __next__ method.
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        found = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            found.append(
+                self._locate(key, key_hash & HASH_MASK)[1] is not None)
+
+        return found
+
+    def memory_report(self) -> dict:
         """
-        self._index = 0
+        Returns a dictionary with the bytes used by the HashMap, measured with
+        sys.getsizeof():
+            buckets - the bucket array
+            nodes   - the HashEntry objects (0 for the compact table)
+            keys    - the keys
+            values  - the values
+            total   - all of the above
+        Objects shared between entries (e.g. small ints) are counted for each
+        entry that uses them.
+        """
+        self._finish_migration()
+        report = self._buckets.memory_report()
+        report['total'] = sum(report.values())
+        return report
 
-        return self
+    def save(self, path: str) -> None:
+        """
+        Receives a file path then writes a binary snapshot of the HashMap to
+        it (see hash_map_snapshot) that HashMap.load() can map back into
+        memory without rebuilding the table. Keys and values must be
+        picklable, and the hash function importable by name or passed to
+        load(). The probing strategy must be one of the built in ones, with
+        a DoubleHashing step function importable by name.
+        """
+        hash_map_snapshot.save(self, path)
 
-    def __next__(self):
+    @classmethod
+    def load(cls, path: str, function=None) -> "HashMap":
         """
-        Starts with the index provided in the self_index variable initialized
-        by the __iter__ method.
+        Receives the path of a file written by save() then returns a HashMap
+        that serves lookups straight from the memory-mapped file, so loading
+        takes about the same time however many keys were saved. The first
+        put(), put_many(), remove() or purge_tombstones() copies the table
+        into memory and closes the file. The saved hash function is used
+        unless another is given.
+        """
+        return hash_map_snapshot.load(cls, path, function)
 
-        Iterates through the HashMap contents until finding an active element.
-        Empty array nodes and element with tombstone values are passed over.
+    def close(self) -> None:
+        """
+        Closes the snapshot file a HashMap returned by load() is still
+        reading from, leaving the HashMap empty. resize_table() and clear()
+        close it too, and the first put() or remove() copies the table into
+        memory and closes it. Does nothing for any other HashMap.
         """
-        # handle a DynamicArray of size=0
-        try:
-            hash_entry = self._buckets.get_at_index(self._index)
-        except DynamicArrayException:
-            raise StopIteration
+        hash_map_snapshot.close(self)
 
-        # iterate through array until we find an active HashMap element
-        while hash_entry is None or hash_entry.is_tombstone:
-            self._index += 1
-            try:
-                hash_entry = self._buckets.get_at_index(self._index)
-            except DynamicArrayException:
-                raise StopIteration
+    def _probe_length(self, key: str) -> tuple:
+        """
+        Receives a key then returns (found, probes, tombstones): whether the
+        key is in the HashMap, how many buckets a lookup visits and how many
+        of those hold tombstones, counting both tables during an incremental
+        resize.
+        """
+        key_hash = self._hash(key)
+        tables = [(self._buckets, self._capacity)]
+        if self._old_buckets is not None:
+            tables.append((self._old_buckets, self._old_capacity))
+        robin_hood = self._probing.robin_hood
+
+        probes, tombstones = 0, 0
+        for table, capacity in tables:
+            probe_length = 0
+            for key_index in islice(
+                    self._probing.probe(key_hash, key, capacity), capacity):
+                probes += 1
+                state = table.check(key_index, key, key_hash)
+                if state == MATCH:
+                    return True, probes, tombstones
+                if state == EMPTY:
+                    break
+                if state == TOMBSTONE:
+                    tombstones += 1
+                if robin_hood:
+                    if self._probing.distance(table.hash_at(key_index),
+                                              key_index,
+                                              capacity) < probe_length:
+                        break
+                    probe_length += 1
+
+        return False, probes, tombstones
+
+    def _chain_lengths(self) -> dict:
+        """
+        Returns a dictionary of {probe length: number of keys} giving the
+        number of buckets a lookup of each key in the HashMap visits, the
+        open addressing counterpart of SC chain lengths.
+        """
+        self._finish_migration()
+        lengths = {}
+        table = self._buckets
+        for element in range(self._capacity):
+            if table.state(element) == LIVE:
+                length = self._probe_length(table.entry_at(element)[0])[1]
+                lengths[length] = lengths.get(length, 0) + 1
+
+        return dict(sorted(lengths.items()))
+
+    def enable_stats(self, alert_threshold: float = None,
+                     on_alert=None) -> None:
+        """
+        Starts recording lookup and resize statistics for the HashMap, read
+        with get_stats(). Lookups cost about twice as much while recording;
+        with stats disabled (the default) there is no extra cost at all.
+
+        If alert_threshold is given, on_alert(mean) is called whenever the
+        mean probe length of recorded lookups rises above it.
+        """
+        hash_map_stats.enable(self, alert_threshold, on_alert)
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording statistics and discards those recorded so far.
+        """
+        hash_map_stats.disable(self)
 
-        self._index += 1
-        return hash_entry
+    def get_stats(self) -> dict:
+        """
+        Returns a snapshot of the recorded statistics (see
+        hash_map_stats.MapStats.snapshot), or None if stats are not enabled.
+        chain_lengths holds the number of keys with each lookup probe length.
+        """
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot(self._chain_lengths())
+
+    def _live_indices(self):
+        """
+        Yields (table, index) for every live bucket, after finishing any
+        incremental resize. Raises RuntimeError if the HashMap is changed
+        (other than a value being replaced) before the last one has been
+        yielded.
+        """
+        self._finish_migration()
+        version = self._version
+        table = self._buckets
+        for element in range(self._capacity):
+            if table.state(element) == LIVE:
+                yield table, element
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """
+        Returns an iterator over every key in the HashMap. Nothing is copied,
+        so any number of iterators can be used at once, but the HashMap must
+        not have keys added or removed while they are in use.
+        """
+        return (table.entry_at(index)[0]
+                for table, index in self._live_indices())
+
+    def values(self):
+        """
+        Returns an iterator over every value in the HashMap, as for keys().
+        """
+        return (table.value_at(index)
+                for table, index in self._live_indices())
+
+    def items(self):
+        """
+        Returns an iterator over every key/value pair in the HashMap, as
+        tuples, as for keys().
+        """
+        return (table.entry_at(index)[:2]
+                for table, index in self._live_indices())
+
+    def __iter__(self):
+        """
+        Returns an iterator over the HashEntry of every live bucket. Each
+        iterator keeps its own place, so iterations can be nested.
+        """
+        return (table.get_at_index(index)
+                for table, index in self._live_indices())
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -8,37 +8,95 @@
 # key is present, to get all keys and values and to clear the HashMap entirely.
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import heapq
+from itertools import chain, groupby
+from operator import itemgetter
+from sys import getsizeof
+
+import hash_map_stats
+from primes import ladder_prime
+from a6_include import (DynamicArray, LinkedList, SLNode, SortedBucket,
+                        hash_function_1, hash_function_2, hash_many)
+
+try:  # optional, only used by find_mode()'s fast path
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# a LinkedList bucket longer than this becomes a SortedBucket, and goes back
+# to being a LinkedList once it is this short again
+SORTED_BUCKET_THRESHOLD = 8
+LINKED_BUCKET_THRESHOLD = 6
+
+# find_mode() counts a DynamicArray with NumPy when it has at least this many
+# values, all ints, all floats or all strings no longer than NUMPY_MAX_STRING
+NUMPY_MIN_VALUES = 1000
+NUMPY_MAX_STRING = 64
 
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 resize_step: int = 8,
+                 sorted_buckets: bool = True,
+                 shrink_load: float = None) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Empty buckets are None; a LinkedList is only created for a bucket
+        once a key is put in it.
+        incremental=True spreads the rehash done when put() grows the table
+        over later operations, each moving resize_step old buckets across,
+        instead of rehashing everything at once.
+        Buckets with long chains are kept as SortedBuckets so lookups in them
+        are binary searches, unless sorted_buckets is False.
+        remove() halves the capacity once the table load drops below
+        shrink_load, never going below the starting capacity. It must be at
+        most 0.25, so a table just grown or shrunk is never close to
+        resizing the other way. None (the default) never shrinks.
         """
-        self._buckets = DynamicArray()
+        if shrink_load is not None and not 0 < shrink_load <= 0.25:
+            raise ValueError(f"shrink_load must be in (0, 0.25], not "
+                             f"{shrink_load}")
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._min_capacity = self._capacity
+        self._shrink_load = shrink_load
+        self._buckets = DynamicArray([None] * self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._sorted_buckets = sorted_buckets
+
+        # bumped by every change to which keys are where, so iterators can
+        # tell the HashMap changed under them
+        self._version = 0
+
+        # the table being migrated from during an incremental resize
+        self._incremental = incremental
+        self._resize_step = resize_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+        self._stats = None  # see enable_stats()
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Empty buckets print as an empty LinkedList
         """
+        self._finish_migration()
         out = ''
         for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+            bucket = self._buckets[i]
+            if bucket is None:
+                bucket = LinkedList()
+            out += str(i) + ': ' + str(bucket) + '\n'
         return out
 
     def _next_prime(self, capacity: int) -> int:
@@ -90,19 +148,246 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
-    def _hash_index(self, key: str) -> int:
+    def _bucket(self, key_hash: int) -> LinkedList:
         """
-        Receives a key value then hashes and uses modulo to determine and
-        return the target index of the array for the given key.
+        Receives the full hash of a key then uses modulo to determine and
+        return the LinkedList bucket for that key, or None if that bucket is
+        empty.
 
         Uses the current capacity of the current HashMap in the calculation.
+        """
+        return self._buckets.get_at_index(key_hash % self._capacity)
+
+    def _find_node(self, key: str, key_hash: int) -> SLNode:
+        """
+        Receives a key and the key's full hash then returns the node holding
+        that key, or None if the key is not in the HashMap.
 
-        Returns the target key index as an integer.
+        Checks the old table too while an incremental resize is in progress.
         """
-        key_hash = self._hash_function(key)  # get hash of key
-        key_index = key_hash % self._capacity  # find target index
+        node = None
+        linked_list = self._buckets.get_at_index(key_hash % self._capacity)
+        if linked_list is not None:
+            node = linked_list.contains(key, key_hash)
 
-        return key_index
+        if node is None and self._old_buckets is not None:
+            linked_list = self._old_buckets.get_at_index(
+                key_hash % self._old_capacity)
+            if linked_list is not None:
+                node = linked_list.contains(key, key_hash)
+
+        return node
+
+    def _rebalance_bucket(self, buckets: DynamicArray, key_index: int,
+                          bucket) -> None:
+        """
+        Receives a bucket array, an index and the bucket at that index then
+        swaps a LinkedList that has grown past SORTED_BUCKET_THRESHOLD for a
+        SortedBucket, or a SortedBucket that has shrunk to
+        LINKED_BUCKET_THRESHOLD for a LinkedList. The nodes are reused.
+        """
+        length = bucket.length()
+        if type(bucket) is LinkedList:
+            if self._sorted_buckets and length > SORTED_BUCKET_THRESHOLD:
+                buckets.set_at_index(key_index, SortedBucket(bucket))
+        elif length <= LINKED_BUCKET_THRESHOLD:
+            linked_list = LinkedList()
+            for node in bucket:
+                linked_list.insert_node(node)
+            buckets.set_at_index(key_index, linked_list)
+
+    def _relink(self, linked_list: LinkedList, buckets: DynamicArray,
+                capacity: int) -> None:
+        """
+        Receives a bucket and a bucket array with its capacity then moves
+        every node of the bucket into the bucket array. No nodes are allocated
+        and the cached hash on each node means no key is hashed again.
+        """
+        for node in linked_list:  # iterator has already moved on
+            key_index = node.hash % capacity
+            new_list = buckets.get_at_index(key_index)
+            if new_list is None:
+                new_list = LinkedList()
+                buckets.set_at_index(key_index, new_list)
+            new_list.insert_node(node)
+            if new_list.length() > SORTED_BUCKET_THRESHOLD:
+                self._rebalance_bucket(buckets, key_index, new_list)
+
+    def _migrate_bucket(self, old_index: int) -> None:
+        """
+        Receives the index of a bucket in the old table then moves all of its
+        nodes into the current table, leaving the old bucket empty.
+        """
+        linked_list = self._old_buckets.get_at_index(old_index)
+        if linked_list is not None:
+            self._relink(linked_list, self._buckets, self._capacity)
+            self._old_buckets.set_at_index(old_index, None)
+
+    def _migrate(self, step: int = None) -> None:
+        """
+        Moves the next step old buckets (resize_step by default) into the
+        current table while an incremental resize is in progress, dropping
+        the old table once every bucket has been moved.
+        """
+        if self._old_buckets is None:
+            return
+
+        stepping = step is None
+        if stepping:
+            step = self._resize_step
+        stop = min(self._migrate_index + step, self._old_capacity)
+        for old_index in range(self._migrate_index, stop):
+            self._migrate_bucket(old_index)
+        self._migrate_index = stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_index = 0
+
+            # removes made during the resize may have left the new table
+            # sparse enough to shrink again. Not when finishing at once: the
+            # caller expects no resize in progress afterwards
+            if stepping:
+                self._shrink_if_sparse()
+
+    def _finish_migration(self) -> None:
+        """
+        Moves every remaining old bucket into the current table, ending any
+        incremental resize in progress.
+        """
+        self._migrate(self._old_capacity)
+
+    def _resize_capacity(self, new_capacity: int) -> int:
+        """
+        Receives a requested capacity then returns the prime capacity to
+        resize to, grown as needed to keep a table load of 1.0 or less.
+        """
+        # if not prime change to the next highest prime number
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # Now we make sure we're staying within a valid load factor of <= 1.0.
+        # This allows for load factor of 1.0 since a full table is valid and
+        # can be resized, and the load factor will be handled on the next
+        # invocation of the put() method.
+        while self._size / new_capacity > 1:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        return new_capacity
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Receives a new capacity then starts an incremental resize to it: the
+        current table becomes the old table and an empty table of the new
+        capacity takes its place. Nodes are moved across by later operations.
+        """
+        self._finish_migration()  # only one resize runs at a time
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._capacity = self._resize_capacity(new_capacity)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._version += 1
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halves the capacity, to the next prime, if the table load has dropped
+        below shrink_load. Shrinks incrementally when the HashMap resizes
+        incrementally; otherwise the rehash is paid for by the removes that
+        emptied the table.
+        """
+        if (self._shrink_load is None or self._old_buckets is not None
+                or self._capacity <= self._min_capacity
+                or self._size >= self._shrink_load * self._capacity):
+            return
+
+        new_capacity = max(self._capacity // 2, self._min_capacity)
+        if self._incremental:
+            self._start_resize(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Receives a key/value pair and the key's full hash, then inserts into
+        the current HashMap without checking the table load. The hash is
+        cached on the node so the key never needs to be hashed again.
+        """
+        key_index = key_hash % self._capacity
+        linked_list = self._buckets.get_at_index(key_index)
+        if linked_list is None:  # first key in this bucket
+            linked_list = LinkedList()
+            self._buckets.set_at_index(key_index, linked_list)
+
+        # replace the value if the key is in the bucket, else add a new node
+        # and increment size, in a single pass over the bucket
+        if linked_list.upsert(key, value, key_hash):
+            self._size += 1
+            self._version += 1
+            if linked_list.length() > SORTED_BUCKET_THRESHOLD:
+                self._rebalance_bucket(self._buckets, key_index, linked_list)
+
+    def _merge_sorted(self, key_index: int, run) -> None:
+        """
+        Receives the index of a SortedBucket and an iterable of (index, key,
+        value, hash) for keys in that bucket then puts them all, in order.
+        The bucket's nodes and a new node for each key are sorted together
+        once, rather than each key being searched for and inserted on its
+        own. The sort is stable, so for a key that appears more than once the
+        first node is kept (the existing one, if any) and given the last
+        value. Keys that can't be ordered are upserted one at a time.
+        """
+        bucket = self._buckets.get_at_index(key_index)
+        run = list(run)
+        nodes = list(bucket)
+        nodes.extend(SLNode(key, value, None, key_hash)
+                     for _, key, value, key_hash in run)
+        try:
+            nodes.sort(key=lambda node: (node.hash, node.key))
+        except TypeError:
+            added = sum(bucket.upsert(key, value, key_hash)
+                        for _, key, value, key_hash in run)
+            if added:
+                self._size += added
+                self._version += 1
+            return
+
+        merged = [nodes[0]]
+        for node in nodes[1:]:
+            last = merged[-1]
+            if node.hash == last.hash and node.key == last.key:
+                last.value = node.value
+            else:
+                merged.append(node)
+
+        if len(merged) != bucket.length():
+            self._size += len(merged) - bucket.length()
+            self._version += 1
+        self._buckets.set_at_index(key_index, SortedBucket(merged))
+
+    def _prepare_put(self, key_hash: int) -> None:
+        """
+        Receives the full hash of a key about to be added or updated then
+        grows the table if put() needs to, and moves the key's bucket out of
+        the old table during an incremental resize.
+        """
+        # check for load factor >= 1 and resize if necessary
+        if self.table_load() >= 1.0:
+            # doubles current capacity then resizes
+            if self._incremental:
+                self._start_resize(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity * 2)
+
+        if self._old_buckets is not None:
+            # move the key's old bucket across too so it is only ever in one
+            # table. Step first: finishing the resize may start a shrink
+            self._migrate()
+            if self._old_buckets is not None:
+                self._migrate_bucket(key_hash % self._old_capacity)
 
     def put(self, key: str, value: object) -> None:
         """
@@ -112,23 +397,55 @@ class HashMap:
 
         Maintains a HashMap table load of 1 or less.
         """
-        # check for load factor >= 1 and resize if necessary
-        if self.table_load() >= 1.0:
-            # doubles current capacity then resizes
-            self.resize_table(self._capacity * 2)
-
-        # get the target key index
-        key_index = self._hash_index(key)
+        key_hash = self._hash_function(key)
+        self._prepare_put(key_hash)
+        self._put_hashed(key, value, key_hash)
 
-        # if LL contains key, remove and add new key
-        # else add new key and increment size
+    def _increment_hashed(self, key: str, delta, key_hash: int) -> object:
+        """
+        Receives a key, an amount and the key's full hash then does
+        increment() without hashing the key.
+        """
+        self._prepare_put(key_hash)
+        key_index = key_hash % self._capacity
         linked_list = self._buckets.get_at_index(key_index)
-        if linked_list.contains(key):  # replace value
-            linked_list.remove(key)
-            linked_list.insert(key, value)
-        else:  # insert new value
-            linked_list.insert(key, value)
+        if linked_list is None:  # first key in this bucket
+            linked_list = LinkedList()
+            self._buckets.set_at_index(key_index, linked_list)
+
+        node, inserted = linked_list.setdefault(key, 0, key_hash)
+        node.value += delta
+        if inserted:
             self._size += 1
+            self._version += 1
+            if linked_list.length() > SORTED_BUCKET_THRESHOLD:
+                self._rebalance_bucket(self._buckets, key_index, linked_list)
+
+        return node.value
+
+    def increment(self, key: str, delta=1) -> object:
+        """
+        Receives a key and an amount then adds the amount to the key's value,
+        adding the key with the amount as its value if it is not in the
+        HashMap, and returns the new value. The key's bucket is walked once,
+        rather than once by get() and again by put().
+        """
+        return self._increment_hashed(key, delta, self._hash_function(key))
+
+    def increment_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/amount pairs then adds each amount to its
+        key's value, the same as calling increment() for each pair in order,
+        e.g. to merge counts made by another HashMap.
+
+        Every key in the batch is hashed in one pass. Unlike put_many() the
+        table isn't presized, since how many of the keys are new isn't known,
+        so it grows exactly as it would with increment().
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+        for (key, delta), key_hash in zip(pairs, hashes):
+            self._increment_hashed(key, delta, key_hash)
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -142,33 +459,54 @@ class HashMap:
         if new_capacity < 1:
             return
 
-        # if not prime change to the next highest prime number
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
-
-        # Now we make sure we're staying within a valid load factor of <= 1.0.
-        # This allows for load factor of 1.0 since a full table is valid and
-        # can be resized, and the load factor will be handled on the next
-        # invocation of the put() method.
-        while self._size / new_capacity > 1:
-            new_capacity = self._next_prime(new_capacity * 2)
+        self._finish_migration()
+        new_capacity = self._resize_capacity(new_capacity)
 
-        # create new HashMap with new capacity and existing hash function
-        new_map = HashMap(new_capacity, self._hash_function)
+        # build the new bucket array, then move every existing node into it.
+        # No duplicate checks are needed since keys are already unique.
+        new_buckets = DynamicArray([None] * new_capacity)
 
-        # iterate through every element in the original array
-        # check if that LL has any nodes
-        # iterate through existing nodes putting all into new map
-        # put() will handle resizing and rehashing of keys
         for element in range(self._capacity):
             linked_list = self._buckets.get_at_index(element)
-            if linked_list.length() > 0:
-                for node in linked_list:
-                    new_map.put(node.key, node.value)  # indirect recursion
+            if linked_list is not None:
+                self._relink(linked_list, new_buckets, new_capacity)
 
-        # swap new_map components to current HashMap
-        self._buckets = new_map._buckets
-        self._capacity = new_map._capacity
+        # swap new components to current HashMap
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        self._version += 1
+
+    def reserve(self, size: int) -> None:
+        """
+        Receives a number of keys then grows the HashMap once, to a prime
+        capacity taken from the prime ladder, so that it can hold that many
+        keys without another resize. Does nothing if it already can.
+        """
+        if size <= self._capacity:
+            return
+
+        self.resize_table(ladder_prime(size) or self._next_prime(size))
+
+    @classmethod
+    def from_pairs(cls, pairs, size_hint: int = None,
+                   function: callable = hash_function_1,
+                   **options) -> "HashMap":
+        """
+        Receives an iterable of key/value pairs then returns a new HashMap
+        holding them, created at a capacity big enough for all of them so it
+        is never resized while being filled. size_hint is the number of
+        pairs, needed only if pairs has no len(). Other keyword options are
+        passed to HashMap().
+        """
+        if size_hint is None:
+            if not hasattr(pairs, '__len__'):
+                pairs = list(pairs)
+            size_hint = len(pairs)
+
+        hash_map = cls(function=function, **options)
+        hash_map.reserve(size_hint)
+        hash_map.put_many(pairs)
+        return hash_map
 
     def table_load(self) -> float:
         """
@@ -180,10 +518,11 @@ class HashMap:
         """
         Returns the number of empty buckets in the current HashMap.
         """
+        self._finish_migration()
+
         empty_buckets = 0
         for bucket in range(self._capacity):
-            linked_list = self._buckets.get_at_index(bucket)
-            if linked_list.length() == 0:
+            if self._buckets.get_at_index(bucket) is None:
                 empty_buckets += 1
 
         return empty_buckets
@@ -193,10 +532,9 @@ class HashMap:
         Receives a key then returns the value associated with the key if it
         exists, or returns None otherwise.
         """
-        key_index = self._hash_index(key)
+        self._migrate()
 
-        linked_list = self._buckets.get_at_index(key_index)
-        node = linked_list.contains(key)
+        node = self._find_node(key, self._hash_function(key))
         if node:
             return node.value
         else:
@@ -207,10 +545,9 @@ class HashMap:
         Receives a key then checks if the key exists in the HashMap. Returns
         True if so, False otherwise.
         """
-        key_index = self._hash_index(key)
-        linked_list = self._buckets.get_at_index(key_index)
+        self._migrate()
 
-        if linked_list.contains(key):
+        if self._find_node(key, self._hash_function(key)):
             return True
         else:
             return False
@@ -220,68 +557,449 @@ class HashMap:
         Receives a key then finds the key in the HashMap and removes it. If the
         key is not found, then nothing happens and nothing is returned.
         """
-        key_index = self._hash_index(key)
+        key_hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            self._migrate()
+            if self._old_buckets is not None:
+                self._migrate_bucket(key_hash % self._old_capacity)
 
         # get the linked list at node and removes the key if present
         # decrements the size if we successfully removed a key
+        # a bucket left with no nodes goes back to None
+        key_index = key_hash % self._capacity
         linked_list = self._buckets.get_at_index(key_index)
-        if linked_list.remove(key):
+        if linked_list is not None and linked_list.remove(key, key_hash):
             self._size -= 1
+            self._version += 1
+            if linked_list.length() == 0:
+                self._buckets.set_at_index(key_index, None)
+            elif (type(linked_list) is SortedBucket
+                  and linked_list.length() <= LINKED_BUCKET_THRESHOLD):
+                self._rebalance_bucket(self._buckets, key_index, linked_list)
+            self._shrink_if_sparse()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns an array of all key/value pairs in the entire HashMap. Pairs
         will be returned as individual tuples for each pair.
+
+        Pairs come bucket by bucket. New keys go at the front of a
+        LinkedList bucket, and a key whose value is updated keeps its place.
+        A SortedBucket holds its keys by hash, then by key when they can be
+        ordered.
         """
+        self._finish_migration()
         hash_map_array = DynamicArray()
 
         for element in range(self._capacity):
             linked_list = self._buckets.get_at_index(element)
-            if linked_list.length() > 0:
+            if linked_list is not None:
                 for node in linked_list:
                     hash_map_array.append((node.key, node.value))
 
         return hash_map_array
 
-    def clear(self) -> None:
+    def _nodes(self):
+        """
+        Yields every node in the HashMap, one bucket at a time, after
+        finishing any incremental resize. Raises RuntimeError if the HashMap
+        is changed (other than a value being replaced) before the last node
+        has been yielded.
+        """
+        self._finish_migration()
+        version = self._version
+        buckets = self._buckets
+        for element in range(self._capacity):
+            linked_list = buckets.get_at_index(element)
+            if linked_list is not None:
+                for node in linked_list:
+                    yield node
+                    if self._version != version:
+                        raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """
+        Returns an iterator over every key in the HashMap. Nothing is copied,
+        so any number of iterators can be used at once, but the HashMap must
+        not have keys added or removed while they are in use.
+        """
+        return (node.key for node in self._nodes())
+
+    def values(self):
+        """
+        Returns an iterator over every value in the HashMap, as for keys().
+        """
+        return (node.value for node in self._nodes())
+
+    def items(self):
+        """
+        Returns an iterator over every key/value pair in the HashMap, as
+        tuples, as for keys().
+        """
+        return ((node.key, node.value) for node in self._nodes())
+
+    def clear(self, shrink: bool = False) -> None:
         """
-        Clears the HashMap but retains the current capacity.
+        Clears the HashMap but retains the current capacity, unless shrink is
+        True, which goes back to the starting capacity.
         """
-        new_map = HashMap(self._capacity)
-        self._buckets = new_map._buckets
+        if shrink:
+            self._capacity = self._min_capacity
+        self._buckets = DynamicArray([None] * self._capacity)
         self._size = 0
+        self._version += 1
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/value pairs then inserts all of them into
+        the current HashMap, the same as calling put() for each pair in order.
+
+        Every key in the batch is hashed in one pass and the table is resized
+        at most once up front, so no load checks are needed per key, and the
+        keys are put by a loop over the bucket list itself. Keys whose bucket
+        is a SortedBucket are set aside and merged into it at the end, all at
+        once per bucket (see _merge_sorted()).
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+        self._finish_migration()
+
+        # presize so the whole batch fits within a table load of 1
+        if self._size + len(pairs) > self._capacity:
+            self.resize_table(self._size + len(pairs))
+
+        capacity = self._capacity
+        buckets = self._buckets._data  # every key_index is in range
+        size = self._size
+        deferred = []
+        for (key, value), key_hash in zip(pairs, hashes):
+            key_index = key_hash % capacity
+            bucket = buckets[key_index]
+            if bucket is None:  # first key in this bucket
+                bucket = LinkedList()
+                buckets[key_index] = bucket
+                bucket.insert(key, value, key_hash)
+                size += 1
+            elif type(bucket) is SortedBucket:
+                deferred.append((key_index, key, value, key_hash))
+            elif bucket.upsert(key, value, key_hash):
+                size += 1
+                if bucket.length() > SORTED_BUCKET_THRESHOLD:
+                    self._rebalance_bucket(self._buckets, key_index, bucket)
+
+        if size != self._size:
+            self._size = size
+            self._version += 1
+
+        # sorting is stable, so each bucket's keys stay in batch order
+        deferred.sort(key=itemgetter(0))
+        for key_index, run in groupby(deferred, itemgetter(0)):
+            self._merge_sorted(key_index, run)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray with the value
+        of each key, or None for keys that are not in the HashMap. Values are
+        in the same order as the keys.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        values = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            node = self._find_node(key, key_hash)
+            values.append(node.value if node else None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray of booleans,
+        True for each key that is in the HashMap and False otherwise.
+        """
+        keys = list(keys)
+        hashes = hash_many(self._hash_function, keys)
+
+        found = DynamicArray()
+        for key, key_hash in zip(keys, hashes):
+            node = self._find_node(key, key_hash)
+            found.append(node is not None)
+
+        return found
+
+    def memory_report(self) -> dict:
+        """
+        Returns a dictionary with the bytes used by the HashMap, measured with
+        sys.getsizeof():
+            buckets - the bucket array and its LinkedList objects
+            nodes   - the SLNode objects
+            keys    - the keys
+            values  - the values
+            total   - all of the above
+        Objects shared between entries (e.g. small ints) are counted for each
+        entry that uses them.
+        """
+        self._finish_migration()
+        report = {'buckets': getsizeof(self._buckets)
+                  + getsizeof(self._buckets._data),
+                  'nodes': 0, 'keys': 0, 'values': 0}
+
+        for element in range(self._capacity):
+            linked_list = self._buckets.get_at_index(element)
+            if linked_list is not None:
+                report['buckets'] += getsizeof(linked_list)
+                for node in linked_list:
+                    report['nodes'] += getsizeof(node)
+                    report['keys'] += getsizeof(node.key)
+                    report['values'] += getsizeof(node.value)
 
+        report['total'] = sum(report.values())
+        return report
 
-def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
+    def _probe_length(self, key: str) -> tuple:
+        """
+        Receives a key then returns (found, probes, tombstones): whether the
+        key is in the HashMap and how many nodes a lookup compares against,
+        counting both tables during an incremental resize. A SortedBucket
+        counts as the number of steps of its binary search. There are never
+        tombstones, so the last value is always 0.
+        """
+        key_hash = self._hash_function(key)
+        tables = [(self._buckets, self._capacity)]
+        if self._old_buckets is not None:
+            tables.append((self._old_buckets, self._old_capacity))
+
+        probes = 0
+        for buckets, capacity in tables:
+            bucket = buckets.get_at_index(key_hash % capacity)
+            if bucket is None:
+                continue
+            if type(bucket) is SortedBucket:
+                probes += bucket.length().bit_length()
+                if bucket.contains(key, key_hash):
+                    return True, probes, 0
+                continue
+            for node in bucket:
+                probes += 1
+                if node.hash == key_hash and node.key == key:
+                    return True, probes, 0
+
+        return False, probes, 0
+
+    def _chain_lengths(self) -> dict:
+        """
+        Returns a dictionary of {chain length: number of buckets} for the
+        current table, including empty buckets as length 0.
+        """
+        self._finish_migration()
+        lengths = {}
+        for element in range(self._capacity):
+            bucket = self._buckets.get_at_index(element)
+            length = 0 if bucket is None else bucket.length()
+            lengths[length] = lengths.get(length, 0) + 1
+
+        return dict(sorted(lengths.items()))
+
+    def enable_stats(self, alert_threshold: float = None,
+                     on_alert=None) -> None:
+        """
+        Starts recording lookup and resize statistics for the HashMap, read
+        with get_stats(). Lookups cost about twice as much while recording;
+        with stats disabled (the default) there is no extra cost at all.
+
+        If alert_threshold is given, on_alert(mean) is called whenever the
+        mean probe length of recorded lookups rises above it.
+        """
+        hash_map_stats.enable(self, alert_threshold, on_alert)
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording statistics and discards those recorded so far.
+        """
+        hash_map_stats.disable(self)
+
+    def get_stats(self) -> dict:
+        """
+        Returns a snapshot of the recorded statistics (see
+        hash_map_stats.MapStats.snapshot), or None if stats are not enabled.
+        chain_lengths holds the number of buckets with each chain length.
+        """
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot(self._chain_lengths())
+
+
+def _values_of(values):
+    """
+    Receives a DynamicArray or any other iterable then returns an iterator
+    over its values.
+    """
+    if isinstance(values, DynamicArray):
+        return (values.get_at_index(index)
+                for index in range(values.length()))
+    return iter(values)
+
+
+def _numpy_counts(values: list) -> list:
+    """
+    Receives a list of values then, if they are all ints, all floats or all
+    short strings, counts them with NumPy and returns a list of (value,
+    count) pairs in the order each value first appeared. Returns None for
+    any other list, or values NumPy would not compare the way Python does.
     """
-    Receives a DynamicArray then calculates the mode of the values in the
-    array.
+    kind = type(values[0])
+    if kind not in (int, float, str):
+        return None
+    for value in values:
+        if type(value) is not kind:  # mixed types, including bools
+            return None
+
+    if kind is str:
+        # fixed-width strings drop trailing NULs, so 'a' and 'a\0' would
+        # count as one value
+        if (max(map(len, values)) > NUMPY_MAX_STRING
+                or '\0' in ''.join(values)):
+            return None
+        array = numpy.array(values, dtype=str)
+    elif kind is int:
+        try:
+            array = numpy.array(values, dtype=numpy.int64)
+        except OverflowError:
+            return None
+    else:
+        array = numpy.array(values, dtype=numpy.float64)
+        # every NaN is a different key in a HashMap, but one value to NumPy,
+        # and a function may hash 0.0 and -0.0 apart, which NumPy counts as
+        # one value
+        if (numpy.isnan(array).any()
+                or numpy.signbit(array[array == 0]).any()):
+            return None
+
+    _, first, counts = numpy.unique(array, return_index=True,
+                                    return_counts=True)
+    order = numpy.argsort(first)
+    return list(zip([values[index] for index in first[order].tolist()],
+                    counts[order].tolist()))
+
+
+def find_mode(da, function=hash_function_1) -> tuple[DynamicArray, int]:
+    """
+    Receives a DynamicArray, or any iterable such as a generator reading a
+    file, then calculates the mode of the values in it. The values are
+    read once, so a stream never needs to fit in memory, only its distinct
+    values. They are counted in a HashMap using function.
 
     Returns a tuple of an array containing the mode(s) and an integer with the
-    count of the mode(s).
+    count of the mode(s). Modes with the same count are in the order of the
+    HashMap's buckets, which depends only on function and the order the
+    values first appear in.
 
     Default behavior for all unique elements is to return a mode count of 1 and
     an array of all elements.
-    """
-    map = HashMap()
-    mode_array = DynamicArray()
 
-    # iterate through da and put instances of each unique value into HashMap
-    for element in range(da.length()):
-        value = da.get_at_index(element)
-        count = map.get(value)
-        if count:
-            map.put(value, count + 1)
+    A DynamicArray of at least NUMPY_MIN_VALUES ints, floats or short
+    strings is counted with NumPy when it is installed. If function can
+    hash the values, only the distinct values are then put in the HashMap,
+    in the order they first appear, and the table is grown as counting one
+    value at a time would have grown it (see grow_as_counted()), so the
+    HashMap, and the modes' order, are the same.
+
+    Ints and floats function can't hash, as with the default
+    hash_function_1, which only takes strings, are never put in a HashMap,
+    on either path, and their modes are in the order they first appear.
+    Raises TypeError if function can't hash the first value and it isn't an
+    int or float, or the values aren't all of its type.
+    """
+    map = HashMap(function=function)
+
+    if (numpy is not None and isinstance(da, DynamicArray)
+            and da.length() >= NUMPY_MIN_VALUES):
+        values = da.to_list()
+        counts = _numpy_counts(values)
+        if counts is not None:
+            try:
+                function(values[0])
+            except TypeError:
+                if type(values[0]) is str:
+                    raise
+                return _modes_of_pairs(counts)
+            map.increment_many(counts)
+            grow_as_counted(map, values[-1])
+            return modes_of(map)
+
+    values = _values_of(da)
+    for first in values:
+        values = chain([first], values)
+        if type(first) in (int, float):
+            try:
+                function(first)
+            except TypeError:
+                return _modes_of_pairs(_counts_in_order(values))
+        break
+
+    # count each unique value in the HashMap, one probe per value
+    for value in values:
+        map.increment(value)
+
+    return modes_of(map)
+
+
+def _counts_in_order(values) -> list:
+    """
+    Receives an iterator over ints or floats then counts them in a dict and
+    returns a list of (value, count) pairs in the order each value first
+    appeared. Every NaN is counted as a different value, as in a HashMap.
+    Raises TypeError if the values aren't all of the first value's type.
+    """
+    counts, pairs = {}, []
+    kind = None
+    for value in values:
+        if kind is None:
+            kind = type(value)
+        elif type(value) is not kind:  # mixed types, including bools
+            raise TypeError(f"find_mode() can't count {type(value).__name__}"
+                            f" values with {kind.__name__} values")
+        if value != value:  # NaN
+            pairs.append([value, 1])
+        elif value in counts:
+            counts[value][1] += 1
         else:
-            map.put(value, 1)
+            counts[value] = [value, 1]
+            pairs.append(counts[value])
+    return [(value, count) for value, count in pairs]
 
-    # get the da export of the HashMap
-    da_counts = map.get_keys_and_values()
+
+def grow_as_counted(counts: HashMap, last_value) -> None:
+    """
+    Receives a HashMap of counts made by adding each distinct value's count
+    at once, in the order the values first appeared, and the last value
+    counted. Then grows the table if increment() for every value would have.
+
+    increment() grows a full table before counting any value, even one
+    already counted, so the table grows once more if it was filled by the
+    last new value and any value came after that one. That is exactly when
+    the last value was counted before (its count isn't 1). Counting it
+    again by 0 makes the same call as the last increment() would have.
+    """
+    if counts.get(last_value) != 1:
+        counts.increment(last_value, 0)
+
+
+def modes_of(counts: HashMap) -> tuple[DynamicArray, int]:
+    """
+    Receives a HashMap of value counts then returns a tuple of an array of
+    the value(s) with the highest count, in the HashMap's bucket order, and
+    that count, as for find_mode().
+    """
+    mode_array = DynamicArray()
     mode_counter = 0
 
-    # iterate through each tuple and determine mode and counts
-    for element in range(da_counts.length()):
-        key, value = da_counts.get_at_index(element)
+    # iterate through each pair and determine mode and counts
+    for key, value in counts.items():
         if value > mode_counter:
             mode_array = DynamicArray()
             mode_array.append(key)
@@ -292,6 +1010,75 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     return mode_array, mode_counter
 
 
+def _modes_of_pairs(counts: list) -> tuple[DynamicArray, int]:
+    """
+    Receives a list of (value, count) pairs then returns a tuple of an array
+    of the value(s) with the highest count, in the list's order, and that
+    count, as for find_mode().
+    """
+    mode_counter = max(count for _, count in counts)
+    return (DynamicArray([value for value, count in counts
+                          if count == mode_counter]),
+            mode_counter)
+
+
+def top_k(values, k: int, capacity: int = None,
+          function: callable = hash_function_1) -> DynamicArray:
+    """
+    Receives a DynamicArray or any iterable of values and a number k then
+    returns a DynamicArray of the k most frequent values as (value, count)
+    tuples, most frequent first. Ties keep the order the counts come out of
+    the HashMap.
+
+    With capacity, at most capacity values are counted at once, for streams
+    with more distinct values than can be held in memory, and the result is
+    approximate (the Space-Saving algorithm): when a new value arrives and
+    the HashMap is full, the value with the smallest count is replaced by
+    the new one, which takes over that count plus one. A returned count is
+    never less than the value's true count, and is over by at most the
+    stream length / capacity; any value seen more often than that is
+    guaranteed to be returned. capacity must be at least k.
+    """
+    if k <= 0:
+        return DynamicArray()
+
+    map = HashMap(function=function)
+    if capacity is None:
+        for value in _values_of(values):
+            map.increment(value)
+    else:
+        if capacity < k:
+            raise ValueError(f"capacity {capacity} is less than k {k}")
+
+        # min-heap of (count, order, value). A value's entry goes stale when
+        # its count grows, so stale entries are skipped when popped and the
+        # heap is rebuilt from the HashMap if they pile up
+        heap = []
+        order = 0
+        for value in _values_of(values):
+            if map.get_size() < capacity or map.contains_key(value):
+                count = map.increment(value)
+            else:
+                while True:
+                    count, _, smallest = heapq.heappop(heap)
+                    if map.get(smallest) == count:
+                        break
+                map.remove(smallest)
+                count = count + 1
+                map.put(value, count)
+
+            heapq.heappush(heap, (count, order, value))
+            order += 1
+            if len(heap) > 2 * capacity:
+                heap = [(count, order + index, key) for index, (key, count)
+                        in enumerate(map.items())]
+                heapq.heapify(heap)
+                order += len(heap)
+
+    counts = heapq.nlargest(k, map.items(), key=lambda pair: pair[1])
+    return DynamicArray(counts)
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -498,3 +1285,33 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nfind_mode - batched counting matches one value at a time")
+    print("---------------------------------------------------------")
+    # distinct counts that fill the table exactly, just under and just over.
+    # Every value is counted 100 times, so all of them are modes and their
+    # order shows the layout of the table
+    for capacity in (11, 23, 47, 97):
+        for distinct in (capacity - 1, capacity, capacity + 1):
+            values = [f"v{i * 7 % distinct}" for i in range(100 * distinct)]
+            modes, count = find_mode(DynamicArray(values))
+            expected = find_mode(iter(values))
+            same = (modes.to_list(), count) == (expected[0].to_list(),
+                                                expected[1])
+            print(f"{distinct:>3} distinct: {same}")
+
+    print("\nfind_mode - ints and floats")
+    print("----------------------------")
+    # hash_function_1 only hashes strings, so these are never put in a
+    # HashMap, with or without NumPy, and their modes are in the order they
+    # first appear
+    for case in ([3, 1, 2, 2, 1] * 400, [2.5, -0.5, 2.5, 1.0, -0.5] * 400,
+                 [3, 1, 2, 2, 1]):
+        mode, frequency = find_mode(DynamicArray(case))
+        print(f"Mode : {mode}, Frequency: {frequency}")
+    # with a function that hashes them, they are counted in the HashMap as
+    # one value at a time would be
+    values = [i * 7 % 97 for i in range(9700)]
+    modes, count = find_mode(DynamicArray(values), hash)
+    expected = find_mode(iter(values), hash)
+    print((modes.to_list(), count) == (expected[0].to_list(), expected[1]))
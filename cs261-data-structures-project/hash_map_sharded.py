@@ -0,0 +1,386 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  HashMap split across several worker processes. Each shard
+# process owns an SC or OA HashMap holding the keys whose hash falls to it,
+# and the ShardedHashMap in the calling process routes every operation to
+# the right shard. Operations travel in batches over pipes: puts and
+# removes are buffered per shard, and the *_many methods send to every
+# shard before waiting for any reply, so the shards work in parallel.
+
+import multiprocessing
+import pickle
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray
+
+
+# mixed into every key by partition_hash(), so which shard a key goes to
+# tells nothing about hash(key)
+PARTITION_SALT = 0x9e3779b97f4a7c15
+
+
+def partition_hash(key) -> int:
+    """
+    Receives a key then returns a hash of it for choosing its shard. It is
+    builtin hash() of the key paired with PARTITION_SALT, so it is fast,
+    but unlike hash(key) it doesn't leave every key in shard s with
+    hash(key) % shards == s, which would crowd each shard's keys into a few
+    buckets of a table whose capacity shares a factor with the shard count.
+    """
+    return hash((PARTITION_SALT, key))
+
+
+def _picklable(error: Exception) -> Exception:
+    """
+    Receives an exception then returns it if it can be pickled, or a
+    RuntimeError with its type and message if it can't.
+    """
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+def _shard_worker(connection, kind: str, capacity: int, function,
+                  options: dict) -> None:
+    """
+    Runs in each shard process. Receives batches of (operation, argument)
+    pairs over the connection, applies them in order to this shard's
+    HashMap and sends back a list with the result of each one: (True,
+    result), or (False, exception) if the operation raised one, so a bad
+    key never stops the shard. A batch of None stops the worker.
+    """
+    if kind == 'sc':
+        m = hash_map_sc.HashMap(capacity, function, **options)
+    else:
+        m = hash_map_oa.HashMap(capacity, function, **options)
+
+    def get_many(keys):
+        values = m.get_many(keys)
+        return [values[i] for i in range(values.length())]
+
+    def contains_many(keys):
+        found = m.contains_many(keys)
+        return [found[i] for i in range(found.length())]
+
+    def items(_):
+        pairs = m.get_keys_and_values()
+        return [pairs[i] for i in range(pairs.length())]
+
+    operations = {
+        'put': lambda pair: m.put(*pair),
+        'get': m.get,
+        'remove': m.remove,
+        'contains_key': m.contains_key,
+        'put_many': m.put_many,
+        'get_many': get_many,
+        'contains_many': contains_many,
+        'items': items,
+        'size': lambda _: m.get_size(),
+        'clear': lambda _: m.clear(),
+    }
+
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        results = []
+        for operation, argument in batch:
+            try:
+                results.append((True, operations[operation](argument)))
+            except Exception as error:
+                results.append((False, _picklable(error)))
+        connection.send(results)
+    connection.close()
+
+
+class ShardedHashMap:
+    """
+    HashMap whose keys are split over shards worker processes by
+    partition(key) % shards. Each shard holds a hash_map_sc.HashMap (kind
+    'sc') or hash_map_oa.HashMap (kind 'oa') built with capacity, function
+    and any other keyword options. function and the options are sent to the
+    shard processes, so they must be picklable (e.g. module-level
+    functions). partition only runs in this process, and should not be the
+    same as function (see partition_hash()).
+
+    put() and remove() are buffered per shard and sent batch_size at a time;
+    a read from a shard first sends that shard's buffered writes in the same
+    message, so reads always see earlier writes. Call flush() to send every
+    buffer, and close() (or use a with block) to stop the shard processes.
+
+    An exception raised in a shard is raised again here, by the call that
+    sent the operation. A buffered put() or remove() is sent by a later
+    call, which raises the exception with a note naming the write. Either
+    way the shard keeps running, and every other operation sent with it is
+    still applied.
+    """
+
+    def __init__(self, shards: int = 4, kind: str = 'oa',
+                 capacity: int = 11, function: callable = hash,
+                 partition: callable = partition_hash,
+                 batch_size: int = 1000,
+                 start_method: str = None, **options) -> None:
+        """
+        Initialize the map and start its shard processes.
+        """
+        if kind not in ('sc', 'oa'):
+            raise ValueError(f"unknown HashMap kind {kind!r}, expected "
+                             f"'sc' or 'oa'")
+
+        self._partition = partition
+        self._batch_size = batch_size
+        self._buffers = [[] for _ in range(shards)]
+        self._sent = [[] for _ in range(shards)]  # writes awaiting a reply
+        self._connections = []
+        self._processes = []
+
+        context = multiprocessing.get_context(start_method)
+        for _ in range(shards):
+            connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_shard_worker, daemon=True,
+                args=(child_connection, kind, capacity, function, options))
+            process.start()
+            child_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def __enter__(self) -> "ShardedHashMap":
+        """Return the map for use in a with block."""
+        return self
+
+    def __exit__(self, *exception) -> None:
+        """Stop the shard processes at the end of a with block."""
+        self.close()
+
+    # ------------------------------------------------------------------ #
+
+    def _shard(self, key: str) -> int:
+        """
+        Receives a key then returns the number of the shard that holds it.
+        """
+        return self._partition(key) % len(self._connections)
+
+    def _send(self, shard: int, batch: list) -> None:
+        """
+        Receives a shard number and a batch of operations then sends the
+        shard its buffered writes followed by the batch, without waiting for
+        the reply. The writes are kept until then so their errors can be
+        reported. Each send must be matched by a _receive().
+        """
+        buffer = self._buffers[shard]
+        self._sent[shard] = buffer
+        if buffer:
+            batch = buffer + batch
+            self._buffers[shard] = []
+        self._connections[shard].send(batch)
+
+    def _receive(self, shards: list, count: int) -> list:
+        """
+        Receives a list of shard numbers then waits for the reply to the
+        last batch sent to each and returns, for each shard, the results of
+        the batch's last count operations. Every reply is read before the
+        first exception among them is raised, so no reply is left waiting.
+        """
+        replies, error = [], None
+        for shard in shards:
+            results = self._connections[shard].recv()
+            writes = self._sent[shard]
+            self._sent[shard] = []
+            for position, (ok, result) in enumerate(results):
+                if not ok and error is None:
+                    error = result
+                    if position < len(writes) and hasattr(error, 'add_note'):
+                        operation, argument = writes[position]
+                        error.add_note(f"raised by the buffered {operation}"
+                                       f"() of {argument!r} on shard {shard}")
+            replies.append([result for _, result
+                            in results[len(results) - count:]])
+
+        if error is not None:
+            raise error
+        return replies
+
+    def _request(self, shard: int, operation: str, argument) -> object:
+        """
+        Receives a shard number, an operation and its argument then sends it
+        to the shard along with the shard's buffered writes and returns its
+        result.
+        """
+        self._send(shard, [(operation, argument)])
+        return self._receive([shard], 1)[0][0]
+
+    def _request_all(self, operation: str, argument=None) -> list:
+        """
+        Receives an operation and its argument then runs it on every shard
+        at once, returning the list of each shard's result.
+        """
+        shards = range(len(self._connections))
+        for shard in shards:
+            self._send(shard, [(operation, argument)])
+        return [results[0] for results in self._receive(shards, 1)]
+
+    def _buffer(self, key: str, operation: str, argument) -> None:
+        """
+        Receives a key and a write operation for it then adds the operation
+        to the key's shard buffer, sending the buffer once it is full.
+        """
+        shard = self._shard(key)
+        buffer = self._buffers[shard]
+        buffer.append((operation, argument))
+        if len(buffer) >= self._batch_size:
+            self._send(shard, [])
+            self._receive([shard], 0)
+
+    def flush(self) -> None:
+        """
+        Sends every shard's buffered writes and waits for them to be applied.
+        """
+        pending = [shard for shard, buffer in enumerate(self._buffers)
+                   if buffer]
+        for shard in pending:
+            self._send(shard, [])
+        self._receive(pending, 0)
+
+    def close(self) -> None:
+        """
+        Sends any buffered writes then stops the shard processes. The map
+        can't be used afterwards.
+        """
+        if not self._processes:
+            return
+
+        try:
+            self.flush()
+        finally:
+            for connection in self._connections:
+                connection.send(None)
+                connection.close()
+            for process in self._processes:
+                process.join()
+            self._connections, self._processes = [], []
+
+    def get_shard_count(self) -> int:
+        """
+        Return the number of shards
+        """
+        return len(self._connections)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Receives a key/value pair, then inserts it into its shard. If a
+        duplicate key is provided then its stored value will be overwritten.
+        """
+        self._buffer(key, 'put', (key, value))
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key then removes it from its shard. If the key is not
+        found, then nothing happens.
+        """
+        self._buffer(key, 'remove', key)
+
+    def get(self, key: str) -> object:
+        """
+        Receives a key then returns the value associated with the key if it
+        exists, or returns None otherwise.
+        """
+        return self._request(self._shard(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key then returns True if it is in the HashMap, False
+        otherwise.
+        """
+        return self._request(self._shard(key), 'contains_key', key)
+
+    def get_size(self) -> int:
+        """
+        Return size of map, the total over every shard
+        """
+        return sum(self._request_all('size'))
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns an array of all key/value pairs in every shard, as tuples.
+        """
+        hash_map_array = DynamicArray()
+        for pairs in self._request_all('items'):
+            for pair in pairs:
+                hash_map_array.append(pair)
+
+        return hash_map_array
+
+    def clear(self) -> None:
+        """
+        Clears every shard, dropping any buffered writes.
+        """
+        self._buffers = [[] for _ in self._buffers]
+        self._request_all('clear')
+
+    def _split(self, items: list, key_of) -> list:
+        """
+        Receives a list of items and a function giving each item's key then
+        returns, for each shard, the list of positions of its items.
+        """
+        positions = [[] for _ in self._connections]
+        for position, item in enumerate(items):
+            positions[self._shard(key_of(item))].append(position)
+        return positions
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/value pairs then inserts all of them,
+        sending one batch to each shard and waiting for all of them
+        together.
+        """
+        pairs = list(pairs)
+        positions = self._split(pairs, lambda pair: pair[0])
+
+        shards = [shard for shard, shard_positions in enumerate(positions)
+                  if shard_positions]
+        for shard in shards:
+            self._send(shard, [('put_many', [pairs[position] for position
+                                             in positions[shard]])])
+        self._receive(shards, 1)
+
+    def _read_many(self, operation: str, keys) -> DynamicArray:
+        """
+        Receives get_many or contains_many and an iterable of keys then runs
+        the operation with one batch per shard, all shards at once, and
+        returns the results in the same order as the keys.
+        """
+        keys = list(keys)
+        positions = self._split(keys, lambda key: key)
+
+        shards = [shard for shard, shard_positions in enumerate(positions)
+                  if shard_positions]
+        for shard in shards:
+            self._send(shard, [(operation, [keys[position] for position
+                                            in positions[shard]])])
+
+        results = [None] * len(keys)
+        for shard, shard_results in zip(shards, self._receive(shards, 1)):
+            for position, result in zip(positions[shard], shard_results[0]):
+                results[position] = result
+
+        return DynamicArray(results)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray with the value
+        of each key, or None for keys that are not in the HashMap. Values are
+        in the same order as the keys.
+        """
+        return self._read_many('get_many', keys)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray of booleans,
+        True for each key that is in the HashMap and False otherwise.
+        """
+        return self._read_many('contains_many', keys)
@@ -0,0 +1,435 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Binary snapshots of the OA HashMap. save() writes the bucket
+# layout exactly as it is in memory: bucket states, cached hashes, capacity,
+# the hash function's name and every key and value. load() maps the file
+# into memory and looks keys up straight from the mapped bytes, so nothing
+# is rebuilt and start-up time doesn't grow with the number of keys. The
+# first put() or remove() copies the table into memory and closes the file.
+# Use HashMap.save() / HashMap.load() rather than calling these functions
+# directly.
+#
+# File layout, every section starting on a multiple of 8 bytes:
+#   magic        8 bytes, MAGIC
+#   meta length  4 bytes, then that many bytes of JSON (capacity, size, ...)
+#   states       capacity bytes, EMPTY / LIVE / TOMBSTONE per bucket
+#   hashes       capacity 64-bit cached hashes
+#   offsets      capacity 64-bit file offsets of each live bucket's record
+#   records      per live bucket: 4-byte key length, pickled key, pickled
+#                value
+
+import importlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from sys import getsizeof
+
+from a6_include import (CompactTable, EntryTable, HashEntry,
+                        DynamicArrayException, EMPTY, LIVE, TOMBSTONE, MATCH)
+from probing import DoubleHashing, PROBING_STRATEGIES
+
+
+MAGIC = b'CS261OA1'
+
+# methods replaced on a loaded HashMap object until its table is copied
+# into memory; each one changes buckets in place
+MUTATING_METHODS = ('put', 'put_many', 'increment', 'increment_many',
+                    'remove', 'purge_tombstones')
+
+# methods replaced on a loaded HashMap object that may swap in a new table,
+# after which the mapped one is closed
+REPLACING_METHODS = ('resize_table', 'clear')
+
+# live keys rehashed by load() to check the hash function still matches
+VERIFY_KEYS = 8
+
+
+def _align(offset: int) -> int:
+    """Return offset rounded up to a multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def function_name(function) -> str:
+    """
+    Receives a hash function then returns the 'module:qualified name' that
+    load() imports it back from.
+    """
+    return f"{function.__module__}:{function.__qualname__}"
+
+
+def import_function(name: str):
+    """
+    Receives a name from function_name() then imports and returns the
+    function, raising ValueError if it can't be found.
+    """
+    module_name, _, qualname = name.partition(':')
+    try:
+        function = importlib.import_module(module_name)
+        for attribute in qualname.split('.'):
+            function = getattr(function, attribute)
+    except (ImportError, AttributeError):
+        raise ValueError(f"can't import hash function {name!r}, pass "
+                         f"function= to load()") from None
+    return function
+
+
+class MappedTable:
+    """
+    Read-only bucket table for the OA HashMap backed by a snapshot file
+    mapped into memory. It has the lookup half of the EntryTable /
+    CompactTable API; the states, hashes and offsets are memoryviews of the
+    file and keys and values are unpickled from it only when needed.
+    materialize() copies it into an ordinary table for changes.
+    """
+
+    __slots__ = ('_map', '_states', '_hashes', '_offsets', '_compact')
+
+    def __init__(self, file_map: mmap.mmap, start: int, capacity: int,
+                 compact: bool) -> None:
+        """
+        Initialize a table over the buckets of a snapshot file whose states
+        begin at byte start.
+        """
+        view = memoryview(file_map)
+        hashes = _align(start + capacity)
+        offsets = hashes + 8 * capacity
+
+        self._map = file_map
+        self._states = view[start:start + capacity]
+        self._hashes = view[hashes:offsets].cast('Q')
+        self._offsets = view[offsets:offsets + 8 * capacity].cast('Q')
+        self._compact = compact
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return str([self.get_at_index(i) for i in range(self.length())])
+
+    def _key(self, index: int) -> object:
+        """Return the key of a live bucket, read from the file."""
+        offset = self._offsets[index]
+        length, = struct.unpack_from('<I', self._map, offset)
+        return pickle.loads(self._map[offset + 4:offset + 4 + length])
+
+    def new_table(self, capacity: int):
+        """
+        Return a new empty in-memory table, of the kind the snapshot was
+        saved from.
+        """
+        if self._compact:
+            return CompactTable(capacity)
+        return EntryTable(capacity)
+
+    def length(self) -> int:
+        """Return the number of buckets."""
+        return len(self._states)
+
+    def get_at_index(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of a bucket, or None if it is empty."""
+        if index < 0 or index >= self.length():
+            raise DynamicArrayException
+        state = self._states[index]
+        if state == EMPTY:
+            return None
+        if state == TOMBSTONE:
+            entry = HashEntry(None, None, self._hashes[index])
+            entry.is_tombstone = True
+            return entry
+        return HashEntry(*self.entry_at(index))
+
+    def __getitem__(self, index: int) -> HashEntry:
+        """Return a HashEntry copy of a bucket using [] syntax."""
+        return self.get_at_index(index)
+
+    def state(self, index: int) -> int:
+        """Return EMPTY, LIVE or TOMBSTONE for a bucket."""
+        return self._states[index]
+
+    def check(self, index: int, key: str, key_hash: int) -> int:
+        """Return MATCH if the bucket holds key, otherwise its state."""
+        state = self._states[index]
+        if (state == LIVE and self._hashes[index] == key_hash
+                and self._key(index) == key):
+            return MATCH
+        return state
+
+    def hash_at(self, index: int) -> int:
+        """Return the cached hash of a live or tombstone bucket."""
+        return self._hashes[index]
+
+    def entry_at(self, index: int) -> tuple:
+        """Return (key, value, hash) of a live bucket."""
+        offset = self._offsets[index]
+        length, = struct.unpack_from('<I', self._map, offset)
+        key_end = offset + 4 + length
+        return (pickle.loads(self._map[offset + 4:key_end]),
+                pickle.loads(memoryview(self._map)[key_end:]),
+                self._hashes[index])
+
+    def value_at(self, index: int) -> object:
+        """Return the value of a live bucket."""
+        return self.entry_at(index)[1]
+
+    def materialize(self):
+        """
+        Return an in-memory copy of the table with every bucket, tombstones
+        included, in the same place, so probe sequences are unchanged.
+        """
+        capacity = self.length()
+        table = self.new_table(capacity)
+
+        if self._compact:
+            # copy the states and hashes whole, then fill in the live keys
+            table._states[:] = self._states
+            table._hashes = array('Q', self._hashes)
+            keys, values = table._keys, table._values
+            for index, state in enumerate(self._states):
+                if state == LIVE:
+                    keys[index], values[index], _ = self.entry_at(index)
+            return table
+
+        for index, state in enumerate(self._states):
+            if state == LIVE:
+                table.store(index, *self.entry_at(index))
+            elif state == TOMBSTONE:
+                table.store(index, None, None, self._hashes[index])
+                table.mark_tombstone(index)
+        return table
+
+    def close(self) -> None:
+        """
+        Release the views of the file and close the mapping. The table can't
+        be used afterwards.
+        """
+        for view in (self._states, self._hashes, self._offsets):
+            view.release()
+        self._map.close()
+
+    def memory_report(self) -> dict:
+        """
+        Return the bytes used by the table object. The buckets, keys and
+        values stay in the mapped file, which the operating system pages in
+        and out as needed, so they are not counted.
+        """
+        return {'buckets': (getsizeof(self) + getsizeof(self._states)
+                            + getsizeof(self._hashes)
+                            + getsizeof(self._offsets)),
+                'nodes': 0, 'keys': 0, 'values': 0}
+
+
+# ------------------- SAVE -------------------------------------------------- #
+
+def save(hash_map, path: str) -> None:
+    """
+    Receives an OA HashMap and a file path then writes a snapshot of the map
+    to the file. The snapshot is written to a temporary file first and
+    moved into place, so an existing snapshot is never left half written.
+
+    Raises ValueError if the probing strategy can't be rebuilt by load():
+    one that isn't built in, or DoubleHashing with a step function that
+    can't be imported by name.
+    """
+    probing = hash_map._probing
+    if PROBING_STRATEGIES.get(probing.name) is not type(probing):
+        raise ValueError(f"can't save a HashMap with probing strategy "
+                         f"{probing!r}, only built in ones")
+    step_function = None
+    if (isinstance(probing, DoubleHashing)
+            and probing._step_function is not None):
+        step_function = function_name(probing._step_function)
+        try:
+            imported = import_function(step_function)
+        except ValueError:
+            imported = None
+        if imported is not probing._step_function:
+            raise ValueError(f"can't save a HashMap whose DoubleHashing "
+                             f"step function {step_function!r} can't be "
+                             f"imported by name")
+
+    hash_map._finish_migration()
+    table = hash_map._buckets
+    capacity = hash_map._capacity
+
+    meta = json.dumps({
+        'capacity': capacity,
+        'size': hash_map._size,
+        'tombstones': hash_map._tombstones,
+        'function': function_name(hash_map._hash_function),
+        'probing': probing.name,
+        'step_function': step_function,
+        'deletion': hash_map._deletion,
+        'tombstone_threshold': hash_map._tombstone_threshold,
+        'compact': hash_map._compact,
+        'incremental': hash_map._incremental,
+        'resize_step': hash_map._resize_step,
+        'shrink_load': hash_map._shrink_load,
+        'min_capacity': hash_map._min_capacity,
+        'byteorder': sys.byteorder,
+    }).encode()
+
+    states = bytearray(capacity)
+    hashes = array('Q', bytes(8 * capacity))
+    for index in range(capacity):
+        state = table.state(index)
+        if state != EMPTY:
+            states[index] = state
+            hashes[index] = table.hash_at(index)
+
+    start = _align(len(MAGIC) + 4 + len(meta))
+    offsets_start = _align(start + capacity) + 8 * capacity
+    offsets = array('Q', bytes(8 * capacity))
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(MAGIC + struct.pack('<I', len(meta)) + meta)
+        file.seek(start)
+        file.write(states)
+        file.seek(_align(start + capacity))
+        file.write(hashes)
+
+        # the records come after the offsets, which are written last once
+        # every record's place is known
+        offset = offsets_start + 8 * capacity
+        file.seek(offset)
+        for index in range(capacity):
+            if states[index] == LIVE:
+                key, value, _ = table.entry_at(index)
+                key = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+                record = (struct.pack('<I', len(key)) + key
+                          + pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+                file.write(record)
+                offsets[index] = offset
+                offset += len(record)
+
+        file.seek(offsets_start)
+        file.write(offsets)
+
+    os.replace(temporary, path)
+
+
+# ------------------- LOAD -------------------------------------------------- #
+
+def load(cls, path: str, function=None):
+    """
+    Receives the HashMap class, a snapshot file path and optionally the hash
+    function to use, then returns a HashMap serving lookups from the mapped
+    file. Without function the one named in the snapshot is imported.
+
+    Raises ValueError if the file isn't a snapshot, or if the hash function
+    doesn't give the cached hashes of the saved keys (e.g. builtin hash()
+    with a different PYTHONHASHSEED, or a differently keyed siphash).
+    """
+    with open(path, 'rb') as file:
+        file_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return _load_mapped(cls, path, file_map, function)
+    except BaseException:
+        file_map.close()
+        raise
+
+
+def _load_mapped(cls, path: str, file_map: mmap.mmap, function):
+    """
+    Receives the HashMap class, a snapshot file path, the file mapped into
+    memory and the hash function or None, then does the work of load().
+    """
+    if file_map[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a HashMap snapshot")
+    meta_length, = struct.unpack_from('<I', file_map, len(MAGIC))
+    meta_start = len(MAGIC) + 4
+    meta = json.loads(bytes(file_map[meta_start:meta_start + meta_length]))
+    if meta['byteorder'] != sys.byteorder:
+        raise ValueError(f"{path} was saved on a {meta['byteorder']}-endian "
+                         f"machine")
+
+    if function is None:
+        function = import_function(meta['function'])
+    probing = meta['probing']
+    if meta.get('step_function') is not None:
+        probing = DoubleHashing(import_function(meta['step_function']))
+
+    # start from the smallest table, then swap in the mapped one
+    hash_map = cls(3, function, probing=probing,
+                   tombstone_threshold=meta['tombstone_threshold'],
+                   deletion=meta['deletion'], compact=meta['compact'],
+                   incremental=meta['incremental'],
+                   resize_step=meta['resize_step'],
+                   shrink_load=meta.get('shrink_load'))
+    table = MappedTable(file_map, _align(meta_start + meta_length),
+                        meta['capacity'], meta['compact'])
+    hash_map._buckets = table
+    hash_map._capacity = meta['capacity']
+    hash_map._size = meta['size']
+    hash_map._tombstones = meta['tombstones']
+    hash_map._min_capacity = meta.get('min_capacity', hash_map._min_capacity)
+
+    verified = 0
+    for index, state in enumerate(table._states):
+        if verified == VERIFY_KEYS:
+            break
+        if state == LIVE:
+            key, _, key_hash = table.entry_at(index)
+            if hash_map._hash(key) != key_hash:
+                table.close()
+                raise ValueError(f"the hash function gives different hashes "
+                                 f"than when {path} was saved")
+            verified += 1
+
+    _defer_mutations(hash_map)
+    return hash_map
+
+
+def close(hash_map) -> None:
+    """
+    Receives a HashMap then, if it is still reading from a snapshot file,
+    closes the file and empties the HashMap. Does nothing otherwise.
+    """
+    if isinstance(hash_map._buckets, MappedTable):
+        hash_map.clear()
+
+
+def _defer_mutations(hash_map) -> None:
+    """
+    Receives a HashMap over a MappedTable then puts versions of its
+    mutating methods on the object that first copy the table into memory
+    and close the file, then put back the normal class methods and run the
+    one that was called. resize_table() and clear() build a new table
+    without the copy, then close the file once the mapped table is
+    replaced. Lookups never pay for the check.
+    """
+    cls = type(hash_map)
+
+    def release(table) -> None:
+        table.close()
+        for name in MUTATING_METHODS + REPLACING_METHODS:
+            hash_map.__dict__.pop(name, None)
+
+    def materialize():
+        table = hash_map._buckets
+        if isinstance(table, MappedTable):
+            hash_map._buckets = table.materialize()
+            release(table)
+
+    def deferred(name):
+        def method(*args, **kwargs):
+            materialize()
+            return getattr(cls, name)(hash_map, *args, **kwargs)
+        return method
+
+    def replacing(name):
+        def method(*args, **kwargs):
+            table = hash_map._buckets
+            result = getattr(cls, name)(hash_map, *args, **kwargs)
+            if hash_map._buckets is not table:
+                release(table)
+            return result
+        return method
+
+    for name in MUTATING_METHODS:
+        setattr(hash_map, name, deferred(name))
+    for name in REPLACING_METHODS:
+        setattr(hash_map, name, replacing(name))
@@ -0,0 +1,186 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Opt-in lookup statistics for both HashMaps. enable() puts
+# recording versions of the lookup and resize methods on one HashMap object,
+# so maps without stats run the normal class methods with no extra work.
+# Use HashMap.enable_stats() / disable_stats() / get_stats() rather than
+# calling these functions directly.
+
+import threading
+import time
+
+
+class MapStats:
+    """
+    Counters for one HashMap: probe-count histograms for hits and misses,
+    tombstones passed over by lookups and the number and duration of
+    resizes. Optionally calls on_alert(mean) when the mean probe length of
+    all lookups rises above alert_threshold, and again each time it drops
+    back below and rises above it once more.
+    """
+
+    def __init__(self, alert_threshold: float = None,
+                 on_alert=None) -> None:
+        """Initialize empty counters."""
+        self.hit_probes = {}
+        self.miss_probes = {}
+        self.lookups = 0
+        self.probes = 0
+        self.tombstones = 0
+        self.resizes = 0
+        self.resize_seconds = 0.0
+
+        self._alert_threshold = alert_threshold
+        self._on_alert = on_alert
+        self._alerting = False
+
+    def record_lookup(self, found: bool, probes: int,
+                      tombstones: int) -> None:
+        """
+        Receives the result of one lookup then adds it to the histograms and
+        checks the alert threshold.
+        """
+        histogram = self.hit_probes if found else self.miss_probes
+        histogram[probes] = histogram.get(probes, 0) + 1
+        self.lookups += 1
+        self.probes += probes
+        self.tombstones += tombstones
+
+        if self._alert_threshold is None:
+            return
+        above = self.probes / self.lookups > self._alert_threshold
+        if above and not self._alerting and self._on_alert is not None:
+            self._on_alert(self.probes / self.lookups)
+        self._alerting = above
+
+    def record_resize(self, seconds: float) -> None:
+        """Receives the duration of one resize then counts it."""
+        self.resizes += 1
+        self.resize_seconds += seconds
+
+    def snapshot(self, chain_lengths: dict) -> dict:
+        """
+        Receives the current chain length histogram of the HashMap then
+        returns a copy of every counter along with the mean probe lengths.
+        """
+        hits = sum(self.hit_probes.values())
+        misses = sum(self.miss_probes.values())
+        hit_total = sum(length * count
+                        for length, count in self.hit_probes.items())
+        return {
+            'lookups': self.lookups,
+            'hits': hits,
+            'misses': misses,
+            'hit_probes': dict(sorted(self.hit_probes.items())),
+            'miss_probes': dict(sorted(self.miss_probes.items())),
+            'mean_probe': self.probes / self.lookups if self.lookups else 0.0,
+            'mean_hit_probe': hit_total / hits if hits else 0.0,
+            'mean_miss_probe': ((self.probes - hit_total) / misses
+                                if misses else 0.0),
+            'tombstones_seen': self.tombstones,
+            'mean_tombstones': (self.tombstones / self.lookups
+                                if self.lookups else 0.0),
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+            'chain_lengths': chain_lengths,
+        }
+
+
+class LockedMapStats(MapStats):
+    """
+    MapStats that many threads can record into at once: every update and
+    snapshot holds one lock, so no count is lost between threads.
+    """
+
+    def __init__(self, alert_threshold: float = None,
+                 on_alert=None) -> None:
+        """Initialize empty counters and their lock."""
+        super().__init__(alert_threshold, on_alert)
+        self._lock = threading.Lock()
+
+    def record_lookup(self, found: bool, probes: int,
+                      tombstones: int) -> None:
+        """Record one lookup, as for MapStats.record_lookup()."""
+        with self._lock:
+            super().record_lookup(found, probes, tombstones)
+
+    def record_resize(self, seconds: float) -> None:
+        """Record one resize, as for MapStats.record_resize()."""
+        with self._lock:
+            super().record_resize(seconds)
+
+    def snapshot(self, chain_lengths: dict) -> dict:
+        """Return a copy of every counter, as for MapStats.snapshot()."""
+        with self._lock:
+            return super().snapshot(chain_lengths)
+
+
+# methods replaced on a HashMap object while its stats are enabled
+RECORDED_METHODS = ('get', 'contains_key', 'get_many', 'contains_many',
+                    'resize_table', '_start_resize')
+
+
+def enable(hash_map, alert_threshold: float = None,
+           on_alert=None, stats_type: type = MapStats) -> MapStats:
+    """
+    Receives a HashMap then starts recording stats for it, returning the new
+    MapStats, of stats_type (LockedMapStats for a map shared between
+    threads). Lookups are measured with the map's _probe_length() before
+    running the normal method, so they cost about twice as much.
+    """
+    stats = stats_type(alert_threshold, on_alert)
+    cls = type(hash_map)
+    probe_length = hash_map._probe_length
+
+    # each wrapper passes on any other arguments, positional or keyword,
+    # unchanged
+    def get(key, *args, **kwargs):
+        stats.record_lookup(*probe_length(key))
+        return cls.get(hash_map, key, *args, **kwargs)
+
+    def contains_key(key, *args, **kwargs):
+        stats.record_lookup(*probe_length(key))
+        return cls.contains_key(hash_map, key, *args, **kwargs)
+
+    def get_many(keys, *args, **kwargs):
+        keys = list(keys)
+        for key in keys:
+            stats.record_lookup(*probe_length(key))
+        return cls.get_many(hash_map, keys, *args, **kwargs)
+
+    def contains_many(keys, *args, **kwargs):
+        keys = list(keys)
+        for key in keys:
+            stats.record_lookup(*probe_length(key))
+        return cls.contains_many(hash_map, keys, *args, **kwargs)
+
+    def resize_table(*args, **kwargs):
+        start = time.perf_counter()
+        result = cls.resize_table(hash_map, *args, **kwargs)
+        stats.record_resize(time.perf_counter() - start)
+        return result
+
+    def _start_resize(*args, **kwargs):
+        start = time.perf_counter()
+        result = cls._start_resize(hash_map, *args, **kwargs)
+        stats.record_resize(time.perf_counter() - start)
+        return result
+
+    disable(hash_map)
+    for name, method in zip(RECORDED_METHODS,
+                            (get, contains_key, get_many, contains_many,
+                             resize_table, _start_resize)):
+        setattr(hash_map, name, method)
+    hash_map._stats = stats
+    return stats
+
+
+def disable(hash_map) -> None:
+    """
+    Receives a HashMap then stops recording stats for it, putting back the
+    normal class methods.
+    """
+    for name in RECORDED_METHODS:
+        hash_map.__dict__.pop(name, None)
+    hash_map._stats = None
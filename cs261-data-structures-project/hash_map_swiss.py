@@ -0,0 +1,850 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Open addressing HashMap in the style of SwissTable, with the
+# same methods as the OA HashMap. Next to the buckets is a bytearray with one
+# control byte per bucket: EMPTY, DELETED (a tombstone), or for a live
+# bucket 7 bits of its key's (mixed) hash, the key's fragment.
+#
+# The buckets are split into groups of GROUP_SIZE, and a lookup probes a
+# group at a time: bytearray.find() looks for the key's fragment among the
+# group's control bytes, and only the buckets whose byte matches have their
+# key compared, which for a missing key is 1 in 128 of the buckets looked
+# at. A group with an EMPTY byte ends the lookup. The top bits of the mixed
+# hash pick the first group, and later groups follow triangular numbers,
+# which visit every group once as the number of groups is a power of two.
+# get_many() and contains_many() compare the first group of every key at
+# once with NumPy, when it is installed, to rule out missing keys in bulk.
+
+from array import array
+from sys import getsizeof
+
+from a6_include import (DynamicArray, HashEntry, HASH_MASK, hash_function_1,
+                        hash_function_2, hash_many)
+import hash_map_stats
+
+try:  # optional, only used to rule out missing keys in bulk
+    import numpy
+except ImportError:
+    numpy = None
+
+
+GROUP_SIZE = 16
+
+# control bytes. A live bucket holds its key's fragment, 0 to 127
+EMPTY = 0x80
+DELETED = 0xFE
+FRAGMENT_MASK = 0x7F
+
+# full hashes are multiplied by this (2 ** 64 over the golden ratio) before
+# being split, so hashes that differ only in a few bits, as the assignment's
+# hash functions give for similar keys, still spread over every group. The
+# group comes from the top bits of the product and the fragment from bits
+# 32 to 38
+MIX = 0x9E3779B97F4A7C15
+
+
+class HashMap:
+    def __init__(self, capacity: int = GROUP_SIZE,
+                 function: callable = hash_function_1,
+                 max_load: float = 0.875) -> None:
+        """
+        Initialize new HashMap that uses open addressing with groups of
+        control bytes for collision resolution. capacity is rounded up to a
+        power of two number of groups of GROUP_SIZE buckets.
+        The table grows once live keys and tombstones would fill more than
+        max_load of the buckets; it must be below 1 so every probe sequence
+        reaches an EMPTY control byte.
+        """
+        if not 0 < max_load < 1:
+            raise ValueError(f"max_load must be in (0, 1), not {max_load}")
+
+        self._hash_function = function
+        self._max_load = max_load
+        self._capacity = self._table_size(capacity)
+        self._min_capacity = self._capacity
+        self._new_table(self._capacity)
+        self._size = 0
+
+        # bumped by every change to which keys are where, so iterators can
+        # tell the HashMap changed under them
+        self._version = 0
+
+        self._stats = None  # see enable_stats()
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            entry = None
+            if self._control[i] < EMPTY:
+                entry = HashEntry(self._keys[i], self._values[i])
+            elif self._control[i] == DELETED:
+                entry = HashEntry(None, None)
+                entry.is_tombstone = True
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _table_size(capacity: int) -> int:
+        """
+        Receives a number of buckets then returns the smallest table size at
+        least that big which is a power of two number of groups.
+        """
+        groups = 1
+        while groups * GROUP_SIZE < capacity:
+            groups *= 2
+        return groups * GROUP_SIZE
+
+    def _new_table(self, capacity: int) -> None:
+        """
+        Receives a table size then replaces the table with an empty one of
+        that size. Each bucket caches its key's full hash, so keys are never
+        hashed again when the table is resized.
+        """
+        self._control = bytearray([EMPTY]) * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._group_mask = capacity // GROUP_SIZE - 1
+        self._group_shift = 64 - self._group_mask.bit_length()
+        self._deleted = 0
+
+    def _hash(self, key: str) -> int:
+        """
+        Receives a key then returns its full hash, kept to 64 bits so it can
+        be cached.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _find_index(self, key: str, key_hash: int) -> int:
+        """
+        Receives a key and its full hash then returns the index of the bucket
+        holding the key, or None if it is not in the HashMap. Only buckets
+        whose control byte is the key's fragment are looked at.
+        """
+        control, keys, hashes = self._control, self._keys, self._hashes
+        mixed = (key_hash * MIX) & HASH_MASK
+        fragment = (mixed >> 32) & FRAGMENT_MASK
+        group_mask = self._group_mask
+        group = mixed >> self._group_shift
+
+        for step in range(1, group_mask + 2):
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            index = control.find(fragment, start, end)
+            while index != -1:
+                if hashes[index] == key_hash and keys[index] == key:
+                    return index
+                index = control.find(fragment, index + 1, end)
+
+            if control.find(EMPTY, start, end) != -1:
+                return None
+            group = (group + step) & group_mask
+
+        return None
+
+    def _free_index(self, key_hash: int) -> int:
+        """
+        Receives a full hash then returns the first EMPTY or DELETED bucket
+        along its probe sequence, where a new key with that hash goes.
+        """
+        control = self._control
+        group_mask = self._group_mask
+        group = ((key_hash * MIX) & HASH_MASK) >> self._group_shift
+
+        step = 1
+        while True:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            empty = control.find(EMPTY, start, end)
+            deleted = control.find(DELETED, start, end)
+            if deleted != -1 and (empty == -1 or deleted < empty):
+                return deleted
+            if empty != -1:
+                return empty
+            group = (group + step) & group_mask
+            step += 1
+
+    def _store(self, index: int, key: str, value: object,
+               key_hash: int) -> None:
+        """
+        Receives a free bucket index and a key, value and full hash then
+        stores them in that bucket.
+        """
+        if self._control[index] == DELETED:
+            self._deleted -= 1
+        self._control[index] = ((key_hash * MIX) >> 32) & FRAGMENT_MASK
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = key_hash
+
+    def _add(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Receives a key known not to be in the HashMap with its value and full
+        hash then adds it. If the key would take live keys and tombstones
+        past max_load, the table first doubles, or if at most half of that
+        is live keys, is rebuilt at the same size without its tombstones.
+        """
+        limit = self._max_load * self._capacity
+        if self._size + self._deleted + 1 > limit:
+            if self._size + 1 > limit / 2:
+                self.resize_table(self._capacity * 2)
+            else:
+                self.resize_table(self._capacity)
+
+        self._store(self._free_index(key_hash), key, value, key_hash)
+        self._size += 1
+        self._version += 1
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Receives a key, value and the key's full hash then adds or updates
+        the key in the HashMap.
+        """
+        index = self._find_index(key, key_hash)
+        if index is not None:  # update existing key
+            self._values[index] = value
+        else:
+            self._add(key, value, key_hash)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Receives a key and value then adds the key/value pair to the HashMap.
+        Replaces an existing value if the key already exists in the HashMap.
+        Will perform a resize of the underlying table if live keys and
+        tombstones would fill more than max_load of it.
+        """
+        self._insert(key, value, self._hash(key))
+
+    def _increment_hashed(self, key: str, delta, key_hash: int) -> object:
+        """
+        Receives a key, an amount and the key's full hash then does
+        increment() without hashing the key.
+        """
+        index = self._find_index(key, key_hash)
+        if index is None:
+            self._add(key, delta, key_hash)
+            return delta
+
+        self._values[index] += delta
+        return self._values[index]
+
+    def increment(self, key: str, delta=1) -> object:
+        """
+        Receives a key and an amount then adds the amount to the key's value,
+        adding the key with the amount as its value if it is not in the
+        HashMap, and returns the new value. The key is looked for once,
+        rather than by a get() and again by a put().
+        """
+        return self._increment_hashed(key, delta, self._hash(key))
+
+    def increment_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/amount pairs then adds each amount to its
+        key's value, the same as calling increment() for each pair in order.
+        Every key in the batch is hashed in one pass.
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+        for (key, delta), key_hash in zip(pairs, hashes):
+            self._increment_hashed(key, delta, key_hash & HASH_MASK)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the current HashMap to new_capacity buckets, rounded up to a
+        power of two number of groups, dropping every tombstone. Keys are
+        placed again from their cached hashes.
+
+        If the new table can't hold the current keys within max_load, then
+        method returns immediately and does nothing.
+        """
+        new_capacity = self._table_size(new_capacity)
+        if self._size > self._max_load * new_capacity:
+            return
+
+        control, keys, values = self._control, self._keys, self._values
+        hashes = self._hashes
+        self._capacity = new_capacity
+        self._new_table(new_capacity)
+        self._version += 1
+
+        for index in range(len(control)):
+            if control[index] < EMPTY:
+                key_hash = hashes[index]
+                self._store(self._free_index(key_hash), keys[index],
+                            values[index], key_hash)
+
+    def reserve(self, size: int) -> None:
+        """
+        Receives a number of keys then grows the HashMap once so that it can
+        hold that many keys without another resize. Does nothing if it
+        already can.
+        """
+        if size <= self._max_load * self._capacity:
+            return
+
+        self.resize_table(int(size / self._max_load) + 1)
+
+    @classmethod
+    def from_pairs(cls, pairs, size_hint: int = None,
+                   function: callable = hash_function_1,
+                   **options) -> "HashMap":
+        """
+        Receives an iterable of key/value pairs then returns a new HashMap
+        holding them, created at a capacity big enough for all of them so it
+        is never resized while being filled. size_hint is the number of
+        pairs, needed only if pairs has no len(). Other keyword options are
+        passed to HashMap().
+        """
+        if size_hint is None:
+            if not hasattr(pairs, '__len__'):
+                pairs = list(pairs)
+            size_hint = len(pairs)
+
+        hash_map = cls(GROUP_SIZE, function, **options)
+        hash_map.reserve(size_hint)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def table_load(self) -> float:
+        """
+        Returns the current table load of the HashMap.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the current number of empty buckets in the HashMap. Buckets
+        holding a tombstone are not empty.
+        """
+        return self._capacity - self._size - self._deleted
+
+    def get_tombstone_count(self) -> int:
+        """
+        Returns the number of tombstones currently in the HashMap.
+        """
+        return self._deleted
+
+    def get(self, key: str) -> object:
+        """
+        Receives a key then returns its value if it is in the HashMap. If not,
+        then returns None.
+        """
+        index = self._find_index(key, self._hash(key))
+        if index is not None:
+            return self._values[index]
+
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key then returns True if it is in the HashMap. If not,
+        then returns False.
+        """
+        return self._find_index(key, self._hash(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key then removes it if it is in the HashMap. If not,
+        then no changes are made to the HashMap.
+
+        The bucket goes back to EMPTY if its group has another EMPTY bucket,
+        since no lookup can have gone past that group. Otherwise it becomes
+        a tombstone.
+        """
+        index = self._find_index(key, self._hash(key))
+        if index is None:
+            return
+
+        start = index - index % GROUP_SIZE
+        if self._control.find(EMPTY, start, start + GROUP_SIZE) != -1:
+            self._control[index] = EMPTY
+        else:
+            self._control[index] = DELETED
+            self._deleted += 1
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._version += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray which contains every key/value pair in the
+        HashMap. Each element in the DynamicArray will be a tuple consisting
+        of the key and value.
+        """
+        hash_map_array = DynamicArray()
+        for index in self._live_indices():
+            hash_map_array.append((self._keys[index], self._values[index]))
+
+        return hash_map_array
+
+    def clear(self, shrink: bool = False) -> None:
+        """
+        Clears the contents of the HashMap, keeping the current capacity
+        unless shrink is True, in which case it goes back to the capacity it
+        was created with.
+        """
+        if shrink:
+            self._capacity = self._min_capacity
+        self._new_table(self._capacity)
+        self._size = 0
+        self._version += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable of key/value pairs then adds all of them to the
+        HashMap, the same as calling put() for each pair in order.
+
+        Every key in the batch is hashed in one pass and the table is resized
+        at most once up front.
+        """
+        pairs = list(pairs)
+        hashes = hash_many(self._hash_function, [key for key, _ in pairs])
+        self.reserve(self._size + len(pairs))
+
+        for (key, value), key_hash in zip(pairs, hashes):
+            self._insert(key, value, key_hash & HASH_MASK)
+
+    def _ruled_out(self, hashes: list) -> list:
+        """
+        Receives a list of full hashes then returns a list with True for
+        each one whose key can't be in the HashMap: its first group has no
+        control byte matching its fragment but has an EMPTY one. Every first
+        group is compared at once with NumPy; without NumPy nothing is ruled
+        out.
+        """
+        if numpy is None or not hashes:
+            return [False] * len(hashes)
+
+        # uint64 multiplication wraps around, the same as masking to 64 bits
+        mixed = numpy.array(hashes, dtype=numpy.uint64) * numpy.uint64(MIX)
+        fragments = ((mixed >> numpy.uint64(32))
+                     & numpy.uint64(FRAGMENT_MASK)).astype(numpy.uint8)
+        # shifted in two steps since NumPy can't shift by 64, for one group
+        starts = ((mixed >> numpy.uint64(32))
+                  >> numpy.uint64(self._group_shift - 32)) * GROUP_SIZE
+        control = numpy.frombuffer(self._control, dtype=numpy.uint8)
+        groups = control[starts.astype(numpy.intp)[:, None]
+                         + numpy.arange(GROUP_SIZE)]
+
+        return (~(groups == fragments[:, None]).any(axis=1)
+                & (groups == EMPTY).any(axis=1)).tolist()
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray with the value
+        of each key, or None for keys that are not in the HashMap. Values are
+        in the same order as the keys.
+        """
+        keys = list(keys)
+        hashes = [key_hash & HASH_MASK
+                  for key_hash in hash_many(self._hash_function, keys)]
+
+        values = DynamicArray()
+        for key, key_hash, ruled_out in zip(keys, hashes,
+                                            self._ruled_out(hashes)):
+            index = None if ruled_out else self._find_index(key, key_hash)
+            values.append(None if index is None else self._values[index])
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable of keys then returns a DynamicArray of booleans,
+        True for each key that is in the HashMap and False otherwise.
+        """
+        keys = list(keys)
+        hashes = [key_hash & HASH_MASK
+                  for key_hash in hash_many(self._hash_function, keys)]
+
+        found = DynamicArray()
+        for key, key_hash, ruled_out in zip(keys, hashes,
+                                            self._ruled_out(hashes)):
+            found.append(not ruled_out
+                         and self._find_index(key, key_hash) is not None)
+
+        return found
+
+    def memory_report(self) -> dict:
+        """
+        Returns a dictionary with the bytes used by the HashMap, measured with
+        sys.getsizeof():
+            buckets - the control bytes, bucket arrays and cached hashes
+            nodes   - always 0, no per-key objects are made
+            keys    - the keys
+            values  - the values
+            total   - all of the above
+        Objects shared between entries (e.g. small ints) are counted for each
+        entry that uses them.
+        """
+        report = {
+            'buckets': (getsizeof(self._control) + getsizeof(self._keys)
+                        + getsizeof(self._values)
+                        + getsizeof(self._hashes)),
+            'nodes': 0,
+            'keys': 0,
+            'values': 0,
+        }
+        for index in self._live_indices():
+            report['keys'] += getsizeof(self._keys[index])
+            report['values'] += getsizeof(self._values[index])
+        report['total'] = sum(report.values())
+        return report
+
+    def _probe_length(self, key: str) -> tuple:
+        """
+        Receives a key then returns (found, probes, tombstones): whether the
+        key is in the HashMap, how many buckets a lookup compares the key
+        with (those whose control byte matches the key's fragment) and how
+        many tombstones are in the groups it scans. Scanning a group's
+        control bytes isn't counted as a probe.
+        """
+        key_hash = self._hash(key)
+        control = self._control
+        mixed = (key_hash * MIX) & HASH_MASK
+        fragment = (mixed >> 32) & FRAGMENT_MASK
+        group_mask = self._group_mask
+        group = mixed >> self._group_shift
+
+        probes, tombstones = 0, 0
+        for step in range(1, group_mask + 2):
+            start = group * GROUP_SIZE
+            for index in range(start, start + GROUP_SIZE):
+                if control[index] == fragment:
+                    probes += 1
+                    if (self._hashes[index] == key_hash
+                            and self._keys[index] == key):
+                        return True, probes, tombstones
+                elif control[index] == DELETED:
+                    tombstones += 1
+
+            if EMPTY in control[start:start + GROUP_SIZE]:
+                break
+            group = (group + step) & group_mask
+
+        return False, probes, tombstones
+
+    def _chain_lengths(self) -> dict:
+        """
+        Returns a dictionary of {probe length: number of keys} giving the
+        number of buckets a lookup of each key in the HashMap compares it
+        with, the open addressing counterpart of SC chain lengths.
+        """
+        lengths = {}
+        for index in self._live_indices():
+            length = self._probe_length(self._keys[index])[1]
+            lengths[length] = lengths.get(length, 0) + 1
+
+        return dict(sorted(lengths.items()))
+
+    def enable_stats(self, alert_threshold: float = None,
+                     on_alert=None) -> None:
+        """
+        Starts recording lookup and resize statistics for the HashMap, read
+        with get_stats(). Lookups cost about twice as much while recording;
+        with stats disabled (the default) there is no extra cost at all.
+
+        If alert_threshold is given, on_alert(mean) is called whenever the
+        mean probe length of recorded lookups rises above it.
+        """
+        hash_map_stats.enable(self, alert_threshold, on_alert)
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording statistics and discards those recorded so far.
+        """
+        hash_map_stats.disable(self)
+
+    def get_stats(self) -> dict:
+        """
+        Returns a snapshot of the recorded statistics (see
+        hash_map_stats.MapStats.snapshot), or None if stats are not enabled.
+        chain_lengths holds the number of keys with each lookup probe length.
+        """
+        if self._stats is None:
+            return None
+
+        return self._stats.snapshot(self._chain_lengths())
+
+    def _live_indices(self):
+        """
+        Yields the index of every live bucket. Raises RuntimeError if the
+        HashMap is changed (other than a value being replaced) before the
+        last one has been yielded.
+        """
+        version = self._version
+        control = self._control
+        for index in range(len(control)):
+            if control[index] < EMPTY:
+                yield index
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """
+        Returns an iterator over every key in the HashMap. Nothing is copied,
+        so any number of iterators can be used at once, but the HashMap must
+        not have keys added or removed while they are in use.
+        """
+        keys = self._keys
+        return (keys[index] for index in self._live_indices())
+
+    def values(self):
+        """
+        Returns an iterator over every value in the HashMap, as for keys().
+        """
+        values = self._values
+        return (values[index] for index in self._live_indices())
+
+    def items(self):
+        """
+        Returns an iterator over every key/value pair in the HashMap, as
+        tuples, as for keys().
+        """
+        keys, values = self._keys, self._values
+        return ((keys[index], values[index])
+                for index in self._live_indices())
+
+    def __iter__(self):
+        """
+        Returns an iterator over a HashEntry for every key in the HashMap.
+        Each iterator keeps its own place, so iterations can be nested.
+        """
+        keys, values, hashes = self._keys, self._values, self._hashes
+        return (HashEntry(keys[index], values[index], hashes[index])
+                for index in self._live_indices())
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2),
+                  m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2),
+                  m.get_size(), m.get_capacity())
+
+    print("\nPDF - resize example 1")
+    print("----------------------")
+    m = HashMap(20, hash_function_1)
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+    m.resize_table(30)
+    print(m.get_size(), m.get_capacity(), m.get('key1'),
+          m.contains_key('key1'))
+
+    print("\nPDF - resize example 2")
+    print("----------------------")
+    m = HashMap(75, hash_function_2)
+    keys = [i for i in range(25, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+
+        if m.table_load() > 0.875:
+            print(f"Check that the load factor is acceptable after the call "
+                  f"to resize_table().\nYour load factor is "
+                  f"{round(m.table_load(), 2)} and should be less than or "
+                  f"equal to 0.875")
+
+        m.put('some key', 'some value')
+        result = m.contains_key('some key')
+        m.remove('some key')
+
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity(),
+              round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 1")
+    print("--------------------------")
+    m = HashMap(101, hash_function_1)
+    print(round(m.table_load(), 2))
+    m.put('key1', 10)
+    print(round(m.table_load(), 2))
+    m.put('key2', 20)
+    print(round(m.table_load(), 2))
+    m.put('key1', 30)
+    print(round(m.table_load(), 2))
+
+    print("\nPDF - table_load example 2")
+    print("--------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(50):
+        m.put('key' + str(i), i * 100)
+        if i % 10 == 0:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 1")
+    print("-----------------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key1', 30)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    m.put('key4', 40)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - empty_buckets example 2")
+    print("-----------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('key' + str(i), i * 100)
+        if i % 30 == 0:
+            print(m.empty_buckets(), m.get_size(), m.get_capacity())
+
+    print("\nPDF - get example 1")
+    print("-------------------")
+    m = HashMap(31, hash_function_1)
+    print(m.get('key'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+
+    print("\nPDF - get example 2")
+    print("-------------------")
+    m = HashMap(151, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nPDF - contains_key example 1")
+    print("----------------------------")
+    m = HashMap(11, hash_function_1)
+    print(m.contains_key('key1'))
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key3', 30)
+    print(m.contains_key('key1'))
+    print(m.contains_key('key4'))
+    print(m.contains_key('key2'))
+    print(m.contains_key('key3'))
+    m.remove('key3')
+    print(m.contains_key('key3'))
+
+    print("\nPDF - contains_key example 2")
+    print("----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    print(m.get_size(), m.get_capacity())
+    result = True
+    for key in keys:
+        # all inserted keys must be present
+        result &= m.contains_key(str(key))
+        # NOT inserted keys must be absent
+        result &= not m.contains_key(str(key + 1))
+    print(result)
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - get_keys_and_values example 1")
+    print("------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(1, 6):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys_and_values())
+
+    m.resize_table(2)
+    print(m.get_keys_and_values())
+
+    m.put('20', '200')
+    m.remove('1')
+    m.resize_table(12)
+    print(m.get_keys_and_values())
+
+    print("\nPDF - clear example 1")
+    print("---------------------")
+    m = HashMap(101, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - clear example 2")
+    print("---------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get_size(), m.get_capacity())
+    m.put('key1', 10)
+    print(m.get_size(), m.get_capacity())
+    m.put('key2', 20)
+    print(m.get_size(), m.get_capacity())
+    m.resize_table(100)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nPDF - __iter__(), __next__() example 1")
+    print("---------------------")
+    m = HashMap(10, hash_function_1)
+    for i in range(5):
+        m.put(str(i), str(i * 10))
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
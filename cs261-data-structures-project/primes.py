@@ -0,0 +1,81 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  A precomputed ladder of prime table capacities for sizing a
+# HashMap up front. Steps are about 2 ** (1/4) apart, so past the smallest
+# sizes a capacity taken from the ladder is never more than about 19% larger
+# than asked for, and finding one is a binary search rather than a trial
+# division search. next_prime() does that search, for exact sizes and for
+# sizes past the top of the ladder.
+
+from bisect import bisect_left
+
+
+# the smallest prime at or above ceil(2 ** (k / 4)), for k = 13 ... 160,
+# each prime once: 146 entries for 148 values of k
+PRIME_LADDER = (
+    11, 13, 17, 23, 29, 37, 41, 47, 59, 67, 79, 97, 109, 131, 157, 191, 223,
+    257, 307, 367, 431, 521, 613, 727, 863, 1031, 1223, 1451, 1723, 2053, 2437,
+    2897, 3449, 4099, 4871, 5801, 6899, 8209, 9743, 11587, 13781, 16411, 19489,
+    23173, 27581, 32771, 38971, 46349, 55109, 65537, 77951, 92683, 110221,
+    131101, 155887, 185369, 220447, 262147, 311747, 370759, 440893, 524309,
+    623521, 741457, 881779, 1048583, 1246997, 1482919, 1763491, 2097169,
+    2493949, 2965847, 3526987, 4194319, 4987901, 5931649, 7053971, 8388617,
+    9975803, 11863289, 14107921, 16777259, 19951597, 23726569, 28215809,
+    33554467, 39903197, 47453149, 56431657, 67108879, 79806341, 94906297,
+    112863217, 134217757, 159612679, 189812533, 225726419, 268435459,
+    319225391, 379625083, 451452839, 536870923, 638450719, 759250133,
+    902905657, 1073741827, 1276901429, 1518500279, 1805811341, 2147483659,
+    2553802871, 3037000507, 3611622607, 4294967311, 5107605691, 6074001001,
+    7223245229, 8589934609, 10215211387, 12148002047, 14446490449, 17179869209,
+    20430422699, 24296004011, 28892980877, 34359738421, 40860845437,
+    48592008053, 57785961671, 68719476767, 81721690807, 97184016049,
+    115571923303, 137438953481, 163443381373, 194368032011, 231143846587,
+    274877906951, 326886762733, 388736063999, 462287693167, 549755813911,
+    653773525393, 777472128049, 924575386373, 1099511627791,
+)
+
+
+def ladder_prime(capacity: int) -> int:
+    """
+    Receives a capacity then returns the smallest prime on the ladder that
+    is at least that big, or None if it is past the top of the ladder.
+    """
+    index = bisect_left(PRIME_LADDER, capacity)
+    if index == len(PRIME_LADDER):
+        return None
+    return PRIME_LADDER[index]
+
+
+def is_prime(number: int) -> bool:
+    """
+    Receives an integer then returns True if it is a prime number, False
+    otherwise, by trial division.
+    """
+    if number == 2 or number == 3:
+        return True
+
+    if number < 2 or number % 2 == 0:
+        return False
+
+    factor = 3
+    while factor ** 2 <= number:
+        if number % factor == 0:
+            return False
+        factor += 2
+
+    return True
+
+
+def next_prime(number: int) -> int:
+    """
+    Receives an integer then returns the smallest odd prime that is at least
+    that big, as HashMap._next_prime() does.
+    """
+    if number % 2 == 0:
+        number += 1
+
+    while not is_prime(number):
+        number += 2
+
+    return number
@@ -0,0 +1,164 @@
+# Name:         Josh Goben
+# OSU Email:    gobenj@oregonstate.edu
+# Course:       CS261 - Data Structures
+# Description:  Probing strategies for the open addressing HashMap. A strategy
+# decides which bucket to look at next when the one a key hashes to is taken,
+# and whether the table size must be prime or a power of two. Pass one to
+# hash_map_oa.HashMap with the probing= argument, either as an instance or by
+# name (see PROBING_STRATEGIES).
+
+from abc import ABC, abstractmethod
+
+from a6_include import HASH_MASK
+
+
+class ProbingStrategy(ABC):
+    """
+    Base class for a probing strategy. Subclasses must define probe(), or
+    they can't be created.
+
+    probe() yields the bucket indices to visit for a key, starting with the
+    bucket the key hashes to. Robin Hood strategies also reorder entries on
+    insert, so the HashMap checks the robin_hood flag to decide how to insert.
+    """
+    name = None
+    power_of_two = False  # table sizes are primes unless this is set
+    robin_hood = False
+    backward_shift = False  # entries can be shifted back on delete
+    uses_key = False  # probe() looks at the key, not only its hash
+
+    @abstractmethod
+    def probe(self, key_hash: int, key: str, capacity: int):
+        """Yield bucket indices to visit for the key, home bucket first."""
+
+    def __repr__(self) -> str:
+        """Override repr method to provide more readable output."""
+        return f"{type(self).__name__}()"
+
+
+class QuadraticProbing(ProbingStrategy):
+    """
+    i = (initial_index + j ** 2) % m; j+=1, m=length of arr
+    The original HashMap probing; needs a load of 0.5 or less to be sure of
+    finding an empty bucket, which the HashMap keeps.
+    """
+    name = 'quadratic'
+
+    def probe(self, key_hash: int, key: str, capacity: int):
+        """Yield bucket indices to visit for the key, home bucket first."""
+        initial_index = key_hash % capacity
+        yield initial_index
+        j = 1
+        while True:
+            yield (initial_index + j * j) % capacity
+            j += 1
+
+
+class LinearProbing(ProbingStrategy):
+    """
+    i = (initial_index + j) % m
+    Visits neighbouring buckets, which keeps probes close together in memory.
+    """
+    name = 'linear'
+    backward_shift = True
+
+    def probe(self, key_hash: int, key: str, capacity: int):
+        """Yield bucket indices to visit for the key, home bucket first."""
+        key_index = key_hash % capacity
+        while True:
+            yield key_index
+            key_index += 1
+            if key_index == capacity:
+                key_index = 0
+
+    @staticmethod
+    def distance(key_hash: int, key_index: int, capacity: int) -> int:
+        """Return how far the bucket at key_index is from the hash's home."""
+        return (key_index - key_hash) % capacity
+
+
+class TriangularProbing(ProbingStrategy):
+    """
+    i = (initial_index + j * (j + 1) / 2) % m, with m a power of two
+    Steps grow by one each time (1, 2, 3, ...). Over a power of two table this
+    visits every bucket exactly once before repeating.
+    """
+    name = 'triangular'
+    power_of_two = True
+
+    def probe(self, key_hash: int, key: str, capacity: int):
+        """Yield bucket indices to visit for the key, home bucket first."""
+        mask = capacity - 1
+        key_index = key_hash & mask
+        step = 0
+        while True:
+            yield key_index
+            step += 1
+            key_index = (key_index + step) & mask
+
+
+class DoubleHashing(ProbingStrategy):
+    """
+    i = (initial_index + j * step) % m, step = h2(key) % (m - 1) + 1
+    Keys that share a home bucket still take different paths through the
+    table. The step is never 0 and, since m is prime, every bucket is visited.
+
+    By default h2 is the key's hash run through a multiply-xorshift mixer,
+    so it works on any key the HashMap's own function hashes. A
+    step_function (e.g. hash_function_2, which only hashes strings) is
+    called on the key itself instead.
+    """
+    name = 'double'
+
+    def __init__(self, step_function=None) -> None:
+        """
+        Initialize the strategy with the hash function used for steps, or
+        None to derive them from the key's hash.
+        """
+        self._step_function = step_function
+        self.uses_key = step_function is not None
+
+    def probe(self, key_hash: int, key: str, capacity: int):
+        """Yield bucket indices to visit for the key, home bucket first."""
+        key_index = key_hash % capacity
+        yield key_index
+        if self._step_function is None:
+            step = (key_hash * 0x9e3779b97f4a7c15) & HASH_MASK
+            step ^= step >> 29
+        else:
+            step = self._step_function(key)
+        step = step % (capacity - 1) + 1
+        while True:
+            key_index = (key_index + step) % capacity
+            yield key_index
+
+
+class RobinHoodProbing(LinearProbing):
+    """
+    Linear probing where an insert takes the bucket of any entry that is
+    closer to its own home bucket than the new key is, then carries on
+    inserting the displaced entry. Probe lengths end up much more even, and
+    a lookup can stop early once it passes an entry closer to home than it.
+    """
+    name = 'robin_hood'
+    robin_hood = True
+
+
+PROBING_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (QuadraticProbing, LinearProbing, TriangularProbing,
+                     DoubleHashing, RobinHoodProbing)
+}
+
+
+def get_strategy(probing) -> ProbingStrategy:
+    """
+    Receives a ProbingStrategy instance or the name of one, then returns the
+    ProbingStrategy instance to use.
+    """
+    if isinstance(probing, ProbingStrategy):
+        return probing
+    if probing not in PROBING_STRATEGIES:
+        raise ValueError(f"unknown probing strategy {probing!r}, expected one "
+                         f"of {', '.join(PROBING_STRATEGIES)}")
+    return PROBING_STRATEGIES[probing]()